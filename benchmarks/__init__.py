@@ -0,0 +1,8 @@
+import os
+import sys
+
+# like pytest.ini, these expect an Archipelago checkout next to this repo, and run from the repo root:
+#   python -m benchmarks.client_ui
+archipelago_path = os.path.join(os.path.dirname(__file__), "..", "..", "Archipelago")
+if archipelago_path not in sys.path:
+    sys.path.append(archipelago_path)
@@ -0,0 +1,209 @@
+"""Times how long the Manual client takes to handle packets and update its tracker, without a server or a visible window.
+
+Feeds synthetic Connected, ReceivedItems and RoomUpdate packets into ManualContext.on_package, then runs the
+tracker update the UI would have scheduled, against a stub server that keeps whatever the client sends.
+The tracker timings come from the same PerfStats that /perf shows in the client.
+
+    python -m benchmarks.client_ui --items 2000 --locations 10000 --categories 50
+    python -m benchmarks.client_ui --game Manual_OrangeJuice_MapleLeaf --json client_ui.json
+"""
+import os
+
+# no window, and no GL, before anything imports kivy
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("KIVY_NO_FILELOG", "1")
+os.environ.setdefault("KIVY_GL_BACKEND", "mock")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from argparse import ArgumentParser
+import asyncio
+import json
+import random
+import statistics
+import time
+import types
+
+import Utils
+from NetUtils import Endpoint, NetworkItem
+from worlds import AutoWorldRegister, network_data_package
+
+from src import ManualClient
+from src.ManualClient import ManualContext, game_watcher_manual
+
+
+class StubSocket:
+    """Stands in for the server's websocket, keeping every message instead of sending it."""
+    open = True
+    closed = False
+
+    def __init__(self):
+        self.sent: list[str] = []
+
+    async def send(self, message: str):
+        self.sent.append(message)
+
+
+def make_game(item_count: int, location_count: int, category_count: int, seed: int) -> dict:
+    """Makes the same tables an .apmanual would have, for a Manual of the given size."""
+    rng = random.Random(seed)
+    categories = [f"Category {index}" for index in range(category_count)]
+
+    items = {}
+    for index in range(item_count):
+        name = f"Item {index}"
+        items[name] = {"name": name, "id": 1 + index, "category": rng.sample(categories, rng.randint(0, min(2, category_count))),
+                       "count": rng.choice([1, 1, 1, 2, 5]), "progression": True}
+
+    locations = {}
+    for index in range(location_count):
+        name = f"Location {index}"
+        requires = " and ".join(f"|{rng.choice(list(items))}|" for _ in range(rng.randint(0, 2)))
+        locations[name] = {"name": name, "id": 1 + index, "category": rng.sample(categories, rng.randint(0, min(2, category_count))),
+                           "requires": requires}
+
+    return {
+        "items": items,
+        "locations": locations,
+        "regions": {},
+        # every category has settings, so the client never looks for them in an installed world
+        "categories": {category: {"hidden": False} for category in [*categories, "(No Category)"]},
+    }
+
+
+def make_context(game: str, tables: dict, data_package: dict) -> ManualContext:
+    ctx = ManualContext(None, None, game, "Benchmark")
+    ctx.item_table = tables["items"]
+    ctx.location_table = tables["locations"]
+    ctx.region_table = tables["regions"]
+    ctx.category_table = tables["categories"]
+    ctx.update_data_package({"games": {game: data_package}})
+
+    world = AutoWorldRegister.world_types.get(game)
+    ctx.victory_names = getattr(world, "victory_names", ["__Manual Game Complete__"])
+    ctx.goal_location = ctx.location_table.get(ctx.victory_names[0]) or {"name": ctx.victory_names[0]}
+    ctx.server = Endpoint(StubSocket())
+    ctx.auth = "Benchmark"
+    ctx.team = 0
+    ctx.slot = 1
+
+    ctx.ui = ctx.make_gui()(ctx)
+    ctx.ui.build()
+    return ctx
+
+
+def run_packet(ctx: ManualContext, timings: dict[str, list[float]], cmd: str, args: dict, update_highlights: bool):
+    """Handles a packet like the client would, then runs the tracker update the UI would've scheduled."""
+    start = time.perf_counter()
+    ctx.on_package(cmd, args)
+    ctx.ui.update_trigger.cancel()
+    ctx.ui.update_tracker_and_locations_table(update_highlights)
+    timings.setdefault(cmd, []).append(time.perf_counter() - start)
+
+
+async def run_benchmark(ctx: ManualContext, rounds: int, batch_size: int, seed: int) -> dict[str, list[float]]:
+    rng = random.Random(seed)
+    timings: dict[str, list[float]] = {}
+    item_ids = sorted(ctx.item_names_to_id.values())
+    location_ids = sorted(ctx.location_names_to_id.values())
+    watcher = asyncio.create_task(game_watcher_manual(ctx))
+
+    ctx.missing_locations = set(location_ids)
+    ctx.checked_locations = set()
+    run_packet(ctx, timings, "Connected", {"slot_data": {}, "missing_locations": location_ids, "checked_locations": []}, True)
+
+    for _ in range(rounds):
+        received = [NetworkItem(rng.choice(item_ids), rng.choice(location_ids), 1, 1) for _ in range(batch_size)]
+        index = len(ctx.items_received)
+        ctx.items_received.extend(received)
+        run_packet(ctx, timings, "ReceivedItems", {"index": index, "items": received}, True)
+
+        # the player clicks a few locations, which go out to the stub server together
+        for location_id in rng.sample(sorted(ctx.missing_locations), min(3, len(ctx.missing_locations))):
+            start = time.perf_counter()
+            ctx.ui.location_button_callback(types.SimpleNamespace(location_id=location_id))
+            timings.setdefault("location click", []).append(time.perf_counter() - start)
+        await asyncio.sleep(ctx.location_check_batch_delay * 2)
+
+        checked = rng.sample(sorted(ctx.missing_locations), min(batch_size, len(ctx.missing_locations)))
+        ctx.checked_locations.update(checked)
+        ctx.missing_locations.difference_update(checked)
+        run_packet(ctx, timings, "RoomUpdate", {"checked_locations": checked}, False)
+
+    ctx.exit_event.set()
+    ctx.wake_watcher()
+    await watcher
+    return timings
+
+
+def summarize(timings: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    return {
+        name: {
+            "calls": len(samples),
+            "median_ms": statistics.median(samples) * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+            "max_ms": max(samples) * 1000,
+        }
+        for name, samples in timings.items()
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Times the Manual client's packet handling and tracker updates.")
+    parser.add_argument("--game", help="An installed Manual to use the data of, instead of a synthetic one.")
+    parser.add_argument("--items", type=int, default=500, help="How many items the synthetic Manual has.")
+    parser.add_argument("--locations", type=int, default=2000, help="How many locations the synthetic Manual has.")
+    parser.add_argument("--categories", type=int, default=20, help="How many categories the synthetic Manual has.")
+    parser.add_argument("--rounds", type=int, default=50, help="How many rounds of receiving items and checking locations to run.")
+    parser.add_argument("--batch", type=int, default=5, help="How many items are received, and locations checked, per round.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    if ManualClient.tracker_loaded:
+        print("Universal Tracker is installed, so its own updates are part of these timings.")
+
+    if args.game:
+        world = AutoWorldRegister.world_types[args.game]
+        game = args.game
+        # empty tables make the client use the installed world's data, like a seed with a newer .apmanual
+        tables = {"items": {}, "locations": {}, "regions": {}, "categories": {}}
+        data_package = network_data_package["games"][game]
+        description = f"{game}: {len(world.item_name_to_id)} items, {len(world.location_name_to_id)} locations"
+    else:
+        game = "Manual_Benchmark_Client"
+        tables = make_game(args.items, args.locations, args.categories, args.seed)
+        data_package = {
+            "item_name_to_id": {name: item["id"] for name, item in tables["items"].items()},
+            "location_name_to_id": {name: location["id"] for name, location in tables["locations"].items()},
+        }
+        description = f"synthetic: {args.items} items, {args.locations} locations, {args.categories} categories"
+
+    # the client remembers the last game it connected to, which shouldn't be a benchmark's
+    Utils.persistent_store = lambda *args, **kwargs: None
+
+    ctx = make_context(game, tables, data_package)
+    timings = asyncio.run(run_benchmark(ctx, args.rounds, args.batch, args.seed))
+
+    results = {
+        "data": description,
+        "packets": summarize(timings),
+        "tracker": {name: {"calls": calls, "mean_ms": total / calls * 1000, "max_ms": slowest * 1000}
+                    for name, (calls, total, slowest, _) in ctx.perf_stats.timings.items()},
+        "messages_sent": len(ctx.server.socket.sent),
+    }
+
+    print(description)
+    for name, summary in results["packets"].items():
+        print(f"  {name}: {summary['calls']} calls, {summary['median_ms']:.2f} ms median, {summary['max_ms']:.2f} ms max")
+    for line in ctx.perf_stats.report():
+        print(f"  {line}")
+    print(f"  {results['messages_sent']} messages sent to the stub server")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Times each stage of generating a Manual, and the fill, over many seeds.
+
+Generates through the same ManualTest (WorldTestBase) as src/manual_test.py, for this repo's Manual ("oj") and
+synthetic ones of any size, so a slowdown in the Manual core shows up here before it ships.
+
+    python -m benchmarks.generation --manuals small medium oj --seeds 20 --json generation.json
+    python -m benchmarks.generation --manuals custom --items 1000 --locations 5000 --regions 80 --optall 0.5
+    python -m benchmarks.generation --manuals medium --stage-timing
+"""
+from argparse import ArgumentParser
+import contextlib
+import dataclasses
+import importlib
+import json
+import os
+import statistics
+import time
+import traceback
+from types import ModuleType
+
+from Fill import distribute_items_restrictive
+from worlds.AutoWorld import AutoWorldRegister, World
+
+from .manuals import SyntheticManual, load_repo_manual, load_synthetic_manual, presets
+
+# the steps WorldTestBase.world_setup runs, that ManualWorld (or World) implements
+stages = ["generate_early", "create_regions", "create_items", "set_rules", "generate_basic", "pre_fill"]
+
+
+def time_stage(stage: str, method, timings: dict[str, float]):
+    def timed_stage(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    return timed_stage
+
+
+@contextlib.contextmanager
+def timed_stages(world_type: type[World], timings: dict[str, float]):
+    """Times the world's stage methods while they run."""
+    overridden = {stage: world_type.__dict__[stage] for stage in stages if stage in world_type.__dict__}
+    for stage in stages:
+        setattr(world_type, stage, time_stage(stage, getattr(world_type, stage), timings))
+    try:
+        yield
+    finally:
+        for stage in stages:
+            if stage in overridden:
+                setattr(world_type, stage, overridden[stage])
+            else:
+                delattr(world_type, stage)
+
+
+def generate(package: ModuleType, seed: int) -> dict:
+    """Generates a solo seed of the Manual in the given package. Returns how long each part took, in seconds."""
+    manual_test = importlib.import_module(f"{package.__name__}.manual_test").ManualTest
+    world_type = AutoWorldRegister.world_types[manual_test.game]
+    timings: dict[str, float] = {}
+    result = {"seed": seed, "timings": timings, "beatable": False, "error": None}
+
+    start = time.perf_counter()
+    try:
+        test = manual_test()
+        with timed_stages(world_type, timings):
+            test.world_setup(seed)
+
+        fill_start = time.perf_counter()
+        distribute_items_restrictive(test.multiworld)
+        timings["fill"] = time.perf_counter() - fill_start
+
+        result["beatable"] = test.multiworld.can_beat_game(test.multiworld.state)
+    except Exception:
+        result["error"] = traceback.format_exc()
+
+    timings["total"] = time.perf_counter() - start
+    return result
+
+
+def summarize(runs: list[dict]) -> dict:
+    names = [*stages, "fill", "total"]
+    summary = {}
+    for name in names:
+        samples = [run["timings"][name] for run in runs if name in run["timings"] and not run["error"]]
+        if samples:
+            summary[name] = {
+                "median_ms": statistics.median(samples) * 1000,
+                "mean_ms": statistics.fmean(samples) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+    summary["failed"] = sum(1 for run in runs if run["error"] or not run["beatable"])
+    return summary
+
+
+def main():
+    parser = ArgumentParser(description="Times each stage of generating a Manual, over many seeds.")
+    parser.add_argument("--manuals", nargs="+", default=["small", "oj"], choices=[*presets, "oj", "custom"],
+                        help='Which Manuals to generate: synthetic presets, this repo\'s ("oj") or one sized by the options below ("custom").')
+    parser.add_argument("--seeds", type=int, default=10, help="How many seeds to generate of each Manual.")
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--locations", type=int, default=1000)
+    parser.add_argument("--regions", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--fan-out", type=int, default=2, help="How many categories each item and location is in, at most.")
+    parser.add_argument("--terms", type=int, default=3, help="How many items or categories a requirement mentions, at most.")
+    parser.add_argument("--optall", type=float, default=0.1, help="The share of requirements wrapped in {OptAll()}.")
+    parser.add_argument("--stage-timing", action="store_true", help="Also time every hook and stage with the Manual's own stage timing, over all the seeds.")
+    parser.add_argument("--json", help="Also write every run and the summaries to this file.")
+    args = parser.parse_args()
+
+    if args.stage_timing:
+        # read by src/Meta.py, so it has to be set before any Manual is imported
+        os.environ["MANUAL_STAGE_TIMING"] = "1"
+
+    synthetic = {
+        **presets,
+        "custom": SyntheticManual(items=args.items, locations=args.locations, regions=args.regions, categories=args.categories,
+                                  category_fan_out=args.fan_out, requires_terms=args.terms, optall_density=args.optall),
+    }
+
+    results = {}
+    for label in args.manuals:
+        if label == "oj":
+            package, description = load_repo_manual(), "this repo's Manual"
+        else:
+            package, description = load_synthetic_manual(label, synthetic[label]), synthetic[label].describe()
+
+        stage_timings = importlib.import_module(f"{package.__name__}.StageTiming").stage_timings
+        stage_timings.clear()
+        runs = [generate(package, seed) for seed in range(args.first_seed, args.first_seed + args.seeds)]
+        stage_timings.seeds = len(runs)
+        summary = summarize(runs)
+        results[label] = {
+            "manual": description,
+            "parameters": dataclasses.asdict(synthetic[label]) if label in synthetic else None,
+            "summary": summary,
+            "stage_timing": stage_timings.to_dict() if args.stage_timing else None,
+            "runs": runs,
+        }
+
+        print(f"{label}: {description}")
+        for name, timing in summary.items():
+            if name != "failed":
+                print(f"  {name}: {timing['median_ms']:.1f} ms median, {timing['mean_ms']:.1f} ms mean, {timing['max_ms']:.1f} ms max")
+        print(f"  {summary['failed']} of {len(runs)} seeds failed")
+        if args.stage_timing:
+            print("  stage timing, slowest in total first:")
+            for line in stage_timings.report():
+                print(f"    {line}")
+        for run in runs:
+            if run["error"]:
+                print(f"  seed {run['seed']}:\n{run['error']}")
+                break
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
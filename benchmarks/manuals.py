@@ -0,0 +1,167 @@
+"""Synthetic Manuals of any size for the benchmarks, and loading them (or this repo's own Manual) as worlds.
+
+A synthetic Manual is a copy of src with generated data files, imported as its own package so it registers its own
+world, just like an installed apworld. Its logic is always beatable: every item and location gets a tier, and a
+requirement only ever mentions items of a lower tier than whatever it's on.
+"""
+import dataclasses
+import importlib
+import json
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+
+repo_path = Path(__file__).parent.parent
+source_path = repo_path / "src"
+
+
+@dataclasses.dataclass(frozen=True)
+class SyntheticManual:
+    items: int
+    locations: int
+    regions: int
+    categories: int
+    # how many categories each item and location is in, at most
+    category_fan_out: int = 2
+    # how many items, counts and categories a requirement mentions, at most
+    requires_terms: int = 3
+    # the share of requirements wrapped in {OptAll()}
+    optall_density: float = 0.1
+    # how many toggle options there are, each one turning some categories off (or on, if it's off); since that can leave
+    # requirements on items that aren't in the pool, only benchmarks that stop before the fill should use them
+    options: int = 0
+    # how many kinds of item value there are, each item being worth up to 3 of them
+    values: int = 0
+    seed: int = 1
+
+    def describe(self) -> str:
+        return (
+            f"{self.items} items, {self.locations} locations, {self.regions} regions, {self.categories} categories"
+            f" (fan-out {self.category_fan_out}, {self.requires_terms} terms, {self.optall_density:.0%} OptAll)"
+            + (f", {self.options} options" if self.options else "")
+            + (f", {self.values} kinds of value" if self.values else "")
+        )
+
+
+presets = {
+    "small": SyntheticManual(items=100, locations=300, regions=10, categories=10),
+    "medium": SyntheticManual(items=500, locations=2000, regions=40, categories=30, requires_terms=4, optall_density=0.2),
+    "large": SyntheticManual(items=2000, locations=10000, regions=150, categories=80, category_fan_out=3, requires_terms=5, optall_density=0.3),
+}
+
+
+def make_data_files(manual: SyntheticManual, game: str) -> dict[str, object]:
+    """The contents of each data file of a synthetic Manual, by file name."""
+    rng = random.Random(manual.seed)
+    categories = [f"Category {index}" for index in range(manual.categories)]
+
+    def pick_categories() -> list[str]:
+        return rng.sample(categories, rng.randint(1, min(manual.category_fan_out, len(categories))))
+
+    # leave room in the locations for the filler, so the pool always fits
+    item_names = [f"Item {index}" for index in range(manual.items)]
+    items = [
+        {"name": name, "category": pick_categories(), "count": rng.choice([1, 1, 1, 2, 3]), "progression": True}
+        for name in item_names
+    ]
+    while items and sum(item["count"] for item in items) > manual.locations * 0.8:
+        items.pop()
+    value_names = [f"value{index}" for index in range(manual.values)]
+    for item in items:
+        if value_names:
+            item["value"] = {name: rng.randint(1, 5) for name in rng.sample(value_names, rng.randint(1, min(3, len(value_names))))}
+    item_names = [item["name"] for item in items]
+
+    def tier_of(index: int, length: int) -> float:
+        return index / max(length, 1)
+
+    def make_requires(tier: float) -> str:
+        """A requirement of only the items below the given tier."""
+        available = item_names[: int(tier * len(item_names))]
+        if not available:
+            return ""
+
+        terms = []
+        for _ in range(rng.randint(1, manual.requires_terms)):
+            item = items[rng.randrange(len(available))]
+            kind = rng.random()
+            if kind < 0.2 and item["count"] > 1:
+                terms.append(f"|{item['name']}:{rng.randint(2, item['count'])}|")
+            elif kind < 0.35:
+                terms.append(f"|@{rng.choice(item['category'])}|")
+            else:
+                terms.append(f"|{item['name']}|")
+
+        requires = terms[0]
+        for term in terms[1:]:
+            requires = f"({requires} or {term})" if rng.random() < 0.2 else f"{requires} and {term}"
+
+        if rng.random() < manual.optall_density:
+            requires = f"{{OptAll({requires})}}"
+        return requires
+
+    region_names = [f"Region {index}" for index in range(manual.regions)]
+    regions: dict[str, dict] = {name: {"connects_to": []} for name in region_names}
+    for index, name in enumerate(region_names):
+        if index == 0:
+            regions[name]["starting"] = True
+        else:
+            regions[region_names[rng.randrange(index)]]["connects_to"].append(name)
+            regions[name]["requires"] = make_requires(tier_of(index, len(region_names)) / 2)
+
+    locations = []
+    for index in range(manual.locations):
+        tier = tier_of(index, manual.locations)
+        location = {
+            "name": f"Location {index}",
+            "category": pick_categories(),
+            "region": region_names[int(tier * len(region_names))],
+        }
+        if index % 10:
+            # some locations of every tier are free, so there's always somewhere to start
+            location["requires"] = make_requires(tier)
+        locations.append(location)
+
+    option_names = [f"Option_{index}" for index in range(manual.options)]
+    category_table: dict[str, dict] = {category: {} for category in categories}
+    for category in category_table.values():
+        if option_names and rng.random() < 0.5:
+            category["yaml_option"] = [("!" if rng.random() < 0.25 else "") + rng.choice(option_names)]
+
+    goal_category = rng.choice([category for category in categories if any(category in item["category"] for item in items)] or categories)
+    locations.append({"name": "Goal", "victory": True, "requires": f"|@{goal_category}:50%|"})
+
+    return {
+        "game.json": {"game": game, "creator": "Benchmark", "filler_item_name": "Nothing"},
+        "items.json": items,
+        "locations.json": locations,
+        "regions.json": regions,
+        "categories.json": category_table,
+        "options.json": {"core": {}, "user": {name: {"type": "Toggle", "description": "Benchmark option", "default": True} for name in option_names}},
+        "meta.json": json.loads((source_path / "data" / "meta.json").read_text(encoding="utf-8")),
+    }
+
+
+def load_synthetic_manual(label: str, manual: SyntheticManual) -> ModuleType:
+    """Writes a synthetic Manual as its own world package and imports it, which registers its world."""
+    package_name = f"manual_benchmark_{label}"
+    packages_path = Path(tempfile.mkdtemp(prefix="manual_benchmarks_"))
+    package_path = packages_path / package_name
+
+    shutil.copytree(source_path, package_path, ignore=shutil.ignore_patterns("__pycache__", "data"))
+    (package_path / "data").mkdir()
+    for file_name, contents in make_data_files(manual, f"Benchmark{label.title()}").items():
+        (package_path / "data" / file_name).write_text(json.dumps(contents), encoding="utf-8")
+
+    sys.path.insert(0, str(packages_path))
+    return importlib.import_module(package_name)
+
+
+def load_repo_manual() -> ModuleType:
+    """Imports this repo's own Manual, with its real data."""
+    if str(repo_path) not in sys.path:
+        sys.path.insert(0, str(repo_path))
+    return importlib.import_module("src")
@@ -0,0 +1,118 @@
+"""Measures how the memory of a multiworld grows with the number of Manual slots in it.
+
+Generates multiworlds of 1, 2, 4, ... slots of the same Manual (see benchmarks/manuals.py), with tracemalloc tracing,
+and measures the memory still allocated once the worlds are generated and once the items are filled, along with the
+peak. With --stages, it also turns on the Manual's own memory profiling (src/MemoryProfile.py), which breaks each
+player's memory down by stage and by the part of the Manual that allocated it, and averages it over the players.
+
+    python -m benchmarks.memory --manual medium --slots 1 2 4 8 16
+    python -m benchmarks.memory --manual oj --slots 1 10 --stages --json memory.json
+"""
+from argparse import ArgumentParser
+import gc
+import importlib
+import json
+import os
+import time
+import tracemalloc
+
+from Fill import distribute_items_restrictive
+from test.general import setup_multiworld
+from worlds.AutoWorld import AutoWorldRegister
+
+from .manuals import load_repo_manual, load_synthetic_manual, presets
+
+
+def format_size(size: float) -> str:
+    return f"{size / 1024 / 1024:,.2f} MiB"
+
+
+def average_stages(profile: dict) -> dict:
+    """The memory profile's stages and subsystems, averaged over the players."""
+    stages = {}
+    for player_profile in profile.values():
+        for stage, memory in player_profile["stages"].items():
+            average = stages.setdefault(stage, {"retained": 0.0, "peak": 0.0, "subsystems": {}})
+            average["retained"] += memory["retained"] / len(profile)
+            average["peak"] += memory["peak"] / len(profile)
+            for subsystem, size in memory["subsystems"].items():
+                average["subsystems"][subsystem] = average["subsystems"].get(subsystem, 0.0) + size / len(profile)
+    return stages
+
+
+def measure(world_type, slots: int, seed: int, frames: int, memory_profile) -> dict:
+    gc.collect()
+    tracemalloc.start(frames)
+    baseline, _ = tracemalloc.get_traced_memory()
+    if memory_profile:
+        memory_profile.clear()
+
+    start = time.perf_counter()
+    multiworld = setup_multiworld([world_type] * slots, seed=seed)
+    generated, _ = tracemalloc.get_traced_memory()
+    distribute_items_restrictive(multiworld)
+    filled, peak = tracemalloc.get_traced_memory()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "slots": slots,
+        "generated": generated - baseline,
+        "filled": filled - baseline,
+        "peak": peak - baseline,
+        "per_slot": (filled - baseline) / slots,
+        "seconds": elapsed,
+        "stages": average_stages(memory_profile.to_dict()) if memory_profile else None,
+    }
+
+    del multiworld
+    gc.collect()
+    tracemalloc.stop()
+    return result
+
+
+def main():
+    parser = ArgumentParser(description="Measures how a multiworld's memory grows with its number of Manual slots.")
+    parser.add_argument("--manual", default="small", choices=[*presets, "oj"], help='This repo\'s Manual ("oj") or a synthetic preset.')
+    parser.add_argument("--slots", type=int, nargs="+", default=[1, 2, 4, 8], help="The numbers of slots to measure.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--stages", action="store_true", help="Also break the memory down by stage and subsystem, which is much slower.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    if args.stages:
+        # read by src/Meta.py, so it has to be set before the Manual is imported
+        os.environ["MANUAL_PROFILE_MEMORY"] = "1"
+
+    package = load_repo_manual() if args.manual == "oj" else load_synthetic_manual(args.manual, presets[args.manual])
+    world_type = AutoWorldRegister.world_types[importlib.import_module(f"{package.__name__}.manual_test").ManualTest.game]
+    memory_profiling = importlib.import_module(f"{package.__name__}.MemoryProfile")
+    memory_profile = memory_profiling.memory_profile if args.stages else None
+    frames = memory_profiling.traceback_frames if args.stages else 1
+
+    results = {"manual": args.manual, "runs": []}
+    print(f"{args.manual}: memory still allocated once generated and once filled, and the peak")
+    for slots in args.slots:
+        result = measure(world_type, slots, args.seed, frames, memory_profile)
+        results["runs"].append(result)
+
+        print(f"  {slots} slots: {format_size(result['generated'])} generated, {format_size(result['filled'])} filled,"
+              f" {format_size(result['peak'])} peak, {format_size(result['per_slot'])} per slot ({result['seconds']:.1f} s)")
+        if result["stages"]:
+            for stage, memory in result["stages"].items():
+                subsystems = sorted(memory["subsystems"].items(), key=lambda entry: entry[1], reverse=True)[:5]
+                print(f"    {stage}: {format_size(memory['retained'])} retained per player ("
+                      + ", ".join(f"{subsystem} {format_size(size)}" for subsystem, size in subsystems) + ")")
+
+    first, last = results["runs"][0], results["runs"][-1]
+    if last["slots"] != first["slots"]:
+        growth = (last["filled"] - first["filled"]) / (last["slots"] - first["slots"])
+        results["growth_per_slot"] = growth
+        print(f"  each slot past the first {first['slots']} adds {format_size(growth)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compares working out many Manual slots' option-dependent tables as each slot's create_regions needs them, and all at
+once beforehand with ManualWorld.pregenerate.
+
+Sets up a multiworld of 50+ slots of the same synthetic Manual (see benchmarks/manuals.py), with toggle options that
+turn its categories on and off and a random set of them per slot, then times every slot's create_regions: once on its
+own, then after ManualWorld.pregenerate. Each run starts with nothing shared yet.
+
+    python -m benchmarks.pregeneration --slots 50 100 200 --options 12
+    python -m benchmarks.pregeneration --manual medium --json pregeneration.json
+"""
+from argparse import ArgumentParser
+import dataclasses
+import importlib
+import json
+import random
+import time
+
+from test.general import setup_multiworld
+from worlds.AutoWorld import AutoWorldRegister, call_all
+
+from .manuals import load_synthetic_manual, presets
+
+
+def make_multiworld(world_type, slots: int, option_names: list[str], seed: int):
+    """A multiworld of the given number of slots, not generated yet, each with its own random set of the toggles."""
+    multiworld = setup_multiworld([world_type] * slots, steps=(), seed=seed)
+    rng = random.Random(seed)
+    for player in multiworld.get_game_players(world_type.game):
+        for name in option_names:
+            getattr(multiworld.worlds[player].options, name).value = rng.randint(0, 1)
+    return multiworld
+
+
+def run(world_type, helpers, slots: int, option_names: list[str], seed: int, pregenerate: bool) -> dict:
+    helpers.shared_category_enablement.clear()
+    helpers.shared_enabled_locations.clear()
+    multiworld = make_multiworld(world_type, slots, option_names, seed)
+
+    start = time.perf_counter()
+    fingerprints = world_type.pregenerate(multiworld) if pregenerate else None
+    pregenerated = time.perf_counter()
+    call_all(multiworld, "create_regions")
+    end = time.perf_counter()
+
+    return {
+        "fingerprints": fingerprints,
+        "pregenerate_ms": (pregenerated - start) * 1000,
+        "create_regions_ms": (end - pregenerated) * 1000,
+        "total_ms": (end - start) * 1000,
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Compares creating the regions of many Manual slots with and without pregenerating them.")
+    parser.add_argument("--manual", default="large", choices=list(presets), help="Which synthetic preset to use.")
+    parser.add_argument("--options", type=int, default=12, help="How many toggle options the Manual's categories depend on.")
+    parser.add_argument("--slots", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    manual = dataclasses.replace(presets[args.manual], options=args.options)
+    package = load_synthetic_manual(f"{args.manual}_options", manual)
+    world_type = AutoWorldRegister.world_types[importlib.import_module(f"{package.__name__}.manual_test").ManualTest.game]
+    helpers = importlib.import_module(f"{package.__name__}.Helpers")
+    option_names = [f"Option_{index}" for index in range(args.options)]
+
+    results = {"manual": manual.describe(), "runs": []}
+    print(manual.describe())
+    for slots in args.slots:
+        unplanned = run(world_type, helpers, slots, option_names, args.seed, False)
+        pregenerated = run(world_type, helpers, slots, option_names, args.seed, True)
+        speedup = unplanned["total_ms"] / pregenerated["total_ms"]
+        results["runs"].append({"slots": slots, "as_needed": unplanned, "pregenerated": pregenerated, "speedup": speedup})
+
+        print(f"  {slots} slots, {pregenerated['fingerprints']} distinct option sets:")
+        for label, result in (("as needed", unplanned), ("pregenerated", pregenerated)):
+            print(f"    {label}: {result['pregenerate_ms']:.1f} ms pregenerating + {result['create_regions_ms']:.1f} ms creating regions"
+                  f" = {result['total_ms']:.1f} ms")
+        print(f"    {speedup:.2f}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
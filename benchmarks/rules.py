@@ -0,0 +1,191 @@
+"""Measures how many requires checks per second the world's rules manage, by requirement shape.
+
+Generates a seed of a Manual (see benchmarks/manuals.py), then checks requires through world.check_requires, the
+same function every location and entrance rule calls, with a CollectionState that has none, half or all of the
+item pool collected. Two sets of requires are measured:
+ - the Manual's own locations and regions, grouped by the shape of their requires and how they're evaluated
+   (a requires_tree, a requires string or the legacy list)
+ - one requires of each shape (plain items, counts, categories, percentages, functions, nested parentheses, ...)
+   made from the Manual's items, so every shape is covered whether the Manual uses it or not
+infix_to_postfix and evaluate_postfix are also measured on their own, on the expressions those requires become.
+
+    python -m benchmarks.rules --manual oj --json rules.json
+"""
+from argparse import ArgumentParser
+import importlib
+import json
+import random
+import re
+import timeit
+from collections import defaultdict
+
+from BaseClasses import CollectionState
+
+from .manuals import load_repo_manual, load_synthetic_manual, presets
+
+collection_levels = {"empty": 0.0, "half": 0.5, "full": 1.0}
+
+
+def make_shapes(world, rng: random.Random) -> dict[str, dict]:
+    """One area of each requirement shape, made from the world's own items and categories."""
+    pool_counts = world.get_item_counts()
+    items = [name for name, item in world.item_name_to_item.items() if item.get("progression") and pool_counts.get(name)]
+    if len(items) < 5:
+        items = [name for name in world.item_name_to_item if pool_counts.get(name)]
+    a, b, c, d, e = rng.sample(items, 5)
+    counted = next((name for name in items if pool_counts.get(name, 0) >= 2), a)
+
+    categories = defaultdict(list)
+    for name, item in world.item_name_to_item.items():
+        for category in item.get("category", []):
+            categories[category].append(name)
+    category = max(categories, key=lambda name: len(categories[name]))
+
+    shapes = {
+        "plain item": {"requires": f"|{a}|"},
+        "plain items": {"requires": f"|{a}| and |{b}| and |{c}|"},
+        "count": {"requires": f"|{counted}:2|"},
+        "category": {"requires": f"|@{category}|"},
+        "category count": {"requires": f"|@{category}:3|"},
+        "percentage": {"requires": f"|@{category}:50%|"},
+        "function (OptOne)": {"requires": f"{{OptOne(|{counted}:2|)}} and |{a}|"},
+        "function (OptAll)": {"requires": f"{{OptAll(|{a}| and |@{category}:2|)}}"},
+        "nested parentheses": {"requires": f"((|{a}| or |{b}|) and (|{c}| or (|{d}| and |{e}|))) or |@{category}:2|"},
+        "legacy list": {"requires": [a, f"{counted}:2"]},
+        "legacy or": {"requires": [{"or": [a, b]}, [c, d]]},
+        "tree: plain items": {"requires_tree": {"and": [{"item": a}, {"item": b}, {"item": c}]}},
+        "tree: percentage": {"requires_tree": {"category": category, "count": "50%"}},
+        "tree: nested": {"requires_tree": {"or": [
+            {"and": [{"or": [{"item": a}, {"item": b}]}, {"or": [{"item": c}, {"and": [{"item": d}, {"item": e}]}]}]},
+            {"category": category, "count": 2},
+        ]}},
+    }
+    for label, area in shapes.items():
+        area["name"] = f"benchmark: {label}"
+    return shapes
+
+
+def classify(area: dict) -> str:
+    """Names the shape of an area's requires, and how the world evaluates it."""
+    requires = area.get("requires", "")
+    text = requires if isinstance(requires, str) else json.dumps(requires)
+
+    if not requires and "requires_tree" not in area:
+        return "no requires"
+
+    if "requires_tree" in area:
+        evaluated_as = "tree"
+    elif isinstance(requires, str):
+        evaluated_as = "string"
+    else:
+        evaluated_as = "list"
+
+    if "{" in text:
+        shape = "functions"
+    elif "(" in text:
+        shape = "nested parentheses"
+    elif "%" in text or re.search(r":\s*(all|half)\b", text, re.IGNORECASE):
+        shape = "percentages"
+    elif "@" in text:
+        shape = "categories"
+    elif ":" in text:
+        shape = "counts"
+    else:
+        shape = "plain items"
+
+    return f"{shape} ({evaluated_as})"
+
+
+def to_expression(requires: str) -> str:
+    """What a requires string looks like by the time it reaches infix_to_postfix, with every item met."""
+    expression = re.sub(r"\|[^|]+\|", "1", requires)
+    expression = re.sub(r"\s?\bAND\b\s?", "&", expression, flags=re.IGNORECASE)
+    return re.sub(r"\s?\bOR\b\s?", "|", expression, flags=re.IGNORECASE)
+
+
+def evaluations_per_second(check, checks_per_call: int, repeat: int) -> float:
+    timer = timeit.Timer(check)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat, number))
+    return number * checks_per_call / best
+
+
+def make_states(multiworld, player: int, rng: random.Random) -> dict[str, CollectionState]:
+    pool = [item for item in multiworld.itempool if item.player == player]
+    states = {}
+    for level, share in collection_levels.items():
+        state = CollectionState(multiworld)
+        for item in rng.sample(pool, int(len(pool) * share)):
+            state.collect(item, True)
+        states[level] = state
+    return states
+
+
+def main():
+    parser = ArgumentParser(description="Measures requires checks per second, by requirement shape.")
+    parser.add_argument("--manual", default="oj", choices=[*presets, "oj"], help='This repo\'s Manual ("oj") or a synthetic preset.')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="How many times to measure each, keeping the best.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    package = load_repo_manual() if args.manual == "oj" else load_synthetic_manual(args.manual, presets[args.manual])
+    test = importlib.import_module(f"{package.__name__}.manual_test").ManualTest()
+    test.world_setup(args.seed)
+    world, multiworld, player = test.world, test.multiworld, test.player
+
+    rng = random.Random(args.seed)
+    states = make_states(multiworld, player, rng)
+    results = {"manual": args.manual, "world": {}, "shapes": {}, "postfix": {}}
+
+    # the Manual's own requires, grouped by shape
+    placed_locations = {location.name for location in multiworld.get_locations(player)}
+    areas = [location for name, location in world.location_name_to_location.items() if name in placed_locations]
+    areas += [{**region, "name": name, "is_region": True} for name, region in importlib.import_module(f"{package.__name__}.Data").region_table.items()]
+    groups = defaultdict(list)
+    for area in areas:
+        groups[classify(area)].append(area)
+
+    for group, group_areas in sorted(groups.items()):
+        results["world"][group] = {"areas": len(group_areas)}
+        for level, state in states.items():
+            def check_all(group_areas=group_areas, state=state):
+                for area in group_areas:
+                    world.check_requires(state, area)
+            results["world"][group][level] = evaluations_per_second(check_all, len(group_areas), args.repeat)
+
+    # one of each shape
+    for label, area in make_shapes(world, rng).items():
+        results["shapes"][label] = {}
+        for level, state in states.items():
+            results["shapes"][label][level] = evaluations_per_second(lambda area=area, state=state: world.check_requires(state, area), 1, args.repeat)
+
+        if isinstance(area.get("requires"), str) and "{" not in area["requires"]:
+            rules = importlib.import_module(f"{package.__name__}.Rules")
+            expression = to_expression(area["requires"])
+            postfix = rules.infix_to_postfix(expression, area)
+            results["postfix"][label] = {
+                "expression": expression,
+                "infix_to_postfix": evaluations_per_second(lambda: rules.infix_to_postfix(expression, area), 1, args.repeat),
+                "evaluate_postfix": evaluations_per_second(lambda: rules.evaluate_postfix(postfix, area), 1, args.repeat),
+            }
+
+    levels = " / ".join(collection_levels)
+    print(f"{args.manual}: requires checks per second with {levels} of the pool collected")
+    print("  the Manual's requires:")
+    for group, result in results["world"].items():
+        print(f"    {group}, {result['areas']} areas: " + " / ".join(f"{result[level]:,.0f}" for level in collection_levels))
+    print("  one of each shape:")
+    for label, result in results["shapes"].items():
+        print(f"    {label}: " + " / ".join(f"{result[level]:,.0f}" for level in collection_levels))
+    print("  infix_to_postfix / evaluate_postfix calls per second:")
+    for label, result in results["postfix"].items():
+        print(f"    {label} ({result['expression']}): {result['infix_to_postfix']:,.0f} / {result['evaluate_postfix']:,.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
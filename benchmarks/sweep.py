@@ -0,0 +1,81 @@
+"""Measures collect/remove and sweep throughput on a Manual whose items are worth values.
+
+Generates and fills a seed of a synthetic Manual where every item is worth up to 3 kinds of value (see
+benchmarks/manuals.py), then measures how many items ManualWorld.collect and remove go through per second, and how
+many full sweeps (collecting everything reachable, from an empty state) run per second.
+
+    python -m benchmarks.sweep --manual medium --values 8
+    python -m benchmarks.sweep --manual large --values 20 --json sweep.json
+"""
+from argparse import ArgumentParser
+import dataclasses
+import importlib
+import json
+import timeit
+
+from BaseClasses import CollectionState
+from Fill import distribute_items_restrictive
+
+from .manuals import load_synthetic_manual, presets
+
+
+def best_of(check, repeat: int) -> tuple[int, float]:
+    """How many times the check ran, and its fastest total time, out of the repeats."""
+    timer = timeit.Timer(check)
+    number, _ = timer.autorange()
+    return number, min(timer.repeat(repeat, number))
+
+
+def main():
+    parser = ArgumentParser(description="Measures collect/remove and sweep throughput on a Manual with item values.")
+    parser.add_argument("--manual", default="medium", choices=list(presets), help="Which synthetic preset to use.")
+    parser.add_argument("--values", type=int, default=8, help="How many kinds of value the items can be worth.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="How many times to measure each, keeping the best.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    manual = dataclasses.replace(presets[args.manual], values=args.values)
+    package = load_synthetic_manual(f"{args.manual}_values", manual)
+    test = importlib.import_module(f"{package.__name__}.manual_test").ManualTest()
+    test.world_setup(args.seed)
+    distribute_items_restrictive(test.multiworld)
+    world, multiworld, player = test.world, test.multiworld, test.player
+    items = [item for item in multiworld.itempool if item.player == player and item.advancement]
+
+    def collect_and_remove():
+        state = CollectionState(multiworld)
+        for item in items:
+            world.collect(state, item)
+        for item in items:
+            world.remove(state, item)
+
+    def sweep():
+        state = CollectionState(multiworld)
+        # renamed from sweep_for_events in newer versions of Archipelago
+        (state.sweep_for_advancements if hasattr(state, "sweep_for_advancements") else state.sweep_for_events)()
+
+    number, best = best_of(collect_and_remove, args.repeat)
+    collects_per_second = number * len(items) * 2 / best
+    number, best = best_of(sweep, args.repeat)
+    sweeps_per_second = number / best
+
+    results = {
+        "manual": manual.describe(),
+        "progression_items": len(items),
+        "collects_and_removes_per_second": collects_per_second,
+        "sweeps_per_second": sweeps_per_second,
+        "sweep_ms": 1000 / sweeps_per_second,
+    }
+
+    print(f"{manual.describe()}: {len(items)} progression items")
+    print(f"  collect/remove: {collects_per_second:,.0f} items per second")
+    print(f"  sweep from an empty state: {sweeps_per_second:,.2f} per second ({results['sweep_ms']:.1f} ms each)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
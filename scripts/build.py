@@ -1,5 +1,8 @@
-from dataclasses import dataclass
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 import re
+import time
 from dataclasses_json import DataClassJsonMixin
 from pathlib import Path
 from typing import Optional
@@ -34,8 +37,48 @@ class ContentData(DataClassJsonMixin):
     victory_campaign: str
 
 
+@dataclass
+class VariantData:
+    victory_campaign: Optional[str] = None
+    # DLC names to keep, leave unset to keep all of them
+    dlc: Optional[list[str]] = None
+
+    def apply(self, content: ContentData) -> ContentData:
+        def is_included(dlc: str | None):
+            return self.dlc is None or dlc is None or dlc in self.dlc
+
+        return replace(
+            content,
+            victory_campaign=self.victory_campaign or content.victory_campaign,
+            campaigns={
+                name: info
+                for name, info in content.campaigns.items()
+                if is_included(info.dlc)
+            },
+            characters={
+                name: info
+                for name, info in content.characters.items()
+                if is_included(info.dlc)
+            },
+            card_packs={
+                name: cards
+                for name, cards in content.card_packs.items()
+                if name == "Base Pack" or is_included(name)
+            },
+        )
+
+
+@dataclass
+class VariantsData(DataClassJsonMixin):
+    variants: dict[str, VariantData]
+
+
 class OrangeJuiceWorldBuilder(WorldBuilder):
-    dlc_categories: dict[str, Category] = {}
+    dlc_categories: dict[str, Category]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.dlc_categories = {}
 
     def resolve_dlc_category(self, name: str | None) -> list[Category]:
         if not name:
@@ -58,11 +101,19 @@ class OrangeJuiceWorldBuilder(WorldBuilder):
 
         return [dlc_category]
 
-    def build(self):
-        content = ContentData.from_json(
-            Path("src/data/content.json").read_text(encoding="utf-8")
+    def build(self, incremental: bool = False, compact: bool = False):
+        self.add_content(load_content())
+        self.optimize_requirements()
+        self.generate_data().build_world(incremental=incremental, compact=compact)
+
+    def build_variant(self, name: str, variant: VariantData, compact: bool = False):
+        self.add_content(variant.apply(load_content()))
+        self.optimize_requirements()
+        return self.generate_data(write_source=False).build_world(
+            compact=compact, variant=name
         )
 
+    def add_content(self, content: ContentData):
         characters_category = self.category(
             "Characters",
             yaml_option=self.toggle_option(
@@ -194,7 +245,36 @@ class OrangeJuiceWorldBuilder(WorldBuilder):
             category=["((Victory))"],
         )
 
-        self.generate_data().build_world()
+
+def load_content():
+    return ContentData.from_json(
+        Path("src/data/content.json").read_text(encoding="utf-8")
+    )
+
+
+def build_variant(name: str, variant: VariantData, compact: bool):
+    """Builds one variant from scratch. Runs in a worker process."""
+    start = time.perf_counter()
+    output = OrangeJuiceWorldBuilder().build_variant(name, variant, compact=compact)
+    return name, time.perf_counter() - start, output.output_path
+
+
+def build_variants(variants: dict[str, VariantData], compact: bool, jobs: int | None):
+    start = time.perf_counter()
+    results: list[tuple[str, float, Path | None]] = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(build_variant, name, variant, compact)
+            for name, variant in variants.items()
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    print()
+    print(f"built {len(results)} variant(s) in {time.perf_counter() - start:.2f}s")
+    for name, elapsed, output_path in sorted(results):
+        print(f"  {name}: {elapsed:.2f}s -> {output_path}")
 
 
 def to_snake_case(text: str):
@@ -203,5 +283,39 @@ def to_snake_case(text: str):
 
 
 if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Generates the world data and builds the apworld."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite, recopy and rezip files that changed since the last incremental build.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Minify the JSON data files shipped in the apworld. The files in src/data stay pretty-printed.",
+    )
+    parser.add_argument(
+        "--variants",
+        type=Path,
+        help="Path to a JSON file of variants to build, each as its own apworld, instead of the main world.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="How many variants to build at once. Defaults to the number of CPUs.",
+    )
+    args = parser.parse_args()
+
+    if args.variants and args.incremental:
+        parser.error("--incremental is not supported for variant builds")
+
     load_dotenv()
-    OrangeJuiceWorldBuilder().build()
+    if args.variants:
+        variants = VariantsData.from_json(args.variants.read_text(encoding="utf-8"))
+        build_variants(variants.variants, compact=args.compact, jobs=args.jobs)
+    else:
+        OrangeJuiceWorldBuilder().build(
+            incremental=args.incremental, compact=args.compact
+        )
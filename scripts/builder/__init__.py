@@ -4,12 +4,23 @@ import dataclasses
 from dataclasses_json import DataClassJsonMixin
 import json
 from pathlib import Path
-from typing import Unpack
+from typing import Iterable, Unpack
 
 from .options import ToggleOption, ToggleOptionArgs
 from .location import Location, LocationArgs
 from .item import Item, ItemArgs
 from .category import Category, CategoryArgs
+from .region import Region, RegionArgs
+from .optimize import hoist_shared_requirements
+from .compact import compact_json_files, is_data_file
+from .incremental import (
+    BuildManifest,
+    SourceChanges,
+    hash_file,
+    sync_tree,
+    update_archive,
+    write_if_changed,
+)
 
 
 @dataclasses.dataclass
@@ -18,11 +29,23 @@ class GameInfo(DataClassJsonMixin):
     creator: str
 
 
+regions_path = Path("src/data/regions.json")
+regions_schema = "https://github.com/ManualForArchipelago/Manual/raw/main/schemas/Manual.regions.schema.json"
+
+
 class WorldBuilder:
-    items: dict[str, Item] = {}
-    locations: dict[str, Location] = {}
-    categories: dict[str, Category] = {}
-    options: dict[str, ToggleOption] = {}
+    items: dict[str, Item]
+    locations: dict[str, Location]
+    categories: dict[str, Category]
+    options: dict[str, ToggleOption]
+    regions: dict[str, Region]
+
+    def __init__(self) -> None:
+        self.items = {}
+        self.locations = {}
+        self.categories = {}
+        self.options = {}
+        self.regions = {}
 
     def item(self, name: str, **kwargs: Unpack[ItemArgs]):
         return self.__set_unique("Items", self.items, name, Item(name=name, **kwargs))
@@ -42,7 +65,55 @@ class WorldBuilder:
             "Options", self.options, name, ToggleOption(name, **kwargs)
         )
 
-    def generate_data(self):
+    def region(self, name: str, **kwargs: Unpack[RegionArgs]):
+        return self.__set_unique(
+            "Regions", self.regions, name, Region(name, **kwargs)
+        )
+
+    def optimize_requirements(self, keep: Iterable[str] = ()):
+        """Hoists requirements shared by several locations into regions,
+        so each one is only evaluated once when entering its region.
+        Locations named in `keep` keep their own requires,
+        for the ones hooks read or change.
+        The new regions get names that aren't used by the hand-written regions in src/data/regions.json,
+        and are made starting regions when some of those are, since nothing connects to them."""
+        hand_written = read_hand_written_regions()
+        hoisted = hoist_shared_requirements(
+            self.locations, self.regions, keep=set(keep), reserved=hand_written.keys()
+        )
+        if not hoisted:
+            return
+
+        if any(
+            region.get("starting")
+            for region in [*hand_written.values(), *(it.data for it in self.regions.values())]
+        ):
+            for region in hoisted:
+                region.data["starting"] = True
+
+        hoisted_names = {region.name for region in hoisted}
+        hoisted_locations = [
+            location
+            for location in self.locations.values()
+            if location.data.get("region") in hoisted_names
+        ]
+        print(
+            f"hoisted the requires of {len(hoisted_locations)} locations"
+            f" into {len(hoisted)} regions"
+        )
+        print(
+            "  hoisted locations have no requires of their own anymore:"
+            " hooks that read or change a location's requires won't find them there,"
+            " and anything they add is checked on top of its region's."
+            " Pass those locations to optimize_requirements(keep=...) to leave them alone."
+        )
+
+    def generate_data(self, write_source: bool = True):
+        """Serializes everything added to the builder.
+        With `write_source`, the data files in src/data are updated as well;
+        variant builds turn it off, so they don't overwrite each other's data.
+        regions.json is only written when the builder has regions to add to it or remove from it,
+        see `merge_regions`."""
         computed_item_count = sum(
             item.data.get("count", 1) for item in self.items.values()
         )
@@ -50,39 +121,59 @@ class WorldBuilder:
         print(f"{len(self.locations)} locations")
         print(f"{len(self.categories)} categories")
         print(f"{len(self.options)} options")
+        print(f"{len(self.regions)} regions")
 
-        Path("src/data/items.json").write_text(
-            json.dumps(
-                [it.data for it in self.items.values()],
-                indent=4,
-            )
-        )
+        data_files = {
+            "items.json": [it.data for it in self.items.values()],
+            "locations.json": [it.data for it in self.locations.values()],
+            "categories.json": {k: opt.data for k, opt in self.categories.items()},
+            "options.json": {
+                "core": {},
+                "user": {k: opt.data for k, opt in self.options.items()},
+            },
+        }
 
-        Path("src/data/locations.json").write_text(
-            json.dumps(
-                [it.data for it in self.locations.values()],
-                indent=4,
-            )
-        )
+        regions = self.merge_regions()
+        if regions is not None:
+            data_files["regions.json"] = regions
 
-        Path("src/data/categories.json").write_text(
-            json.dumps(
-                {k: opt.data for k, opt in self.categories.items()},
-                indent=4,
-            )
-        )
+        if write_source:
+            for file_name, data in data_files.items():
+                path = Path("src/data") / file_name
+                if not write_if_changed(path, json.dumps(data, indent=4)):
+                    print(f"{file_name} unchanged")
 
-        Path("src/data/options.json").write_text(
-            json.dumps(
-                {
-                    "core": {},
-                    "user": {k: opt.data for k, opt in self.options.items()},
-                },
-                indent=4,
-            )
+        return BuilderOutput(data_files)
+
+    def merge_regions(self) -> dict[str, object] | None:
+        """The regions from src/data/regions.json with the builder's added to them.
+        Regions the builder adds are marked as generated, and the ones marked by an earlier build
+        are replaced; every other region in the file is hand-written and kept as-is.
+        Returns None when there's nothing to add or replace, so the file doesn't need to be written."""
+        existing = (
+            json.loads(regions_path.read_text("utf-8"))
+            if regions_path.exists()
+            else {"$schema": regions_schema}
         )
+        hand_written = {
+            name: region
+            for name, region in existing.items()
+            if not (isinstance(region, dict) and region.get("generated"))
+        }
+
+        if not self.regions and len(hand_written) == len(existing):
+            return None
 
-        return BuilderOutput()
+        for name in self.regions:
+            if name in hand_written:
+                raise Exception(
+                    f'region "{name}" is already hand-written in "{regions_path}"'
+                )
+
+        return {
+            **hand_written,
+            **{k: {**region.data, "generated": True} for k, region in self.regions.items()},
+        }
 
     @staticmethod
     def __set_unique[K, V](dict_name: str, dict: dict[K, V], key: K, value: V) -> V:
@@ -93,26 +184,132 @@ class WorldBuilder:
 
 
 class BuilderOutput:
-    def build_world(self):
-        game_info = GameInfo.from_json(Path("src/data/game.json").read_text("utf-8"))
+    data_files: dict[str, object]
+    output_path: Path | None
+
+    def __init__(self, data_files: dict[str, object]) -> None:
+        self.data_files = data_files
+        self.output_path = None
+
+    def build_world(
+        self,
+        incremental: bool = False,
+        compact: bool = False,
+        variant: str | None = None,
+    ):
+        """Packages src into an .apworld.
+        A `variant` build gets its own game name (and so its own apworld),
+        with the generated data files written over the ones copied from src.
+        Variant builds are always full builds."""
+        game_data = json.loads(Path("src/data/game.json").read_text("utf-8"))
+        if variant:
+            game_data["game"] = f"{game_data['game']}_{variant}"
+            incremental = False
+
+        game_info = GameInfo.from_dict(game_data)
         world_name = f"manual_{game_info.game}_{game_info.creator}"
 
         source_dir = Path("src")
         dist_dir = Path("dist")
         temp_dir = dist_dir / world_name
 
+        output_folder = (
+            os.getenv("OUTPUT_FOLDER") or "C:/ProgramData/Archipelago/custom_worlds"
+        )
+        output_path = Path(output_folder) / f"{world_name}.apworld"
+        self.output_path = output_path
+
+        if incremental and self.__build_incremental(
+            world_name, source_dir, temp_dir, output_path, compact
+        ):
+            return self
+
         if temp_dir.exists():
             shutil.rmtree(temp_dir)
         shutil.copytree(source_dir, temp_dir)
 
+        if variant:
+            for file_name, data in {**self.data_files, "game.json": game_data}.items():
+                (temp_dir / "data" / file_name).write_text(
+                    json.dumps(data, indent=4), encoding="utf-8"
+                )
+
+        if compact:
+            compact_json_files(sorted((temp_dir / "data").glob("*.json")))
+
         output_zip = shutil.make_archive(
-            world_name, "zip", root_dir=dist_dir, base_dir="."
+            world_name, "zip", root_dir=dist_dir, base_dir=world_name
         )
-        output_folder = (
-            os.getenv("OUTPUT_FOLDER") or "C:/ProgramData/Archipelago/custom_worlds"
-        )
-        output_path = Path(output_folder) / f"{world_name}.apworld"
         shutil.move(output_zip, output_path)
         print(f"saved world to {output_path}")
 
+        if incremental:
+            manifest = BuildManifest(manifest_path(world_name))
+            manifest.files = SourceChanges(source_dir, manifest).hashes
+            manifest.archive = hash_file(output_path)
+            manifest.compact = compact
+            manifest.save()
+
         return self
+
+    @staticmethod
+    def __build_incremental(
+        world_name: str,
+        source_dir: Path,
+        temp_dir: Path,
+        output_path: Path,
+        compact: bool,
+    ) -> bool:
+        """Brings the staging folder and the .apworld up to date with the source folder.
+        Returns False when there's no usable previous build to update,
+        meaning a full build is needed."""
+        manifest = BuildManifest(manifest_path(world_name))
+
+        if (
+            not manifest.files
+            or not temp_dir.exists()
+            or not output_path.exists()
+            or manifest.archive != hash_file(output_path)
+            or manifest.compact != compact
+        ):
+            return False
+
+        changes = SourceChanges(source_dir, manifest)
+        if not changes:
+            print(f"world is up to date at {output_path}")
+            return True
+
+        sync_tree(source_dir, temp_dir, changes)
+        if compact:
+            compact_json_files(
+                [temp_dir / name for name in changes.changed if is_data_file(name)]
+            )
+        update_archive(output_path, temp_dir, world_name, changes)
+
+        manifest.files = changes.hashes
+        manifest.archive = hash_file(output_path)
+        manifest.save()
+
+        print(
+            f"updated {len(changes.changed)} changed and {len(changes.removed)} removed file(s)"
+        )
+        print(f"saved world to {output_path}")
+        return True
+
+
+def read_hand_written_regions() -> dict[str, dict]:
+    """The regions in src/data/regions.json that weren't added by the builder."""
+    if not regions_path.exists():
+        return {}
+
+    regions = json.loads(regions_path.read_text("utf-8"))
+    return {
+        name: region
+        for name, region in regions.items()
+        if isinstance(region, dict) and not region.get("generated")
+    }
+
+
+def manifest_path(world_name: str):
+    # kept outside of dist/, since everything in there ends up in the archive
+    return Path(".build_cache") / f"{world_name}.json"
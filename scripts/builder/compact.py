@@ -0,0 +1,54 @@
+import json
+import timeit
+from pathlib import Path
+
+
+def is_data_file(name: str):
+    return name.startswith("data/") and name.endswith(".json")
+
+
+def compact_json_files(paths: list[Path]):
+    """Rewrites each JSON file without whitespace,
+    and prints how much smaller and faster to load it got."""
+    total_before = 0
+    total_after = 0
+
+    for path in paths:
+        pretty = path.read_text(encoding="utf-8")
+        compact = json.dumps(json.loads(pretty), separators=(",", ":"))
+        path.write_text(compact, encoding="utf-8")
+
+        before = len(pretty.encode("utf-8"))
+        after = len(compact.encode("utf-8"))
+        total_before += before
+        total_after += after
+
+        print(
+            f"{path.name}: {format_size(before)} -> {format_size(after)}"
+            f" ({format_delta(before, after)}),"
+            f" load {format_time(measure_load(pretty))} -> {format_time(measure_load(compact))}"
+        )
+
+    if paths:
+        print(
+            f"data total: {format_size(total_before)} -> {format_size(total_after)}"
+            f" ({format_delta(total_before, total_after)})"
+        )
+
+
+def measure_load(text: str, number: int = 20):
+    return timeit.timeit(lambda: json.loads(text), number=number) / number
+
+
+def format_size(size: int):
+    return f"{size / 1024:.1f} KB"
+
+
+def format_delta(before: int, after: int):
+    if before == 0:
+        return "+0%"
+    return f"{(after - before) / before:+.0%}"
+
+
+def format_time(seconds: float):
+    return f"{seconds * 1000:.2f} ms"
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+
+def hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Writes `text` to `path` unless the file already has exactly that content.
+    Returns whether the file was written."""
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+class BuildManifest:
+    """Remembers the hash of every source file that went into the last build,
+    so the next build only has to touch what changed since then."""
+
+    path: Path
+    files: dict[str, str]
+    archive: str | None
+    compact: bool
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.files = {}
+        self.archive = None
+        self.compact = False
+
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                self.files = data.get("files", {})
+                self.archive = data.get("archive")
+                self.compact = data.get("compact", False)
+            except json.JSONDecodeError:
+                pass
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(
+                {"files": self.files, "archive": self.archive, "compact": self.compact},
+                indent=4,
+            ),
+            encoding="utf-8",
+        )
+
+
+class SourceChanges:
+    changed: list[str]
+    removed: list[str]
+    hashes: dict[str, str]
+
+    def __init__(self, source_dir: Path, manifest: BuildManifest) -> None:
+        self.hashes = {
+            path.relative_to(source_dir).as_posix(): hash_file(path)
+            for path in sorted(source_dir.rglob("*"))
+            if path.is_file()
+        }
+        self.changed = [
+            name
+            for name, digest in self.hashes.items()
+            if manifest.files.get(name) != digest
+        ]
+        self.removed = [name for name in manifest.files if name not in self.hashes]
+
+    def __bool__(self):
+        return bool(self.changed or self.removed)
+
+
+def sync_tree(source_dir: Path, target_dir: Path, changes: SourceChanges):
+    """Copies changed files and deletes removed ones, leaving everything else in place."""
+    for name in changes.changed:
+        target = target_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source_dir / name, target)
+
+    for name in changes.removed:
+        (target_dir / name).unlink(missing_ok=True)
+
+
+def update_archive(
+    archive_path: Path, staging_dir: Path, prefix: str, changes: SourceChanges
+):
+    """Rewrites only the changed members of an existing .apworld archive.
+    Unchanged members are copied over from the previous archive."""
+    replaced = {f"{prefix}/{name}" for name in [*changes.changed, *changes.removed]}
+    temp_path = archive_path.with_name(archive_path.name + ".tmp")
+
+    with (
+        zipfile.ZipFile(archive_path) as old_zip,
+        zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as new_zip,
+    ):
+        for info in old_zip.infolist():
+            if info.filename not in replaced:
+                new_zip.writestr(info, old_zip.read(info))
+
+        for name in changes.changed:
+            new_zip.write(staging_dir / name, f"{prefix}/{name}")
+
+    os.replace(temp_path, archive_path)
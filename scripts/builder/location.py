@@ -1,19 +1,30 @@
 from dataclasses import dataclass
-from typing import NotRequired, Optional, TypedDict, Unpack
+import re
+from typing import Any, NotRequired, Optional, TypedDict, Unpack
 from .item import Item
 from .category import Category
 
 
+type RequirementTree = dict[str, Any]
+
+
 class RequirementNode:
     def to_string(self):
         raise NotImplementedError()
 
+    def to_tree(self) -> RequirementTree:
+        """The normalized form of this requirement, which the world evaluates
+        directly instead of parsing the requires string."""
+        raise NotImplementedError()
+
 
 @dataclass
 class RequirementSubject(RequirementNode):
     name: str
     amount: Optional[str | int] = None
     is_category: bool = False
+    # clamps the amount to how many are in the pool, like OptOne/OptAll
+    optional: bool = False
 
     @staticmethod
     def normalize(input: Item | Category, amount: str | int | None = None):
@@ -34,8 +45,22 @@ class RequirementSubject(RequirementNode):
 
         result += "|"
 
+        if self.optional:
+            result = f"{{OptOne({result})}}"
+
         return result
 
+    def to_tree(self):
+        tree: RequirementTree = {"category" if self.is_category else "item": self.name}
+
+        if self.amount != None:
+            tree["count"] = self.amount
+
+        if self.optional:
+            tree["optional"] = True
+
+        return tree
+
 
 @dataclass
 class RequirementBinaryExpression(RequirementNode):
@@ -47,6 +72,21 @@ class RequirementBinaryExpression(RequirementNode):
         members = infix.join(node.to_string() for node in self.children)
         return f"({members})"
 
+    def to_tree(self):
+        return {self.operator.lower(): [node.to_tree() for node in self.children]}
+
+
+@dataclass
+class RequirementFunction(RequirementNode):
+    name: str
+    args: str
+
+    def to_string(self):
+        return f"{{{self.name}({self.args})}}"
+
+    def to_tree(self):
+        return {"function": self.name, "args": self.args}
+
 
 type RequirementInput = str | Item | Category | RequirementNode
 
@@ -64,6 +104,171 @@ def serialize_requirement(input: RequirementInput) -> str:
     return input.to_string()
 
 
+def serialize_requirement_tree(input: RequirementInput) -> Optional[RequirementTree]:
+    """The tree the world checks instead of the requires string,
+    or None if the requires call a function that could return a requires string of its own."""
+    if isinstance(input, Item):
+        return RequirementSubject(input.name).to_tree()
+
+    if isinstance(input, Category):
+        return RequirementSubject(input.name, is_category=True).to_tree()
+
+    node = parse_requirement(input) if isinstance(input, str) else input
+    if not only_boolean_functions(node):
+        return None
+
+    return simplify_requirement_tree(node.to_tree())
+
+
+# functions that return whether they're met, which the tree can check wherever they are in the requires.
+# Any other function (like the ones from hooks) can return a requires string instead, which the world pastes into
+# the requires without parentheses, so its "and" and "or" mix with the ones around it; those requires get no tree.
+boolean_requirement_functions = {"ItemValue", "YamlEnabled", "YamlDisabled", "YamlCompare", "canReachLocation"}
+
+
+def only_boolean_functions(node: RequirementNode) -> bool:
+    if isinstance(node, RequirementFunction):
+        return node.name in boolean_requirement_functions
+
+    if isinstance(node, RequirementBinaryExpression):
+        return all(only_boolean_functions(child) for child in node.children)
+
+    return True
+
+
+always_met: RequirementTree = {"and": []}
+
+
+def simplify_requirement_tree(tree: RequirementTree) -> RequirementTree:
+    """Drops wrappers that don't change the result: nested "and"/"or" of the same kind
+    are flattened, duplicate children are removed, always met children of an "and"
+    are skipped, and single child "and"/"or" are replaced by that child."""
+    for operator in ("and", "or"):
+        if operator not in tree:
+            continue
+
+        children: list[RequirementTree] = []
+
+        for child in tree[operator]:
+            child = simplify_requirement_tree(child)
+
+            if child == always_met:
+                if operator == "or":
+                    return always_met
+                continue
+
+            for member in child[operator] if list(child) == [operator] else [child]:
+                if member not in children:
+                    children.append(member)
+
+        if len(children) == 1:
+            return children[0]
+
+        return {operator: children}
+
+    return tree
+
+
+opt_all_pattern = re.compile(r"\{OptAll\((?P<args>.*?)\)\}")
+opt_all_member_pattern = re.compile(r"(?P<function>\{\w+\(.*?\)\})|(?P<subject>\|[^|]+\|)")
+
+
+def splice_opt_all(text: str) -> str:
+    """Replaces each OptAll that isn't empty with its requires, every item and category in them made an OptOne,
+    which is what the world pastes in its place before evaluating the requires."""
+
+    def splice(match: re.Match[str]) -> str:
+        if not match["args"].strip():
+            return match.group()
+
+        return opt_all_member_pattern.sub(
+            lambda member: member["function"] or f"{{OptOne({member['subject']})}}",
+            match["args"],
+        )
+
+    return opt_all_pattern.sub(splice, text)
+
+
+requirement_token_pattern = re.compile(
+    r"\s*(?:(?P<subject>\|[^|]+\|)|(?P<function>\{(?P<name>\w+)\((?P<args>.*?)\)\})"
+    r"|(?P<operator>\b(?:and|or)\b)|(?P<paren>[()]))",
+    re.IGNORECASE,
+)
+
+
+def parse_requirement(text: str) -> RequirementNode:
+    """Parses a requires string the same way the world does:
+    "and" and "or" have the same precedence and are evaluated left to right.
+    OptAll is spliced into the requires like the world does, and OptOne is resolved into an optional subject;
+    other functions are kept as-is to be called by the world."""
+    spliced = splice_opt_all(text)
+    tokens: list[re.Match[str]] = []
+    position = 0
+
+    while position < len(spliced.rstrip()):
+        match = requirement_token_pattern.match(spliced, position)
+        if not match:
+            raise ValueError(f'Invalid requirement syntax at "{spliced[position:]}" in "{text}"')
+        tokens.append(match)
+        position = match.end()
+
+    def parse_operand(index: int) -> tuple[RequirementNode, int]:
+        if index >= len(tokens):
+            raise ValueError(f'Requirement "{text}" ends unexpectedly')
+
+        token = tokens[index]
+
+        if token["paren"] == "(":
+            node, index = parse_expression(index + 1)
+            if index >= len(tokens) or tokens[index]["paren"] != ")":
+                raise ValueError(f'Missing closing parenthesis in "{text}"')
+            return node, index + 1
+
+        if token["subject"]:
+            return parse_subject(token["subject"]), index + 1
+
+        if token["function"]:
+            name, args = token["name"], token["args"]
+            if name == "OptAll" and not args.strip():
+                return RequirementBinaryExpression([], "and"), index + 1
+            if name == "OptOne" and args.strip():
+                subject = parse_subject(args.strip())
+                subject.optional = True
+                return subject, index + 1
+            return RequirementFunction(name, args), index + 1
+
+        raise ValueError(f'Unexpected "{token.group().strip()}" in "{text}"')
+
+    def parse_expression(index: int) -> tuple[RequirementNode, int]:
+        node, index = parse_operand(index)
+
+        while index < len(tokens) and tokens[index]["operator"]:
+            operator = tokens[index]["operator"].lower()
+            right, index = parse_operand(index + 1)
+            node = RequirementBinaryExpression([node, right], operator)
+
+        return node, index
+
+    node, index = parse_expression(0)
+    if index != len(tokens):
+        raise ValueError(f'Unexpected "{tokens[index].group().strip()}" in "{text}"')
+
+    return node
+
+
+def parse_subject(text: str) -> RequirementSubject:
+    is_category = "@" in text[:2]
+    name = text.lstrip("|@$").rstrip("|")
+    amount = None
+
+    parts = name.split(":")
+    if len(parts) > 1:
+        name = parts[0].strip()
+        amount = parts[1].strip()
+
+    return RequirementSubject(name, amount=amount, is_category=is_category)
+
+
 def some_of(subject: Item | Category, amount: str | int):
     return RequirementSubject.normalize(subject, amount)
 
@@ -79,6 +284,7 @@ class LocationData(LocationBase):
     name: str
     category: NotRequired[list[str]]
     requires: NotRequired[str]
+    requires_tree: NotRequired[RequirementTree]
 
 
 class LocationArgs(LocationBase):
@@ -102,3 +308,6 @@ class Location:
 
         if requires:
             self.data["requires"] = serialize_requirement(requires)
+            requires_tree = serialize_requirement_tree(requires)
+            if requires_tree is not None:
+                self.data["requires_tree"] = requires_tree
@@ -0,0 +1,71 @@
+import json
+from collections import defaultdict
+from collections.abc import Collection
+
+from .location import Location
+from .region import Region
+
+
+def hoist_shared_requirements(
+    locations: dict[str, Location],
+    regions: dict[str, Region],
+    min_shared: int = 2,
+    keep: Collection[str] = (),
+    reserved: Collection[str] = (),
+) -> list[Region]:
+    """Moves requirements shared by several region-less locations into one region per requirement.
+    The region's requires are checked once when entering it,
+    instead of once per location, and the locations don't need requires of their own.
+    Locations named in `keep` are left alone, for hooks that read or change their requires.
+    The new regions aren't given any of the names in `reserved`.
+    Returns the new regions."""
+    groups: dict[str, list[Location]] = defaultdict(list)
+
+    for location in locations.values():
+        if location.name in keep:
+            continue
+        if "region" in location.data or "requires_tree" not in location.data:
+            continue
+        key = json.dumps(location.data["requires_tree"], sort_keys=True)
+        groups[key].append(location)
+
+    hoisted: list[Region] = []
+
+    for group in groups.values():
+        if len(group) < min_shared:
+            continue
+
+        region = Region(
+            shared_region_name(group, regions, reserved),
+            requires=group[0].data["requires"],
+        )
+        regions[region.name] = region
+        hoisted.append(region)
+
+        for location in group:
+            del location.data["requires"]
+            del location.data["requires_tree"]
+            location.data["region"] = region.name
+
+    return hoisted
+
+
+def shared_region_name(group: list[Location], regions: dict[str, Region], reserved: Collection[str]):
+    # name the region after a category all of its locations share, if there is one
+    shared_categories = [
+        category
+        for category in group[0].data.get("category", [])
+        if all(category in location.data.get("category", []) for location in group)
+    ]
+
+    def is_taken(name: str):
+        return name in regions or name in reserved
+
+    for name in [*shared_categories, group[0].name]:
+        if not is_taken(name):
+            return name
+
+    index = 1
+    while is_taken(f"{group[0].name} ({index})"):
+        index += 1
+    return f"{group[0].name} ({index})"
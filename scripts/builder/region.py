@@ -0,0 +1,39 @@
+from typing import NotRequired, Optional, TypedDict, Unpack
+
+from .location import (
+    RequirementInput,
+    RequirementTree,
+    serialize_requirement,
+    serialize_requirement_tree,
+)
+
+
+class RegionBase(TypedDict):
+    connects_to: NotRequired[list[str]]
+    starting: NotRequired[bool]
+
+
+class RegionArgs(RegionBase):
+    requires: NotRequired[Optional[RequirementInput]]
+
+
+class RegionData(RegionBase):
+    requires: NotRequired[str]
+    requires_tree: NotRequired[RequirementTree]
+
+
+class Region:
+    name: str
+    data: RegionData
+
+    def __init__(self, name: str, **kwargs: Unpack[RegionArgs]) -> None:
+        requires = kwargs.pop("requires", None)
+
+        self.name = name
+        self.data = {**kwargs}
+
+        if requires:
+            self.data["requires"] = serialize_requirement(requires)
+            requires_tree = serialize_requirement_tree(requires)
+            if requires_tree is not None:
+                self.data["requires_tree"] = requires_tree
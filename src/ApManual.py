@@ -0,0 +1,80 @@
+import hashlib
+import json
+import zlib
+from base64 import b64decode
+
+# An .apmanual file tells the Manual client which game and slot a seed is for.
+#
+# The first version was the base64 of the client data as JSON: the game and slot along with every item, location,
+# region and category, which the client also gets from the installed apworld.
+# Since version 2, it's the magic bytes and a version byte, followed by zlib-compressed JSON with a hash of the apworld's
+# data, which the client compares to the installed apworld's. Version 2 files have either only the hash, or a full copy
+# of the data along with it.
+# Since version 3, the file only has what the seed changed from the data the hash identifies (see diff_client_data),
+# which the client merges onto the installed apworld's data when the hashes match.
+
+apmanual_magic = b"APMANUAL"
+apmanual_version = 3
+
+client_data_tables = ("items", "locations", "regions", "categories")
+
+
+def copy_client_data(data: dict) -> dict:
+    """A copy of the tables of the client data, as the JSON they're written as, so they can be compared."""
+    return json.loads(json.dumps({table: data[table] for table in client_data_tables}))
+
+
+def hash_client_data(data: dict) -> str:
+    """Hashes the tables of the client data, so the client can tell whether a seed's data is the installed apworld's."""
+    data = json.dumps([data[table] for table in client_data_tables], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def diff_client_data(base: dict, data: dict) -> dict:
+    """What the client data changed from `base` (a copy_client_data), by table: the entries that were added or changed,
+    in full, and the names of the ones that were removed. Tables that are the same are left out."""
+    data = copy_client_data(data)
+    changes = {}
+    for table in client_data_tables:
+        changed = {name: entry for name, entry in data[table].items() if base[table].get(name) != entry}
+        removed = [name for name in base[table] if name not in data[table]]
+        if changed or removed:
+            changes[table] = {"changed": changed, "removed": removed}
+    return changes
+
+
+def merge_client_data(base: dict, changes: dict) -> dict:
+    """The client data that diff_client_data found `changes` in, from the same `base`."""
+    data = {}
+    for table in client_data_tables:
+        table_changes = changes.get(table, {})
+        removed = set(table_changes.get("removed", []))
+        data[table] = {name: entry for name, entry in base[table].items() if name not in removed}
+        data[table].update(table_changes.get("changed", {}))
+    return data
+
+
+def write_apmanual_file(path: str, data: dict):
+    with open(path, 'wb') as f:
+        f.write(apmanual_magic + bytes([apmanual_version]))
+        f.write(zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 9))
+
+
+def read_apmanual_file(path: str) -> dict:
+    """Reads an .apmanual file of any version. The version it was written as is in "apmanual_version"."""
+    with open(path, 'rb') as f:
+        contents = f.read()
+
+    if not contents.startswith(apmanual_magic):
+        # the first version, base64 of the JSON
+        data = json.loads(b64decode(contents))
+        data["apmanual_version"] = 1
+        return data
+
+    version = contents[len(apmanual_magic)]
+    if version > apmanual_version:
+        raise Exception(f"This .apmanual file is from a newer version of Manual (format {version}), please update the Manual apworld.")
+
+    data = json.loads(zlib.decompress(contents[len(apmanual_magic) + 1:]))
+    data["apmanual_version"] = version
+    return data
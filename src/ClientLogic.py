@@ -0,0 +1,331 @@
+import math
+import re
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Optional
+
+from .Helpers import format_to_valid_identifier, get_requires_tree
+from .Rules import OptAll, OptOne, check_legacy_requires, evaluate_requires_string, get_category_item_names, \
+    get_legacy_requires_item_names, parse_requires_subject, resolve_require_count, run_requires_functions
+
+# Evaluates the requires of a Manual's regions and locations inside the client, from the same data the
+# .apmanual (or the installed apworld) provides, so in-logic locations can be highlighted without Universal Tracker.
+# Requires strings and the legacy list form are checked with the world's own functions from Rules.py,
+# and requires trees the way Rules.compile_require_tree does.
+#
+# It follows the world's rules closely but not exactly, since there's no generation to look at:
+#  - the item pool is taken to be each enabled item's "count", so hooks that change the pool aren't seen
+#  - YamlEnabled, YamlDisabled, YamlCompare, ItemValue, OptOne and OptAll are supported; any other function (like ones
+#    from hooks) can't be called here and counts as not met, so nothing is ever shown in logic when it might not be
+
+
+class CompiledRule:
+    """A requires tree turned into a closure, along with what it needs to be re-checked for."""
+
+    def __init__(self, check: Callable[[], bool], item_names: set[str], volatile: bool):
+        self.check = check
+        self.item_names = item_names  # re-check when any of these items is received
+        self.volatile = volatile  # re-check on every update, for functions that could depend on anything
+
+
+class ClientLogic:
+    """Tracks which locations are in logic for the items received so far.
+    Each update only re-checks the rules that mention the items that were just received,
+    then walks the region graph again only if a region's rule changed."""
+
+    def __init__(self, items: dict[str, dict], locations: dict[str, dict], regions: dict[str, dict],
+                 categories: dict[str, dict], options: dict[str, Any], maximum_recursion: int = 5):
+        self.items = items
+        self.locations = locations
+        self.categories = categories
+        self.options = options
+        self.maximum_recursion = maximum_recursion  # the world's rules_functions_maximum_recursion
+        self.counts: dict[str, int] = defaultdict(int)
+
+        self.pool_counts: dict[str, int] = {}
+        for item_name, item in items.items():
+            self.pool_counts[item_name] = int(item.get("count", 1)) if self.is_enabled(item) else 0
+
+        starting_regions = [name for name, region in regions.items() if region.get("starting")] or list(regions)
+        self.regions: dict[str, dict] = {**regions, "Manual": {"connects_to": starting_regions}}
+
+        # every rule is keyed by what it belongs to: ("region", name), ("location", name), or ("exit", from, to) and
+        # ("entrance", from, to) for the exit_requires and entrance_requires of a connection, which both have to be met like in the world
+        self.rules: dict[tuple, CompiledRule] = {}
+        self.results: dict[tuple, bool] = {}
+        self.rules_by_item: dict[str, set[tuple]] = defaultdict(set)
+        self.volatile_rules: set[tuple] = set()
+
+        for region_name, region in self.regions.items():
+            self.add_rule(("region", region_name), region)
+            for target, requires in region.get("exit_requires", {}).items():
+                self.add_rule(("exit", region_name, target), {"requires": requires})
+            for source, requires in region.get("entrance_requires", {}).items():
+                self.add_rule(("entrance", source, region_name), {"requires": requires})
+
+        self.locations_by_region: dict[str, list[str]] = defaultdict(list)
+        for location_name, location in locations.items():
+            if self.is_enabled(location):
+                self.add_rule(("location", location_name), location)
+                self.locations_by_region[location.get("region", "Manual")].append(location_name)
+
+        self.reachable_regions: set[str] = set()
+        self.in_logic: set[str] = set()
+        self.update_all()
+
+    def is_enabled(self, item_or_location: dict) -> bool:
+        """Same as Helpers._is_manualobject_enabled, using the options from the slot data."""
+        for category in item_or_location.get("category", []):
+            for option_name in self.categories.get(category, {}).get("yaml_option", []):
+                required = not option_name.startswith("!")
+                if self.is_option_enabled(option_name.lstrip("!")) != required:
+                    return False
+        return True
+
+    def is_option_enabled(self, option_name: str) -> bool:
+        value = self.options.get(format_to_valid_identifier(option_name), 0)
+        return isinstance(value, (int, float)) and value > 0
+
+    # OptOne and OptAll take the world for these two, to look up categories and the item pool
+    @property
+    def item_name_to_item(self) -> dict[str, dict]:
+        return self.items
+
+    def get_item_counts(self, player: Optional[int] = None, reset: bool = False) -> dict[str, int]:
+        return self.pool_counts
+
+    def add_rule(self, key: tuple, area: dict):
+        tree = get_requires_tree(area)
+        requires = area.get("requires")
+        if tree is not None:
+            rule = self.compile(tree)
+        elif not requires:
+            rule = CompiledRule(lambda: True, set(), False)
+        elif isinstance(requires, str):
+            rule = self.compile_string(requires, area)
+        else:
+            rule = self.compile_legacy(requires)
+
+        self.rules[key] = rule
+        for item_name in rule.item_names:
+            self.rules_by_item[item_name].add(key)
+        if rule.volatile:
+            self.volatile_rules.add(key)
+
+    def compile_string(self, requires: str, area: dict) -> CompiledRule:
+        """Checks a requires string like Rules.checkRequireStringForArea, running its functions with run_function."""
+        item_names: set[str] = set()
+        dynamic_functions: list[str] = []
+
+        def run_function(name: str, args: str):
+            if name == "ItemValue":
+                dynamic_functions.append(name)
+            return self.run_function(name, args, item_names)
+
+        try:
+            resolved = run_requires_functions(requires, area, self.maximum_recursion, run_function)
+            evaluate_requires_string(resolved, area, self.is_subject_met)
+        except (KeyError, ValueError, RecursionError):
+            # invalid requires, which the world would raise on
+            return CompiledRule(lambda: False, set(), False)
+
+        for subject in re.findall(r'\|[^|]+\|', resolved):
+            is_category, name, _ = parse_requires_subject(subject)
+            item_names.update(get_category_item_names(self.items, name) if is_category else [name])
+
+        if not dynamic_functions:
+            # the functions only depend on the options and the pool, so they always come out the same
+            return CompiledRule(lambda: evaluate_requires_string(resolved, area, self.is_subject_met), item_names, False)
+
+        return CompiledRule(lambda: evaluate_requires_string(run_requires_functions(requires, area, self.maximum_recursion, self.run_function),
+                                                             area, self.is_subject_met),
+                            item_names, False)
+
+    def compile_legacy(self, requires: list | dict) -> CompiledRule:
+        """Checks the legacy list form of requires like Rules.checkRequireDictForArea."""
+        counts = self.counts
+        try:
+            item_names = get_legacy_requires_item_names(requires)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return CompiledRule(lambda: False, set(), False)
+        return CompiledRule(lambda: check_legacy_requires(requires, lambda item_name, count: counts[item_name] >= count), item_names, False)
+
+    def is_subject_met(self, is_category: bool, name: str, count: str) -> bool:
+        """Whether an item or category of a requires string is met, like in Rules.checkRequireStringForArea."""
+        item_names = get_category_item_names(self.items, name) if is_category else [name]
+        if is_category and not item_names:
+            return False
+        pool_count = sum(self.pool_counts.get(item_name, 0) for item_name in item_names)
+        return sum(self.counts[item_name] for item_name in item_names) >= resolve_require_count(count, pool_count)
+
+    def run_function(self, name: str, args: str, item_names: Optional[set[str]] = None) -> bool | str:
+        """Runs a function of a requires string, for the ones that don't need a generation.
+        The items its result depends on are added to `item_names`."""
+        if name in ("YamlEnabled", "YamlDisabled"):
+            return self.is_option_enabled(args) == (name == "YamlEnabled")
+
+        if name == "YamlCompare":
+            return bool(self.compare_option(args))
+
+        if name == "ItemValue":
+            valued_items, required_value = self.get_valued_items(args)
+            if item_names is not None:
+                item_names.update(valued_items)
+            return sum(self.counts[item_name] * value for item_name, value in valued_items.items()) >= required_value
+
+        if name == "OptOne":
+            return OptOne(self, args, self.pool_counts)
+
+        if name == "OptAll":
+            return OptAll(self, None, None, None, args)
+
+        # hook functions and the like can't be called without a generation
+        return False
+
+    def get_valued_items(self, args: str) -> tuple[dict[str, int], float]:
+        """The items that are worth the value of ItemValue's `value:count` args, with what they're worth, and the count."""
+        value_name, _, required = args.partition(":")
+        value_name = value_name.strip()
+        valued_items = {item_name: item.get("value", {}).get(value_name, 0) for item_name, item in self.items.items()}
+        valued_items = {item_name: value for item_name, value in valued_items.items() if value}
+        required_value = int(required.strip()) if required.strip().isnumeric() else math.inf
+        return valued_items, required_value
+
+    def compile(self, node: dict) -> CompiledRule:
+        if "and" in node or "or" in node:
+            combine = all if "and" in node else any
+            children = [self.compile(child) for child in node.get("and", node.get("or"))]
+            checks = [child.check for child in children]
+            return CompiledRule(
+                lambda: combine(check() for check in checks),
+                set().union(*(child.item_names for child in children)),
+                any(child.volatile for child in children),
+            )
+
+        if "item" in node or "category" in node:
+            item_names = [node["item"]] if "item" in node else get_category_item_names(self.items, node["category"])
+            if "category" in node and not item_names:
+                # matches the world, where a category without any items is never met
+                return CompiledRule(lambda: False, set(), False)
+
+            pool_count = sum(self.pool_counts.get(item_name, 0) for item_name in item_names)
+            try:
+                required = resolve_require_count(node.get("count", 1), pool_count, node.get("optional", False))
+            except ValueError:
+                return CompiledRule(lambda: False, set(), False)
+
+            counts = self.counts
+            return CompiledRule(lambda: sum(counts[item_name] for item_name in item_names) >= required, set(item_names), False)
+
+        if "function" in node:
+            return self.compile_function(node["function"], node.get("args", ""))
+
+        return CompiledRule(lambda: False, set(), False)
+
+    def compile_function(self, name: str, args: str) -> CompiledRule:
+        if name in ("YamlEnabled", "YamlDisabled"):
+            enabled = self.is_option_enabled(args)
+            return CompiledRule(lambda: enabled == (name == "YamlEnabled"), set(), False)
+
+        if name == "YamlCompare":
+            result = self.compare_option(args)
+            return CompiledRule(lambda: bool(result), set(), False)
+
+        if name == "ItemValue":
+            valued_items, required_value = self.get_valued_items(args)
+            counts = self.counts
+            return CompiledRule(lambda: sum(counts[item_name] * value for item_name, value in valued_items.items()) >= required_value,
+                                set(valued_items), False)
+
+        # like the world, anything else is run and what it returns evaluated as a requires string (for OptOne and OptAll)
+        return self.compile_string(f"{{{name}({args})}}", {})
+
+    def compare_option(self, args: str) -> Optional[bool]:
+        """A subset of Rules.YamlCompare, for options with numeric values. Returns None when it can't tell."""
+        match = re.match(r"\s*(!?)\s*(.+?)\s*(==|!=|>=|<=|=|<|>)\s*(.+?)\s*$", args)
+        if not match:
+            return None
+
+        reverse, option_name, comparator, value = match.groups()
+        option_value = self.options.get(format_to_valid_identifier(option_name))
+        if not isinstance(option_value, (int, float)) or not value.lstrip("-").isnumeric():
+            return None
+
+        value = int(value)
+        result = {
+            "==": option_value == value, "=": option_value == value, "!=": option_value != value,
+            ">=": option_value >= value, "<=": option_value <= value, "<": option_value < value, ">": option_value > value,
+        }[comparator]
+        return result != bool(reverse)
+
+    def set_counts(self, counts: dict[str, int]) -> bool:
+        """Sets how many of each item in `counts` have been received (by name); items left out stay as they were.
+        Returns whether the locations in logic changed."""
+        changed_items = [item_name for item_name, count in counts.items() if self.counts[item_name] != count]
+        for item_name in changed_items:
+            self.counts[item_name] = counts[item_name]
+
+        return self.update(changed_items)
+
+    def update(self, changed_items: Iterable[str]) -> bool:
+        """Re-checks only the rules that depend on `changed_items`. Returns whether the locations in logic changed."""
+        dirty_rules = set(self.volatile_rules)
+        for item_name in changed_items:
+            dirty_rules |= self.rules_by_item.get(item_name, set())
+
+        changed_rules = {key for key in dirty_rules if self.check_rule(key)}
+        if not changed_rules:
+            return False
+
+        dirty_locations = {key[1] for key in changed_rules if key[0] == "location"}
+
+        if any(key[0] != "location" for key in changed_rules):
+            old_reachable = self.reachable_regions
+            self.reachable_regions = self.find_reachable_regions()
+            for region_name in old_reachable ^ self.reachable_regions:
+                dirty_locations.update(self.locations_by_region.get(region_name, []))
+
+        old_in_logic = set(self.in_logic)
+        for location_name in dirty_locations:
+            self.check_location(location_name)
+
+        return old_in_logic != self.in_logic
+
+    def update_all(self):
+        for key in self.rules:
+            self.check_rule(key)
+        self.reachable_regions = self.find_reachable_regions()
+        for location_name in self.locations:
+            if ("location", location_name) in self.rules:
+                self.check_location(location_name)
+
+    def check_rule(self, key: tuple) -> bool:
+        """Checks a rule and returns whether its result changed."""
+        result = self.rules[key].check()
+        changed = self.results.get(key) != result
+        self.results[key] = result
+        return changed
+
+    def check_location(self, location_name: str):
+        region_name = self.locations[location_name].get("region", "Manual")
+        if region_name in self.reachable_regions and self.results[("location", location_name)]:
+            self.in_logic.add(location_name)
+        else:
+            self.in_logic.discard(location_name)
+
+    def find_reachable_regions(self) -> set[str]:
+        reachable = {"Manual"}
+        queue = ["Manual"]
+
+        while queue:
+            region_name = queue.pop()
+            for target in self.regions[region_name].get("connects_to") or []:
+                if target in reachable or target not in self.regions:
+                    continue
+                if not self.results[("region", target)]:
+                    continue
+                if not self.results.get(("exit", region_name, target), True) or not self.results.get(("entrance", region_name, target), True):
+                    continue
+                reachable.add(target)
+                queue.append(target)
+
+        return reachable
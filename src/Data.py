@@ -48,6 +48,11 @@ meta_table = ManualFile('meta.json', dict).load() #dict
 region_table.pop('$schema', '')
 category_table.pop('$schema', '')
 
+# remember which requires each requires_tree was parsed from, so the tree is only used until a hook or option changes them
+for area in [*location_table, *region_table.values()]:
+    if isinstance(area, dict) and "requires_tree" in area:
+        area["requires_tree_source"] = area.get("requires")
+
 # hooks
 game_table = after_load_game_file(game_table)
 item_table = after_load_item_file(item_table)
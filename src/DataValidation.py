@@ -195,68 +195,46 @@ class DataValidation():
                     if item["name"] in region_requires:
                         raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
 
-    @staticmethod
-    def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
-        if isinstance(requires, str) and 'ItemValue' in requires:
-            for result in re.findall(r'\{ItemValue\(([^:]*)\:(.*?)\)\}', requires):
-                value = result[0].lower().strip()
-                count = int(result[1].split(",")[0])
-                if not values_requested.get(value):
-                    values_requested[value] = count
-                else:
-                    values_requested[value] = max(values_requested[value], count)
-        return values_requested
-
-
     @staticmethod
     def preFillCheckIfEnoughItemsForValue(world: World, multiworld: MultiWorld):
-        from .Helpers import get_items_with_value, get_items_for_player, filter_used_regions
+        from .Helpers import get_progression_value_totals, filter_used_regions
+        from .Rules import get_required_item_values
         player = world.player
         values_requested = {}
-        player_regions = []
 
-        #Grab all the player's regions
-        for region in multiworld.regions:
-            if region.player != player:
-                continue
-            player_regions.append(region)
+        def request(requires):
+            for value, count in get_required_item_values(requires).items():
+                values_requested[value] = max(values_requested.get(value, 0), count)
 
-        used_regions = filter_used_regions(player_regions)
-        used_regions_names = {r.name for r in set(used_regions)}
+        used_regions = filter_used_regions(list(multiworld.get_regions(player)))
+        used_regions_names = {r.name for r in used_regions}
 
         #Check used regions (and their parent(s)) for ItemValue requirement
         for region in used_regions:
             manualregion = DataValidation.region_table.get(region.name, {})
             if manualregion:
                 if manualregion.get("requires"):
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualregion["requires"]))
+                    request(manualregion["requires"])
 
                 for region_entrance, require in manualregion.get('entrance_requires', {}).items():
                     if region_entrance in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
+                        request(require)
 
                 for region_exit, require in manualregion.get('exit_requires', {}).items():
                     if region_exit in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
+                        request(require)
 
             for location in region.locations:
                 manualLocation = world.location_name_to_location.get(location.name, {})
-                if "requires" in manualLocation and manualLocation["requires"]:
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualLocation["requires"]))
+                if manualLocation.get("requires"):
+                    request(manualLocation["requires"])
 
         # compare whats available vs requested but only if there's anything requested
         if values_requested:
+            value_totals = get_progression_value_totals(world, player)
             errors = []
-            existing_items = [item for item in get_items_for_player(multiworld, player, True) if
-                              item.code is not None and ItemClassification.progression in item.classification]
             for value, val_count in values_requested.items():
-                items_value = get_items_with_value(world, multiworld, value, player)
-                found_count = 0
-                if items_value:
-                    for item in existing_items:
-                        if item.name in items_value:
-                            found_count += items_value[item.name]
-
+                found_count = value_totals.get(value, 0)
                 if found_count < val_count:
                     errors.append(f"   '{value}': {found_count} out of the {val_count} {value} worth of progression items required can be found.")
             if errors:
@@ -1,10 +1,11 @@
 import ast
 import csv
+import functools
 import os
 import pkgutil
 import json
 
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, ItemClassification
 from enum import IntEnum
 from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
 from types import GenericAlias
@@ -56,15 +57,54 @@ def clamp(value, min, max):
     else:
         return value
 
-def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
+# Players whose options turn the same yaml_options on and off share which categories those enable, and players with
+# the same location table and categories disabled share which locations that leaves enabled, instead of working it out for
+# every slot. Keyed by the option fingerprint (see get_option_fingerprint), and by the id of the location table along with
+# the disabled categories, respectively (see get_shared_enabled_locations).
+shared_category_enablement: dict[tuple[bool, ...], dict[str, bool]] = {}
+shared_enabled_locations: dict[tuple[int, frozenset[str]], tuple[list[dict], int, bytes]] = {}
+
+@functools.cache
+def get_yaml_option_names() -> tuple[str, ...]:
+    """The options that any category's yaml_option refers to."""
+    from .Data import category_table
+    names = {format_to_valid_identifier(name.removeprefix("!")) for category in category_table.values() for name in category.get("yaml_option", [])}
+    return tuple(sorted(names))
+
+def get_option_fingerprint(multiworld: MultiWorld, player: int) -> tuple[bool, ...]:
+    """Whether each of the options categories can depend on is enabled for the player, which is all that decides the categories' yaml_option."""
+    return tuple(is_option_enabled(multiworld, player, name) for name in get_yaml_option_names())
+
+def resolve_category_enablement(fingerprint: tuple[bool, ...]) -> dict[str, bool]:
+    """Whether each category is enabled by its yaml_option, for an option fingerprint. Same as resolve_yaml_option, without needing a player."""
     from .Data import category_table
+    enabled_options = dict(zip(get_yaml_option_names(), fingerprint))
+    return {
+        name: all(enabled_options[format_to_valid_identifier(option_name.removeprefix("!"))] != option_name.startswith("!") for option_name in category.get("yaml_option", []))
+        for name, category in category_table.items()
+    }
+
+def get_category_enablement(multiworld: MultiWorld, player: int) -> dict[str, bool]:
+    """Whether each category is enabled by its yaml_option for the player, without the before_is_category_enabled hook.
+    \nWorked out once per player, the first time it's needed, and shared with every player with the same option fingerprint.
+    Options changed after that (by a hook, say) aren't seen until world.category_enablement is set back to None."""
+    world = multiworld.worlds[player]
+    enablement = getattr(world, "category_enablement", None)
+    if enablement is None:
+        fingerprint = get_option_fingerprint(multiworld, player)
+        enablement = shared_category_enablement.get(fingerprint)
+        if enablement is None:
+            enablement = shared_category_enablement[fingerprint] = resolve_category_enablement(fingerprint)
+        world.category_enablement = enablement
+    return enablement
+
+def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
     """Check if a category has been disabled by a yaml option."""
     hook_result = before_is_category_enabled(multiworld, player, category_name)
     if hook_result is not None:
         return hook_result
 
-    category_data = category_table.get(category_name, {})
-    return resolve_yaml_option(multiworld, player, category_data)
+    return get_category_enablement(multiworld, player).get(category_name, True)
 
 def resolve_yaml_option(multiworld: MultiWorld, player: int, data: dict) -> bool:
     if "yaml_option" in data:
@@ -123,6 +163,43 @@ def _is_manualobject_enabled(multiworld: MultiWorld, player: int, object: Any) -
 
     return enabled
 
+# the categories of the locations of a location table, by the table's id, along with the table so it's the same one
+# and its length, so locations added to it or removed from it are seen
+location_categories: dict[int, tuple[list[dict], int, frozenset[str]]] = {}
+
+def get_location_categories(location_table: list[dict]) -> frozenset[str]:
+    """Every category that the locations of the table are in."""
+    cached = location_categories.get(id(location_table))
+    if cached is None or cached[0] is not location_table or cached[1] != len(location_table):
+        cached = location_categories[id(location_table)] = (location_table, len(location_table), frozenset(category for location in location_table for category in location.get("category", [])))
+    return cached[2]
+
+def find_locations_enabled_by_categories(location_table: list[dict], disabled_categories: frozenset[str]) -> bytes:
+    """One byte per location of the table: whether none of its categories are disabled."""
+    return bytes(disabled_categories.isdisjoint(location.get("category", [])) for location in location_table)
+
+def get_shared_enabled_locations(location_table: list[dict], disabled_categories: frozenset[str]) -> bytes:
+    """Same as find_locations_enabled_by_categories, worked out once for every player with the same location table and categories disabled.
+    \nThe table is kept along with the result, and its length, so another table that reuses its id, or locations added to it or removed from it, get worked out again."""
+    key = (id(location_table), disabled_categories)
+    cached = shared_enabled_locations.get(key)
+    if cached is None or cached[0] is not location_table or cached[1] != len(location_table):
+        cached = shared_enabled_locations[key] = (location_table, len(location_table), find_locations_enabled_by_categories(location_table, disabled_categories))
+    return cached[2]
+
+def get_enabled_location_names(multiworld: MultiWorld, player: int) -> set[str]:
+    """The names of every location is_location_enabled would enable for the player, hooks included.
+    \nWhich locations their categories enable is shared with every player with the same location table and categories disabled."""
+    world = multiworld.worlds[player]
+    disabled_categories = frozenset(category for category in get_location_categories(world.location_table) if not is_category_enabled(multiworld, player, category))
+
+    enabled = set()
+    for location, is_enabled in zip(world.location_table, get_shared_enabled_locations(world.location_table, disabled_categories)):
+        hook_result = before_is_location_enabled(multiworld, player, location)
+        if is_enabled if hook_result is None else hook_result:
+            enabled.add(location["name"])
+    return enabled
+
 def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollected: bool = False) -> List[Item]:
     """Return list of items of a player including placed items"""
     items = [i for i in multiworld.get_items() if i.player == player]
@@ -130,47 +207,71 @@ def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollecte
         items.extend(multiworld.precollected_items.get(player, []))
     return items
 
+def count_player_pool(world: World, player: int) -> tuple[dict[str, int], dict[str, dict[str, int]], dict[str, int]]:
+    """Counts the player's real pool (placed, unplaced and starting items) in one go: how many of each item there are,
+    for each value, what each item of the pool with that value is worth (see get_items_with_value),
+    and for each value, how much of it all the progression items of the pool are worth together"""
+    counts: dict[str, int] = {}
+    value_index: dict[str, dict[str, int]] = {}
+    value_totals: dict[str, int] = {}
+    indexed = set()
+    for item in get_items_for_player(world.multiworld, player, True):
+        counts[item.name] = counts.get(item.name, 0) + 1
+        if item.code is None:
+            continue
+        # items made by hooks, or events, aren't always in item_name_to_item
+        item_values = world.item_name_to_item.get(item.name, {}).get('value', {})
+        if item.name not in indexed:
+            indexed.add(item.name)
+            for value, worth in item_values.items():
+                value_index.setdefault(value, {})[item.name] = worth
+        if ItemClassification.progression in item.classification:
+            for value, worth in item_values.items():
+                value_totals[value] = value_totals.get(value, 0) + int(worth)
+    return counts, value_index, value_totals
+
 def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> dict[str, int]:
+    """Counts the player's pool again the next time it's needed, and returns what the value's items were worth until now.
+    \nThe pool is counted again by itself once items are added to it or removed from it, this is for changes that don't (see ManualWorld.get_item_pool_signature)."""
     if player is None:
         player = world.player
-    return world.item_values[player].pop(value, {})
+    previous = world.item_value_index.get(player, {}).get(value, {})
+    world.item_counts.pop(player, None)
+    return previous
 
 def reset_item_value_cache_for_player(world: World, player: Optional[int] = None):
+    """Counts the player's pool again the next time it's needed.
+    \nThe pool is counted again by itself once items are added to it or removed from it, this is for changes that don't (see ManualWorld.get_item_pool_signature)."""
     if player is None:
         player = world.player
-    world.item_values[player] = {}
+    world.item_counts.pop(player, None)
 
 def get_items_with_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, skipCache: bool = False) -> dict[str, int]:
     """Return a dict of every items with a specific value type present in their respective 'value' dict\n
     Output in the format 'Item Name': 'value count'\n
-    Keep a cache of the result, it can be skipped with 'skipCache == True'\n
-    To force a Reset of the player's cache of a value use either reset_specific_item_value_cache_for_player or reset_item_value_cache_for_player
+    It comes from an index of the values kept along with the player's item counts, which is rebuilt when the pool changes.
+    It can be skipped with 'skipCache == True', to count the pool again without touching the index\n
     """
     if player is None:
         player = world.player
 
-    player_items = get_items_for_player(multiworld, player, True)
-    # Just a small check to prevent caching {} if items don't exist yet
-    if not player_items:
-        return {value: -1}
-
     value = value.lower().strip()
 
-    if not skipCache:
-        if not hasattr(world, 'item_values'): #Cache of just the item values
-            world.item_values = {}
+    if skipCache:
+        return count_player_pool(world, player)[1].get(value, {})
 
-        if not world.item_values.get(player):
-            world.item_values[player] = {}
+    world.get_item_counts(player)  # counts the pool and indexes its values if it changed
+    return world.item_value_index.get(player, {}).get(value, {})
+
+def get_progression_value_totals(world: World, player: Optional[int] = None) -> dict[str, int]:
+    """Return how much of each value all the progression items in the player's pool are worth together\n
+    Output in the format 'value name': 'total worth'
+    """
+    if player is None:
+        player = world.player
 
-    if value not in world.item_values.get(player, {}).keys() or skipCache:
-        item_with_values = {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
-                            for i in player_items if i.code is not None
-                            and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
-        if skipCache:
-            return item_with_values
-        world.item_values[player][value] = item_with_values
-    return world.item_values[player].get(value)
+    world.get_item_counts(player)  # counts the pool and totals its values if it changed
+    return world.item_value_totals.get(player, {})
 
 
 def filter_used_regions(player_regions: dict|list) -> set:
@@ -188,20 +289,27 @@ def filter_used_regions(player_regions: dict|list) -> set:
             used_regions.add(region)
 
     #Check every known region with location for parent regions
-    checked_parent = []
-    for region in set(used_regions):
-        def checkParent(parent_region):
-            if parent_region.name in checked_parent: #dont check a region twice
-                return
-            checked_parent.append(parent_region.name)
-            used_regions.add(parent_region)
-            for entrance in parent_region.entrances:
-                if player_regions.get(entrance.parent_region.name):
-                    checkParent(entrance.parent_region)
-            return
-        checkParent(region)
+    checked_parent = set()
+    to_check = list(used_regions)
+    while to_check:
+        parent_region = to_check.pop()
+        if parent_region.name in checked_parent: #dont check a region twice
+            continue
+        checked_parent.add(parent_region.name)
+        used_regions.add(parent_region)
+        for entrance in parent_region.entrances:
+            if entrance.parent_region.name not in checked_parent and player_regions.get(entrance.parent_region.name):
+                to_check.append(entrance.parent_region)
     return used_regions
 
+def get_requires_tree(area: dict) -> Optional[dict]:
+    """Return the area's requires_tree if it's still the parsed form of its requires, or None to check the requires itself.\n
+    The tree is only trusted when it was loaded alongside the same requires (see requires_tree_source in Data.py), so one a hook or option changed afterwards is never overruled by its old tree
+    """
+    if "requires_tree" in area and area.get("requires") == area.get("requires_tree_source"):
+        return area["requires_tree"]
+    return None
+
 def convert_to_long_string(input: str | list[str]) -> str:
     """Verify that the input is a str. If it's a list[str] then it combine them into a str in a way that works with yaml template/website options descriptions"""
     if not isinstance(input, str):
@@ -1,6 +1,7 @@
 from BaseClasses import Item
 from .Data import item_table
 from .Game import filler_item_name, starting_index
+from .Helpers import format_state_prog_items_key, ProgItemsCat
 
 
 ######################
@@ -11,6 +12,8 @@ item_id_to_name: dict[int, str] = {}
 item_name_to_item: dict[str, dict] = {}
 item_name_groups: dict[str, str] = {}
 advancement_item_names: set[str] = set()
+# the state keys and amounts of every value of an item, which collect and remove add up without formatting any keys
+item_value_vectors: dict[str, tuple[tuple[str, int], ...]] = {}
 lastItemId = -1
 
 count = starting_index
@@ -60,6 +63,9 @@ for item in item_table:
             item_name_groups[group_name] = []
         item_name_groups[group_name].append(item_name)
 
+    if item['value']:
+        item_value_vectors[item_name] = tuple((format_state_prog_items_key(ProgItemsCat.VALUE, k), int(v)) for k, v in item['value'].items())
+
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
@@ -1,11 +1,13 @@
 from __future__ import annotations
 import asyncio
+import bisect
+import collections
+import functools
 import os
-import re
 import sys
 import time
 import typing
-from typing import Any, Optional
+from typing import Any
 
 import requests
 from worlds import AutoWorldRegister, network_data_package
@@ -23,6 +25,9 @@ from NetUtils import ClientStatus
 from CommonClient import gui_enabled, logger, get_base_parser, ClientCommandProcessor, server_loop
 from MultiServer import mark_raw
 
+from .ApManual import client_data_tables, merge_client_data, read_apmanual_file
+from .ClientLogic import ClientLogic
+
 tracker_loaded = False
 try:
     from worlds.tracker.TrackerClient import TrackerGameContext as SuperContext, TrackerCommandProcessor
@@ -39,6 +44,7 @@ class ManualClientCommandProcessor(ClientCommandProcessor):
         """Manually trigger a resync."""
         self.output("Syncing items.")
         self.ctx.syncing = True
+        self.ctx.wake_watcher()
         return True
 
     @mark_raw
@@ -51,15 +57,124 @@ class ManualClientCommandProcessor(ClientCommandProcessor):
         )
         if usable:
             location_id = self.ctx.location_names_to_id[location_name]
-            self.ctx.locations_checked.append(location_id)
-            self.ctx.syncing = True
+            self.ctx.queue_location_checks([location_id])
         else:
             self.output(response)
             return False
 
+    def _cmd_perf(self, reset: str = "") -> bool:
+        """Show how long building and updating the tracker and locations has taken. "/perf reset" starts over."""
+        if reset == "reset":
+            self.ctx.perf_stats.clear()
+            self.output("Cleared the timings.")
+            return True
+
+        lines = self.ctx.perf_stats.report()
+        if not lines:
+            self.output("Nothing has been timed yet.")
+        for line in lines:
+            self.output(line)
+        return True
+
+
+class CategoryIndex:
+    """Maps ids to the visible categories they're listed under, and each category to its sorted ids.
+    Ids without any category are listed under "(No Category)", and hidden categories are left out."""
+
+    def __init__(self, is_hidden: typing.Callable[[str], bool]):
+        self.is_hidden = functools.cache(is_hidden)
+        self.ids_by_category: dict[str, list[int]] = {}
+        self.categories_by_id: dict[int, list[str]] = {}
+
+    def set_categories(self, id: int, categories: typing.Optional[list[str]]):
+        for category in self.categories_by_id.pop(id, []):
+            self.ids_by_category[category].remove(id)
+
+        listed_categories = [category for category in categories or ["(No Category)"] if not self.is_hidden(category)]
+        self.categories_by_id[id] = listed_categories
+        for category in listed_categories:
+            bisect.insort(self.ids_by_category.setdefault(category, []), id)
+
+
+class SearchIndex:
+    """Finds the ids whose name contains a search term without scanning every name.
+    Names are lowercased once and indexed by their trigrams (every 3 letter substring),
+    so a term only has to be checked against the names that share all of its trigrams."""
+
+    def __init__(self, names: dict[int, str]):
+        self.names = {id: name.lower() for id, name in names.items()}
+        self.trigrams: dict[str, set[int]] = collections.defaultdict(set)
+        for id, name in self.names.items():
+            for start in range(len(name) - 2):
+                self.trigrams[name[start:start + 3]].add(id)
+
+        self.last_term = ""
+        self.last_matches: set[int] = set()
+
+    def search(self, term: str) -> typing.Optional[set[int]]:
+        """Returns the ids of the names containing `term`, or None if there's no term and everything matches."""
+        term = term.lower()
+        if not term:
+            return None
+
+        if self.last_term and self.last_term in term:
+            # while typing, the term usually only grows, and anything matching it also matched the last one
+            candidates = self.last_matches
+        elif len(term) >= 3:
+            trigram_sets = sorted((self.trigrams.get(term[start:start + 3], set()) for start in range(len(term) - 2)), key=len)
+            candidates = trigram_sets[0].intersection(*trigram_sets[1:])
+        else:
+            candidates = self.names.keys()
+
+        self.last_term = term
+        self.last_matches = {id for id in candidates if term in self.names[id]}
+        return self.last_matches
+
+
+class PerfStats:
+    """How long each timed part of the client took, for /perf and the client benchmark."""
+
+    def __init__(self):
+        self.timings: dict[str, list[float]] = {}  # name: [calls, total, slowest, last] in seconds
+
+    def record(self, name: str, elapsed: float):
+        timing = self.timings.setdefault(name, [0, 0.0, 0.0, 0.0])
+        timing[0] += 1
+        timing[1] += elapsed
+        timing[2] = max(timing[2], elapsed)
+        timing[3] = elapsed
+        logger.debug("%s took %.2f ms" % (name, elapsed * 1000))
+
+    def clear(self):
+        self.timings.clear()
+
+    def report(self) -> list[str]:
+        return ["%s: %d calls, %.2f ms average, %.2f ms slowest, %.2f ms last" % (name, calls, total / calls * 1000, slowest * 1000, last * 1000)
+                for name, (calls, total, slowest, last) in sorted(self.timings.items())]
+
 
+def timed(method):
+    """Records how long every call of a ManualManager method takes in ctx.perf_stats."""
+    @functools.wraps(method)
+    def timed_method(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.ctx.perf_stats.record(method.__name__, time.perf_counter() - start)
+    return timed_method
 
 
+def changed_matches(old_matches: typing.Optional[set[int]], new_matches: typing.Optional[set[int]], ids: typing.Iterable[int]) -> set[int]:
+    """Which of `ids` started or stopped matching the search. None matches everything."""
+    if old_matches is None and new_matches is None:
+        return set()
+    if old_matches is None:
+        return {id for id in ids if id not in new_matches}
+    if new_matches is None:
+        return {id for id in ids if id not in old_matches}
+    return (old_matches ^ new_matches).intersection(ids)
+
 
 class ManualContext(SuperContext):
     command_processor = ManualClientCommandProcessor
@@ -72,8 +187,15 @@ class ManualContext(SuperContext):
     region_table = {}
     category_table = {}
 
-    tracker_reachable_locations = []
-    tracker_reachable_events = []
+    tracker_reachable_locations: typing.Collection[str] = set()
+    reachable_location_ids: set[int] = set()  # the same locations, by id
+    tracker_reachable_events: typing.Collection[str] = []
+
+    # evaluates the requires locally when Universal Tracker isn't installed, see ClientLogic.py
+    local_logic: typing.Optional[ClientLogic] = None
+
+    # how long to wait for more checks to come in before sending them, so a burst of clicks goes out as one message
+    location_check_batch_delay = 0.1
 
     set_deathlink = False
     last_death_link = 0
@@ -104,6 +226,26 @@ class ManualContext(SuperContext):
 
         self.send_index: int = 0
         self.syncing = False
+        self.watcher_event = asyncio.Event()
+        self.perf_stats = PerfStats()
+        self.pending_location_checks: set[int] = set()
+
+        self.received_item_counts: typing.Counter[int] = collections.Counter()
+        self.counted_items_received: list = []  # the items_received list that received_item_counts was counted from
+        self.counted_items_length = 0
+        self.updated_item_ids: set[int] = set()  # ids whose count changed since the UI last looked
+
+        # every item and location of the game by id, looked up once per connection
+        self.item_records: dict[int, dict[str, Any]] = {}
+        self.location_records: dict[int, dict[str, Any]] = {}
+
+        self.item_category_index = CategoryIndex(self.is_category_hidden)
+        self.location_category_index = CategoryIndex(self.is_category_hidden)
+
+        self.item_search_index = SearchIndex({})
+        self.location_search_index = SearchIndex({})
+        self.matching_item_ids: typing.Optional[set[int]] = None  # None when not searching
+        self.matching_location_ids: typing.Optional[set[int]] = None
         self.game = game
         self.username = player_name
 
@@ -144,6 +286,102 @@ class ManualContext(SuperContext):
         from .Game import game_name  # This will at least give us the name of a manual they've installed
         return Utils.persistent_load().get("client", {}).get("last_manual_game", game_name)
 
+    def wake_watcher(self):
+        """Lets game_watcher_manual know there's something to send. Call this after setting any of the flags it checks."""
+        self.watcher_event.set()
+
+    def queue_location_checks(self, location_ids: typing.Iterable[int]):
+        """Marks locations as checked. They're sent to the server by game_watcher_manual, batched with any other checks made shortly after."""
+        location_ids = set(location_ids) - self.locations_checked
+        if location_ids:
+            self.locations_checked |= location_ids
+            self.pending_location_checks |= location_ids
+            self.wake_watcher()
+
+    def count_received_items(self) -> set[int]:
+        """Adds the items received since the last call to received_item_counts, and marks their ids in updated_item_ids.
+        Returns the ids whose count changed."""
+        changed_item_ids = set()
+
+        if self.items_received is not self.counted_items_received:
+            # items_received was replaced (like on reconnect), so count it all over again
+            changed_item_ids.update(self.received_item_counts)
+            self.received_item_counts.clear()
+            self.counted_items_received = self.items_received
+            self.counted_items_length = 0
+
+        for network_item in self.items_received[self.counted_items_length:]:
+            if isinstance(network_item, str):
+                continue  # the "__Victory__" marker added by the victory button
+            self.received_item_counts[network_item.item] += 1
+            changed_item_ids.add(network_item.item)
+
+        self.counted_items_length = len(self.items_received)
+        self.updated_item_ids |= changed_item_ids
+        return changed_item_ids
+
+    def build_local_logic(self, slot_data: dict):
+        """Sets up in-logic highlighting without Universal Tracker, from the same data the rest of the client uses."""
+        world = AutoWorldRegister.world_types.get(self.game)
+        world_module = sys.modules.get(world.__module__) if world else None
+        try:
+            self.local_logic = ClientLogic(
+                self.item_table or world.item_name_to_item,
+                self.location_table or world.location_name_to_location,
+                self.region_table or getattr(world_module, "region_table", {}),
+                self.category_table or getattr(world, "category_table", {}),
+                slot_data,
+                getattr(world, "rules_functions_maximum_recursion", 5),
+            )
+        except Exception:
+            self.local_logic = None
+            logger.warning("Could not evaluate the logic of %s locally, so locations in logic won't be highlighted." % (self.game), exc_info=True)
+            return
+
+        self.update_local_logic(set(self.received_item_counts))
+
+    def update_local_logic(self, changed_item_ids: set[int]):
+        if not self.local_logic:
+            return
+
+        changed_counts = {self.get_item_by_id(item_id)["name"]: self.received_item_counts[item_id] for item_id in changed_item_ids}
+        if self.local_logic.set_counts(changed_counts) or not self.tracker_reachable_locations:
+            self.set_reachable_locations(self.local_logic.in_logic)
+            self.tracker_reachable_events = ["__Victory__"] if self.goal_location.get("name") in self.local_logic.in_logic else []
+
+    def is_category_hidden(self, category: str) -> bool:
+        category_settings = self.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.game], "category_table", {}).get(category, {})
+        return bool(category_settings.get("hidden"))
+
+    def build_records(self):
+        """Looks up every item and location of the game by id, so nothing after connecting has to go through their names."""
+        if not self.location_table and not hasattr(AutoWorldRegister.world_types[self.game], 'location_name_to_location'):
+            raise Exception("The apworld for %s is too outdated for this client. Please update it." % (self.game))
+
+        self.item_records = {item_id: self.get_item_by_name(item_name) for item_name, item_id in self.item_names_to_id.items()}
+        self.location_records = {location_id: self.get_location_by_name(location_name) for location_name, location_id in self.location_names_to_id.items()}
+
+    def build_category_indexes(self):
+        """Indexes every item and location of the game by category. Done once per connection, so the UI never has to look through all of them."""
+        self.item_category_index = CategoryIndex(self.is_category_hidden)
+        self.location_category_index = CategoryIndex(self.is_category_hidden)
+
+        for item_id in sorted(self.item_records):
+            self.item_category_index.set_categories(item_id, self.item_records[item_id].get("category"))
+
+        for location_id in sorted(self.location_records):
+            self.index_location(location_id)
+
+    def build_search_indexes(self):
+        self.item_search_index = SearchIndex({id: name for name, id in self.item_names_to_id.items()})
+        self.location_search_index = SearchIndex({id: name for name, id in self.location_names_to_id.items()})
+        self.set_search(self.search_term)
+
+    def index_location(self, location_id: int):
+        """(Re)indexes a location by its current categories."""
+        location = self.get_location_by_id(location_id)
+        self.location_category_index.set_categories(location_id, location.get("category"))
+
     def get_location_by_name(self, name) -> dict[str, Any]:
         location = self.location_table.get(name)
         if not location:
@@ -152,8 +390,10 @@ class ManualContext(SuperContext):
         return location
 
     def get_location_by_id(self, id) -> dict[str, Any]:
-        name = self.location_names.lookup_in_game(id)
-        return self.get_location_by_name(name)
+        location = self.location_records.get(id)
+        if not location:
+            location = self.get_location_by_name(self.location_names.lookup_in_game(id))
+        return location
 
     def get_item_by_name(self, name):
         item = self.item_table.get(name)
@@ -162,8 +402,14 @@ class ManualContext(SuperContext):
         return item
 
     def get_item_by_id(self, id):
-        name = self.item_names.lookup_in_game(id)
-        return self.get_item_by_name(name)
+        item = self.item_records.get(id)
+        if not item:
+            item = self.get_item_by_name(self.item_names.lookup_in_game(id))
+        return item
+
+    def set_reachable_locations(self, location_names: typing.Collection[str]):
+        self.tracker_reachable_locations = location_names
+        self.reachable_location_ids = {self.location_names_to_id[name] for name in location_names if name in self.location_names_to_id}
 
     def update_ids(self, data_package) -> None:
         self.location_names_to_id = data_package['location_name_to_id']
@@ -175,11 +421,28 @@ class ManualContext(SuperContext):
             if game == self.game:
                 self.update_ids(game_data)
 
-    def set_search(self, search_term: str):
+    def set_search(self, search_term: str) -> tuple[set[int], set[int]]:
+        """Updates which items and locations match the search.
+        Returns the received item ids and remaining location ids that started or stopped matching."""
+        old_item_matches, old_location_matches = self.matching_item_ids, self.matching_location_ids
+
         self.search_term = search_term
+        self.matching_item_ids = self.item_search_index.search(search_term)
+        self.matching_location_ids = self.location_search_index.search(search_term)
+
+        return (
+            changed_matches(old_item_matches, self.matching_item_ids, self.received_item_counts),
+            changed_matches(old_location_matches, self.matching_location_ids, self.missing_locations),
+        )
 
     def clear_search(self):
-        self.search_term = ""
+        return self.set_search("")
+
+    def is_item_matching(self, item_id: int) -> bool:
+        return self.matching_item_ids is None or item_id in self.matching_item_ids
+
+    def is_location_matching(self, location_id: int) -> bool:
+        return self.matching_location_ids is None or location_id in self.matching_location_ids
 
     @property
     def endpoints(self):
@@ -194,7 +457,16 @@ class ManualContext(SuperContext):
     def on_package(self, cmd: str, args: dict):
         super().on_package(cmd, args)
 
+        if cmd in {"Connected", "ReceivedItems"}:
+            changed_item_ids = self.count_received_items()
+            if cmd == "ReceivedItems":
+                self.update_local_logic(changed_item_ids)
+
         if cmd in {"Connected", "DataPackage"}:
+            self.build_records()
+            self.build_category_indexes()
+            self.build_search_indexes()
+
             if cmd == "Connected":
                 Utils.persistent_store("client", "last_manual_game", self.game)
                 if args.get("slot_data"):
@@ -205,8 +477,12 @@ class ManualContext(SuperContext):
                         self.ui.enable_death_link()
                         self.set_deathlink = True
                         self.last_death_link = 0
+                        self.wake_watcher()
                     logger.info(f"Slot data: {args['slot_data']}")
 
+                if not tracker_loaded:
+                    self.build_local_logic(args.get("slot_data") or {})
+
             self.ui.build_tracker_and_locations_table()
             self.ui.request_update_tracker_and_locations_table(update_highlights=True)
         elif cmd in {"ReceivedItems"}:
@@ -220,7 +496,7 @@ class ManualContext(SuperContext):
         self.ui.death_link_button.background_color = self.colors['deathlink_received']
 
     def on_tracker_updated(self, reachable_locations: list[str]):
-        self.tracker_reachable_locations = reachable_locations
+        self.set_reachable_locations(reachable_locations)
         self.ui.request_update_tracker_and_locations_table(update_highlights=True)
 
     def on_tracker_events(self, events: list[str]):
@@ -274,11 +550,13 @@ class ManualContext(SuperContext):
         from kivy.uix.gridlayout import GridLayout
         from kivy.uix.label import Label
         from kivy.uix.layout import Layout
+        from kivy.uix.recycleview import RecycleView
         from kivy.uix.scrollview import ScrollView
         from kivy.uix.spinner import Spinner, SpinnerOption
         from kivy.uix.textinput import TextInput
         from kivy.uix.treeview import TreeView, TreeViewNode, TreeViewLabel
         from kivy.core.window import Window
+        from kivy.clock import Clock
         from kivy.lang import Builder
         from kivy.properties import ColorProperty
 
@@ -297,11 +575,17 @@ class ManualContext(SuperContext):
         class LocationsLayoutScrollable(ScrollView):
             pass
 
-        class TreeViewButton(Button, TreeViewNode):
+        class LocationButton(Button):
+            location_id: int = 0
             victory: bool = False
-            id: int = None
+            callback: typing.Optional[typing.Callable] = None  # set from the row data, called with the button when it's pressed
 
-        class TreeViewScrollView(ScrollView, TreeViewNode):
+            def on_release(self):
+                if self.callback:
+                    self.callback(self)
+
+        class TreeViewRecycleView(RecycleView, TreeViewNode):
+            """One category's rows. Only the rows scrolled into view exist as widgets, the rest are just entries in `data`."""
             pass
 
         class GameSelectOption(SpinnerOption):
@@ -322,6 +606,14 @@ class ManualContext(SuperContext):
             pos: self.pos
             size: self.size
 
+<TreeViewRecycleView>:
+    RecycleBoxLayout:
+        orientation: "vertical"
+        default_size: dp(400), dp(30)
+        default_size_hint: None, None
+        size_hint_y: None
+        height: self.minimum_height
+
         """)
 
         class ManualControlsStyledLayout(BoxLayout):
@@ -330,21 +622,34 @@ class ManualContext(SuperContext):
         class ManualManager(ui):
             base_title = "Archipelago Manual Client"
             listed_items = {"(No Category)": []}
-            item_categories = ["(No Category)"]
             listed_locations = {"(No Category)": []}
-            location_categories = ["(No Category)"]
 
             active_item_accordion = 0
             active_location_accordion = 0
 
-            update_requested_time: Optional[float] = None
             update_requested_highlights: bool = False
 
+            # the item tracker is only updated where something changed, so these keep track of what it currently shows
+            item_category_widgets: dict[str, tuple[TreeViewLabel, TreeViewRecycleView]] = {}
+            item_rows: dict[str, dict[int, dict[str, Any]]] = {}
+            bold_item_rows: set[tuple[str, int]] = set()
+            bold_category_labels: set[TreeViewLabel] = set()
+            item_tracker_stale = True
+
+            location_category_widgets: dict[str, tuple[TreeViewLabel, TreeViewRecycleView]] = {}
+            victory_categories: set[str] = set()
+            victory_text = ""
+
             ctx: ManualContext
 
             def __init__(self, ctx):
                 super().__init__(ctx)
 
+                # wait 0.25 seconds before executing update, in case there are multiple update requests coming in
+                self.update_trigger = Clock.create_trigger(self.run_requested_update, 0.25)
+                # and search once typing pauses for a moment, separately from the update above
+                self.search_trigger = Clock.create_trigger(self.apply_search, 0.15)
+
             def build(self) -> Layout:
                 super().build()
 
@@ -374,9 +679,13 @@ class ManualContext(SuperContext):
 
             def clear_lists(self):
                 self.listed_items = {"(No Category)": []}
-                self.item_categories = ["(No Category)"]
+                self.item_category_widgets = {}
+                self.item_rows = {}
+                self.bold_item_rows = set()
+                self.bold_category_labels = set()
+                self.item_tracker_stale = True
                 self.listed_locations = {"(No Category)": [], "(Hinted)": []}
-                self.location_categories = ["(No Category)", "(Hinted)"]
+                self.location_category_widgets = {}
 
             def set_active_item_accordion(self, instance):
                 index = 0
@@ -412,6 +721,7 @@ class ManualContext(SuperContext):
                     self.death_link_button.background_color = self.ctx.colors['deathlink_primed']
                 else:
                     self.ctx.deathlink_out = True
+                    self.ctx.wake_watcher()
                     self.death_link_button.text = "Death Link: Sent"
                     self.death_link_button.background_color = self.ctx.colors['deathlink_sent']
 
@@ -425,6 +735,7 @@ class ManualContext(SuperContext):
                             location["category"] = location.get("category", [])
                             if "(Hinted)" not in location["category"]:
                                 location["category"].append("(Hinted)")
+                                self.ctx.index_location(hint["location"])
                                 rebuild = True
 
                 if rebuild:
@@ -432,14 +743,27 @@ class ManualContext(SuperContext):
                 self.request_update_tracker_and_locations_table()
 
             def update_search_from_input(self, instance, text: str):
-                self.ctx.set_search(text)
-                self.request_update_tracker_and_locations_table() # if we want search to be "snappier", we can just make this update
+                self.search_trigger.cancel()
+                self.search_trigger()
 
             def clear_search_input(self):
                 self.search_textbox.text = ""
-                self.ctx.clear_search()
-                self.request_update_tracker_and_locations_table() # if we want search to be "snappier", we can just make this update
+                self.search_trigger.cancel()
+                self.apply_search()
 
+            def apply_search(self, dt=None):
+                """Searches for what's in the search box, then only refreshes the rows that started or stopped matching."""
+                changed_item_ids, changed_location_ids = self.ctx.set_search(self.search_textbox.text)
+
+                self.ctx.updated_item_ids |= changed_item_ids
+                self.update_item_tracker()
+
+                changed_categories = set(self.victory_categories)
+                for location_id in changed_location_ids:
+                    changed_categories.update(self.ctx.location_category_index.categories_by_id.get(location_id, []))
+                self.update_location_tracker(category for category in changed_categories if category in self.location_category_widgets)
+
+            @timed
             def build_tracker_and_locations_table(self):
                 self.controls_panel.clear_widgets()
                 self.tracker_and_locations_panel.clear_widgets()
@@ -455,7 +779,7 @@ class ManualContext(SuperContext):
                 controls_styled_layout = ManualControlsStyledLayout(orientation="horizontal", size_hint_y=None, height=dp(40), padding=dp(5), background_color=self.ctx.colors["header_background"])
                 search_layout = BoxLayout(orientation="horizontal", size_hint=(None, None), width=dp(320), height=dp(30), spacing=dp(2))
                 search_label = Label(text="Search:", size_hint=(None, None), width=dp(55), height=dp(30), bold=True)
-                self.search_textbox = TextInput(size_hint=(None, None), width=dp(200), height=dp(30), multiline=False, write_tab=False)
+                self.search_textbox = TextInput(text=self.ctx.search_term, size_hint=(None, None), width=dp(200), height=dp(30), multiline=False, write_tab=False)
                 self.search_textbox.bind(text = self.update_search_from_input)
                 search_button = Button(size_hint=(None, None), width=dp(50), height=dp(30), text="Clear")
                 search_button.bind(on_release=lambda *args: self.clear_search_input())
@@ -467,56 +791,20 @@ class ManualContext(SuperContext):
                 self.controls_panel.add_widget(controls_styled_layout)
 
                 # seed all category names to start
-                for item in self.ctx.item_table.values() or AutoWorldRegister.world_types[self.ctx.game].item_name_to_item.values():
-                    if "category" in item and len(item["category"]) > 0:
-                        for category in item["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
-                            if "hidden" in category_settings and category_settings["hidden"]:
-                                continue
-                            if category not in self.item_categories:
-                                self.item_categories.append(category)
-
-                            if category not in self.listed_items:
-                                self.listed_items[category] = []
-
+                for category in self.ctx.item_category_index.ids_by_category:
+                    self.listed_items.setdefault(category, [])
 
                 # Items are not received on connect, so don't bother attempting to work with received items here
 
-                if not self.ctx.location_table and not hasattr(AutoWorldRegister.world_types[self.ctx.game], 'location_name_to_location'):
-                    raise Exception("The apworld for %s is too outdated for this client. Please update it." % (self.ctx.game))
-
                 for location_id in self.ctx.missing_locations:
-                    # holy nesting, wow
-                    location_name = self.ctx.location_names.lookup_in_game(location_id)
-                    location = self.ctx.get_location_by_name(location_name)
-
-                    if not location:
-                        continue
-
-                    if "category" in location and len(location["category"]) > 0:
-                        for category in location["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
-                            if "hidden" in category_settings and category_settings["hidden"]:
-                                continue
-                            if category not in self.location_categories:
-                                self.location_categories.append(category)
-
-                            if category not in self.listed_locations:
-                                self.listed_locations[category] = []
-
-                            self.listed_locations[category].append(location_id)
-                    else: # leave it in the generic category
-                        self.listed_locations["(No Category)"].append(location_id)
+                    for category in self.ctx.location_category_index.categories_by_id.get(location_id, []):
+                        self.listed_locations.setdefault(category, []).append(location_id)
 
                 victory_location =  self.ctx.goal_location
                 victory_categories = set(victory_location.get("category", []))
 
                 for category in victory_categories:
-                    if category not in self.location_categories:
-                        self.location_categories.append(category)
-
-                    if category not in self.listed_locations:
-                        self.listed_locations[category] = []
+                    self.listed_locations.setdefault(category, [])
 
                 if not victory_categories:
                     victory_categories.add("(No Category)")
@@ -528,6 +816,7 @@ class ManualContext(SuperContext):
                 tracker_panel_scrollable = TrackerLayoutScrollable(do_scroll=(False, True), bar_width=10)
                 tracker_panel = TreeView(root_options=dict(text="Items Received (%d)" % (items_length)), size_hint_y=None)
                 tracker_panel.bind(minimum_height=tracker_panel.setter('height'))
+                self.items_received_label = tracker_panel.root
 
                 # Since items_received is not available on connect, don't bother building item labels here
                 for item_category in sorted(self.listed_items.keys()):
@@ -535,19 +824,16 @@ class ManualContext(SuperContext):
                         TreeViewLabel(text = "%s (%s)" % (item_category, len(self.listed_items[item_category])))
                     )
 
-                    category_scroll = tracker_panel.add_node(TreeViewScrollView(size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
-                    category_layout = GridLayout(cols=1, size_hint_y=None)
-                    category_layout.bind(minimum_height = category_layout.setter('height'))
-                    category_scroll.add_widget(category_layout)
+                    category_scroll = tracker_panel.add_node(TreeViewRecycleView(viewclass=Label, size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
+
+                    self.item_category_widgets[item_category] = (category_tree, category_scroll)
+                    self.item_rows[item_category] = {}
 
                 locations_length = len(self.ctx.missing_locations)
                 locations_panel_scrollable = LocationsLayoutScrollable(do_scroll=(False, True), bar_width=10)
                 locations_panel = TreeView(root_options=dict(text="Remaining Locations (%d)" % (locations_length + 1)), size_hint_y=None)
                 locations_panel.bind(minimum_height=locations_panel.setter('height'))
-
-                # This seems like a redundant copy of the same check above?
-                if not self.ctx.location_table and not hasattr(AutoWorldRegister.world_types[self.ctx.game], 'location_name_to_location'):
-                    raise Exception("The apworld for %s is too outdated for this client. Please update it." % (self.ctx.game))
+                self.locations_remaining_label = locations_panel.root
 
                 for location_category in sorted(self.listed_locations.keys()):
                     locations_in_category = len(self.listed_locations[location_category])
@@ -560,315 +846,231 @@ class ManualContext(SuperContext):
                         TreeViewLabel(text = "%s (%s)" % (location_category, locations_in_category))
                     )
 
-                    category_scroll = locations_panel.add_node(TreeViewScrollView(size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
-                    category_layout = GridLayout(cols=1, size_hint_y=None)
-                    category_layout.bind(minimum_height = category_layout.setter('height'))
-                    category_scroll.add_widget(category_layout)
-
-                    for location_id in self.listed_locations[location_category]:
-                        location_button = TreeViewButton(text=self.ctx.location_names.lookup_in_game(location_id), size_hint=(None, None), height=30, width=400)
-                        location_button.bind(on_release=lambda *args, loc_id=location_id: self.location_button_callback(loc_id, *args))
-                        location_button.id = location_id
-                        category_layout.add_widget(location_button)
-
-                    # if this is the category that Victory is in, display the Victory button
-                    # if ("category" in victory_location_data and location_category in victory_location_data["category"]) or \
-                    #     ("category" not in victory_location_data and location_category == "(No Category)"):
-                    if location_category in victory_categories:
-                        # Add the Victory location to be marked at any point, which is why locations length has 1 added to it above
-                        victory_text = "VICTORY! (seed finished)" if victory_location["name"] == "__Manual Game Complete__" else "GOAL: " + victory_location["name"]
-                        location_button = TreeViewButton(text=victory_text, size_hint=(None, None), height=dp(30), width=dp(400))
-                        location_button.victory = True
-                        location_button.bind(on_release=self.victory_button_callback)
-                        category_layout.add_widget(location_button)
+                    category_scroll = locations_panel.add_node(TreeViewRecycleView(viewclass=LocationButton, size_hint=(1, None), size=(Window.width / 2, 250)), category_tree)
+                    self.location_category_widgets[location_category] = (category_tree, category_scroll)
+
+                # if this is the category that Victory is in, display the Victory button
+                # Add the Victory location to be marked at any point, which is why locations length has 1 added to it above
+                self.victory_categories = victory_categories
+                self.victory_text = "VICTORY! (seed finished)" if victory_location["name"] == "__Manual Game Complete__" else "GOAL: " + victory_location["name"]
+
+                self.update_location_tracker()
 
                 tracker_panel_scrollable.add_widget(tracker_panel)
                 locations_panel_scrollable.add_widget(locations_panel)
                 self.tracker_and_locations_panel.add_widget(tracker_panel_scrollable)
                 self.tracker_and_locations_panel.add_widget(locations_panel_scrollable)
 
-            def check_for_requested_update(self):
-                current_time = time.time()
-
-                # wait 0.25 seconds before executing update, in case there are multiple update requests coming in
-                if self.update_requested_time and current_time - self.update_requested_time >= 0.25:
-                    self.update_requested_time = None
-                    self.update_tracker_and_locations_table(self.update_requested_highlights)
-                    self.update_requested_highlights = False
+            def run_requested_update(self, dt=None):
+                self.update_tracker_and_locations_table(self.update_requested_highlights)
+                self.update_requested_highlights = False
 
             def request_update_tracker_and_locations_table(self, update_highlights=False):
-                self.update_requested_time = time.time()
                 self.update_requested_highlights = update_highlights or self.update_requested_highlights # if any of the requests wanted highlights, do highlight
+                # restart the countdown, so a burst of requests only runs one update
+                self.update_trigger.cancel()
+                self.update_trigger()
 
+            @timed
             def update_tracker_and_locations_table(self, update_highlights=False):
-                items_length = len(self.ctx.items_received)
-                locations_length = len(self.ctx.missing_locations)
-
-                if self.ctx.search_term:
-                    items_length = len([
-                        i for i in self.ctx.items_received
-                            if self.ctx.search_term.lower() in self.ctx.item_names.lookup_in_game(i.item).lower()
-                    ])
-
-                    locations_length = len([
-                        l for l in self.ctx.missing_locations
-                            if self.ctx.search_term.lower() in self.ctx.location_names.lookup_in_game(l).lower()
-                    ])
-
-                for _, child in enumerate(self.tracker_and_locations_panel.children):
-                    #
-                    # Structure of items:
-                    # TrackerLayoutScrollable -> TreeView -> TreeViewLabel, TreeViewScrollView -> GridLayout -> Label
-                    #        item tracker     -> category -> category label, category scroll   -> label col  -> item
-                    #
-                    if type(child) is TrackerLayoutScrollable:
-                        treeview = child.children[0] # TreeView
-                        treeview_nodes = treeview.iterate_all_nodes()
-
-                        items_received_label = next(treeview_nodes) # always the first node
-                        items_received_label.text = "Items Received (%s)" % (items_length)
-
-                        # loop for each category in listed items and get the label + scrollview
-                        for x in range(0, len(self.item_categories)):
-                            category_label = next(treeview_nodes) # TreeViewLabel for category
-                            category_scrollview = next(treeview_nodes) # TreeViewScrollView for housing category's grid layout
-
-                            old_category_text = category_label.text
-
-                            if type(category_label) is TreeViewLabel and type(category_scrollview) is TreeViewScrollView:
-                                category_grid = category_scrollview.children[0] # GridLayout
-
-                                category_name = re.sub(r"\s\(\d+\)$", "", category_label.text)
-                                category_count = 0
-                                category_unique_name_count = 0
-
-                                existing_item_labels = []
-                                bold_item_labels = []
-
-                                # for items that were already listed, determine if the qty changed. if it did, add them to the list to be bolded
-                                for item in category_grid.children:
-                                    if type(item) is Label:
-                                        # Get the item name from the item Label, minus quantity, then do a lookup for count
-                                        old_item_text = item.text
-                                        item_name = re.sub(r"\s\(\d+\)$", "", item.text)
-                                        item_id = self.ctx.item_names_to_id[item_name]
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == item_id))
-
-                                        # if the player is searching for text and the item name doesn't contain it, skip it
-                                        if self.ctx.search_term and not self.ctx.search_term.lower() in item_name.lower():
-                                            item.width = 0
-                                            item.height = 0
-                                            item.opacity = 0
-                                        else:
-                                            item.width = dp(400)
-                                            item.height = dp(30)
-                                            item.opacity = 1
-
-                                            if item_count > 0:
-                                                category_count += item_count
-                                                category_unique_name_count += 1
-
-                                        # Update the label quantity
-                                        item.text="%s (%s)" % (item_name, item_count)
-
-                                        if update_highlights and (old_item_text != item.text):
-                                            bold_item_labels.append(item_name)
-
-                                        existing_item_labels.append(item_name)
-
-                                # instead of reusing existing item listings, clear it all out and re-draw with the sorted list
-                                category_grid.clear_widgets()
-                                self.listed_items[category_name].clear()
-                                category_count = 0
-                                category_unique_name_count = 0
-
-                                # Label (for all item listings)
-                                sorted_items_received = sorted([
-                                    i.item for i in self.ctx.items_received
-                                ])
-
-                                for network_item in sorted_items_received:
-                                    item_name = self.ctx.item_names.lookup_in_game(network_item)
-                                    item_data = self.ctx.get_item_by_name(item_name)
-
-                                    # if the player is searching for text and the item name doesn't contain it, skip it
-                                    if self.ctx.search_term and not self.ctx.search_term.lower() in item_name.lower():
-                                        continue
-
-                                    if "category" not in item_data or not item_data["category"]:
-                                        item_data["category"] = ["(No Category)"]
-
-                                    if category_name in item_data["category"] and network_item not in self.listed_items[category_name]:
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == network_item))
-                                        item_text = Label(text="%s (%s)" % (item_name, item_count),
-                                                    size_hint=(None, None), height=dp(30), width=dp(400), bold=True)
-
-                                        # if the item was previously listed and was bold, or if it wasn't previously listed at all, make it bold
-                                        item_text.bold = (update_highlights and (item_name in bold_item_labels or item_name not in existing_item_labels))
-
-                                        category_grid.add_widget(item_text)
-                                        self.listed_items[category_name].append(network_item)
-
-                                        category_count += item_count
-                                        category_unique_name_count += 1
-
-                            scrollview_height = 30 * category_unique_name_count
-
-                            if scrollview_height > 250:
-                                scrollview_height = 250
-
-                            if scrollview_height < 10:
-                                scrollview_height = 50
-
-                            category_name = re.sub(r"\s\(\d+\)$", "", category_label.text)
-                            category_label.text = "%s (%s)" % (category_name, category_count)
-
-                            if update_highlights:
-                                category_label.bold = True if old_category_text != category_label.text else False
-
-                            category_scrollview.size=(Window.width / 2, scrollview_height)
-
-                    #
-                    # Structure of locations:
-                    # LocationsLayoutScrollable -> TreeView -> TreeViewLabel, TreeViewScrollView -> GridLayout -> Button
-                    #      location tracker     -> category -> category label, category scroll   -> label col  -> location
-                    #
-                    if type(child) is LocationsLayoutScrollable:
-                        treeview = child.children[0] # TreeView
-                        treeview_nodes = treeview.iterate_all_nodes()
-
-                        locations_remaining_label = next(treeview_nodes) # always the first node
-                        locations_remaining_label.text = "Remaining Locations (%d)" % (locations_length)
-
-                        # loop for each category in listed items and get the label + scrollview
-                        for x in range(0, len(self.location_categories)):
-                            category_label = next(treeview_nodes) # TreeViewLabel for category
-                            category_scrollview = next(treeview_nodes) # TreeViewScrollView for housing category's grid layout
-
-                            if type(category_label) is TreeViewLabel and type(category_scrollview) is TreeViewScrollView:
-                                category_grid = category_scrollview.children[0] # GridLayout
-
-                                category_name = re.sub(r"\s\(\d+\/?(\d+)?\)$", "", category_label.text)
-                                category_count = 0
-                                reachable_count = 0
-
-                                buttons_to_remove = []
-
-                                # since victory is handled more briefly below, need to pull show/hide into functions here to reuse
-                                def show_button_during_search(btn: TreeViewButton):
-                                    btn.width = dp(400)
-                                    btn.height = dp(30)
-                                    btn.opacity = 1
-                                    btn.disabled = False
-
-                                def hide_button_during_search(btn: TreeViewButton):
-                                    btn.width = 0
-                                    btn.height = 0
-                                    btn.opacity = 0
-                                    btn.disabled = True
-
-                                # Label (for existing item listings)
-                                for location_button in category_grid.children:
-                                    if type(location_button) is TreeViewButton:
-                                        # should only be true for the victory location button, which has different text
-                                        if location_button.text not in (self.ctx.location_table or AutoWorldRegister.world_types[self.ctx.game].location_name_to_location):
-                                            # if the player is searching for text and the location name doesn't contain it, hide and disable it
-                                            if self.ctx.search_term and not self.ctx.search_term.lower() in location_button.text.lower():
-                                                hide_button_during_search(location_button)
-                                            else:
-                                                show_button_during_search(location_button)
-                                                category_count += 1
-
-                                                if location_button.victory and "__Victory__" in self.ctx.tracker_reachable_events:
-                                                    location_button.background_color = self.ctx.colors['location_in_logic']
-                                                    reachable_count += 1
-
-                                                continue
-
-                                        if location_button.id and location_button.id not in self.ctx.missing_locations:
-                                            import logging
-
-                                            logging.info("location button being removed: " + location_button.text)
-                                            buttons_to_remove.append(location_button)
-                                            continue
-
-                                        was_reachable = False
-
-                                        if location_button.text in self.ctx.tracker_reachable_locations:
-                                            location_button.background_color = self.ctx.colors['location_in_logic']
-                                            was_reachable = True
-                                        else:
-                                            location_button.background_color = self.ctx.colors['location_default']
-
-                                        # if the player is searching for text and the location name doesn't contain it, hide and disable it
-                                        if self.ctx.search_term and not self.ctx.search_term.lower() in location_button.text.lower():
-                                            hide_button_during_search(location_button)
-                                        else:
-                                            show_button_during_search(location_button)
-
-                                            if was_reachable:
-                                                reachable_count += 1
-
-                                            category_count += 1
-
-                                for location_button in buttons_to_remove:
-                                    location_button.parent.remove_widget(location_button)
-
-                                scrollview_height = 30 * category_count
-
-                                if scrollview_height > 250:
-                                    scrollview_height = 250
-
-                                if scrollview_height < 10:
-                                    scrollview_height = 50
-
-                                count_text = category_count
-
-                                if tracker_loaded:
-                                    count_text = "{}/{}".format(reachable_count, category_count)
-
-                                category_name = re.sub(r"\s\(\d+\/?(\d+)?\)$", "", category_label.text)
-                                category_label.text = "%s (%s)" % (category_name, count_text)
-
-                                if reachable_count > 0:
-                                    # treeviewlabels don't have background color. because #justkivythings.
-                                    category_label.even_color = self.ctx.colors['category_in_logic']
-                                    category_label.odd_color = self.ctx.colors['category_in_logic']
-                                else:
-                                    category_label.even_color = self.ctx.colors['category_even_default']
-                                    category_label.odd_color = self.ctx.colors['category_odd_default']
-
-                                category_scrollview.size=(Window.width / 2, scrollview_height)
+                self.update_item_tracker(update_highlights)
+                self.update_location_tracker()
+
+            @timed
+            def update_location_tracker(self, categories: typing.Optional[typing.Iterable[str]] = None):
+                """Refreshes the rows of the given location categories (or all of them) from the remaining locations.
+                Only the data is rebuilt; the recycle views reuse their existing widgets to show it."""
+                if not self.location_category_widgets:
+                    return  # not built yet
+
+                if self.ctx.matching_location_ids is None:
+                    locations_length = len(self.ctx.missing_locations)
+                else:
+                    locations_length = len(self.ctx.missing_locations & self.ctx.matching_location_ids)
+                self.locations_remaining_label.text = "Remaining Locations (%d)" % (locations_length)
+
+                for category_name in categories if categories is not None else self.location_category_widgets:
+                    category_label, category_view = self.location_category_widgets[category_name]
+                    listed = self.listed_locations[category_name]
+                    listed[:] = [
+                        location_id for location_id in listed
+                            if location_id in self.ctx.missing_locations and location_id not in self.ctx.locations_checked
+                    ]
+
+                    rows = []
+                    reachable_count = 0
+
+                    for location_id in listed:
+                        # if the player is searching for text and the location name doesn't contain it, leave it out
+                        if not self.ctx.is_location_matching(location_id):
+                            continue
+
+                        location_name = self.ctx.get_location_by_id(location_id)["name"]
+
+                        if location_id in self.ctx.reachable_location_ids:
+                            background_color = self.ctx.colors['location_in_logic']
+                            reachable_count += 1
+                        else:
+                            background_color = self.ctx.colors['location_default']
+
+                        rows.append({"text": location_name, "location_id": location_id, "victory": False,
+                                     "background_color": background_color, "callback": self.location_button_callback})
+
+                    if category_name in self.victory_categories and self.ctx.search_term.lower() in self.victory_text.lower():
+                        background_color = self.ctx.colors['location_default']
+                        if "__Victory__" in self.ctx.tracker_reachable_events:
+                            background_color = self.ctx.colors['location_in_logic']
+                            reachable_count += 1
+
+                        rows.append({"text": self.victory_text, "location_id": 0, "victory": True,
+                                     "background_color": background_color, "callback": self.victory_button_callback})
+
+                    category_view.data = rows
+
+                    count_text = len(rows)
+
+                    if tracker_loaded or self.ctx.local_logic:
+                        count_text = "{}/{}".format(reachable_count, len(rows))
+
+                    category_label.text = "%s (%s)" % (category_name, count_text)
+
+                    if reachable_count > 0:
+                        # treeviewlabels don't have background color. because #justkivythings.
+                        category_label.even_color = self.ctx.colors['category_in_logic']
+                        category_label.odd_color = self.ctx.colors['category_in_logic']
+                    else:
+                        category_label.even_color = self.ctx.colors['category_even_default']
+                        category_label.odd_color = self.ctx.colors['category_odd_default']
+
+                    category_view.size = (Window.width / 2, min(30 * len(rows), 250) or 50)
+
+            @timed
+            def update_item_tracker(self, update_highlights=False):
+                """Brings the item tracker up to date, only touching the labels of items whose count or visibility changed."""
+                if not self.item_category_widgets:
+                    return  # not built yet
+
+                updated_item_ids = self.ctx.updated_item_ids
+                self.ctx.updated_item_ids = set()
+
+                if self.item_tracker_stale:
+                    # nothing is listed yet, so look at everything received
+                    updated_item_ids |= set(self.ctx.received_item_counts)
+                    self.item_tracker_stale = False
+
+                previously_bold_rows = self.bold_item_rows
+                self.bold_item_rows = set()
+                updated_categories = set()
+
+                for item_id in updated_item_ids:
+                    item_name = self.ctx.get_item_by_id(item_id)["name"]
+                    item_count = self.ctx.received_item_counts[item_id]
+                    # if the player is searching for text and the item name doesn't contain it, don't list it
+                    visible = item_count > 0 and self.ctx.is_item_matching(item_id)
+                    item_text = "%s (%s)" % (item_name, item_count)
+
+                    for category in self.ctx.item_category_index.categories_by_id.get(item_id, []):
+                        rows = self.item_rows[category]
+                        row = rows.get(item_id)
+
+                        if not visible:
+                            if row:
+                                del rows[item_id]
+                                self.listed_items[category].remove(item_id)
+                                updated_categories.add(category)
+                            continue
+
+                        if row is None:
+                            row = {"text": item_text, "bold": False}
+                            rows[item_id] = row
+                            bisect.insort(self.listed_items[category], item_id)
+                        elif row["text"] != item_text:
+                            row["text"] = item_text
+                        else:
+                            continue
+
+                        updated_categories.add(category)
+                        if update_highlights:
+                            row["bold"] = True
+                            self.bold_item_rows.add((category, item_id))
+
+                for category, item_id in previously_bold_rows - self.bold_item_rows:
+                    row = self.item_rows[category].get(item_id)
+                    if row:
+                        row["bold"] = False
+                        updated_categories.add(category)
+
+                if update_highlights:
+                    # only the categories that change this time stay bold
+                    for category_label in self.bold_category_labels:
+                        category_label.bold = False
+                    self.bold_category_labels = set()
+
+                for category in updated_categories:
+                    category_label, category_view = self.item_category_widgets[category]
+                    listed = self.listed_items[category]
+                    rows = self.item_rows[category]
+                    category_view.data = [rows[item_id] for item_id in listed]
+                    category_count = sum(self.ctx.received_item_counts[item_id] for item_id in listed)
+
+                    old_category_text = category_label.text
+                    category_label.text = "%s (%s)" % (category, category_count)
+                    if update_highlights and old_category_text != category_label.text:
+                        category_label.bold = True
+                        self.bold_category_labels.add(category_label)
+
+                    category_view.size = (Window.width / 2, min(30 * len(listed), 250) or 50)
+
+                if self.ctx.matching_item_ids is not None:
+                    items_length = sum(self.ctx.received_item_counts[item_id] for item_id in self.ctx.matching_item_ids & self.ctx.received_item_counts.keys())
+                else:
+                    items_length = len(self.ctx.items_received)
+                self.items_received_label.text = "Items Received (%s)" % (items_length)
 
-            def location_button_callback(self, location_id, button):
-                if button.text not in self.ctx.location_names_to_id:
+            def location_button_callback(self, button):
+                if button.location_id not in self.ctx.location_records:
                     raise Exception("Locations were not loaded correctly. Please reconnect your client.")
 
-                if location_id:
-                    self.ctx.locations_checked.append(location_id)
-                    self.ctx.syncing = True
-                    button.parent.remove_widget(button)
-
-                    # message = [{"cmd": 'LocationChecks', "locations": [location_id]}]
-                    # self.ctx.send_msgs(message)
+                if button.location_id:
+                    self.ctx.queue_location_checks([button.location_id])
+                    # drop its rows right away, instead of waiting for the server to confirm the check
+                    self.update_location_tracker(
+                        category for category in self.ctx.location_category_index.categories_by_id.get(button.location_id, [])
+                            if category in self.location_category_widgets
+                    )
 
             def victory_button_callback(self, button):
                 self.ctx.items_received.append("__Victory__")
-                self.ctx.syncing = True
+                self.ctx.wake_watcher()
 
         return ManualManager
 
 async def game_watcher_manual(ctx: ManualContext):
+    """Sends whatever the client flagged since it last ran. Sleeps until woken by ctx.wake_watcher(), instead of polling."""
     while not ctx.exit_event.is_set():
-        if ctx.ui:
-            ctx.ui.check_for_requested_update()
+        await ctx.watcher_event.wait()
+        if ctx.pending_location_checks and not ctx.exit_event.is_set():
+            # give any other checks a moment to come in, so they're all sent together
+            await asyncio.sleep(ctx.location_check_batch_delay)
+        else:
+            # still let anything else that happens in the same tick queue up
+            await asyncio.sleep(0)
+        ctx.watcher_event.clear()
+
+        if ctx.exit_event.is_set():
+            break
 
         if ctx.syncing == True:
-            sync_msg = [{'cmd': 'Sync'}]
-            if ctx.locations_checked:
-                sync_msg.append({"cmd": "LocationChecks", "locations": list(ctx.locations_checked)})
-            await ctx.send_msgs(sync_msg)
             ctx.syncing = False
+            # a manual resync also resends every check the server hasn't confirmed yet
+            ctx.pending_location_checks |= ctx.locations_checked - ctx.checked_locations
+            await ctx.send_msgs([{'cmd': 'Sync'}])
+
+        # only send the checks that are new since the last message
+        new_checks = ctx.pending_location_checks - ctx.checked_locations
+        ctx.pending_location_checks = set()
+        if new_checks:
+            await ctx.send_msgs([{"cmd": "LocationChecks", "locations": sorted(new_checks)}])
 
         if ctx.set_deathlink:
             ctx.set_deathlink = False
@@ -878,28 +1080,32 @@ async def game_watcher_manual(ctx: ManualContext):
             ctx.deathlink_out = False
             await ctx.send_death()
 
-        sending = []
         victory = ("__Victory__" in ctx.items_received)
-        ctx.locations_checked = sending
-        message = [{"cmd": 'LocationChecks', "locations": sending}]
-        await ctx.send_msgs(message)
         if not ctx.finished_game and victory:
-            await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
             ctx.finished_game = True
-        await asyncio.sleep(0.1)
-
-
-def read_apmanual_file(apmanual_file):
-    from base64 import b64decode
-
-    with open(apmanual_file, 'r') as f:
-        return json.loads(b64decode(f.read()))
+            await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
 
 
 async def main(args):
     config_file = {}
     if args.apmanual_file:
         config_file = read_apmanual_file(args.apmanual_file)
+
+        # newer .apmanual files have a hash of the data they were generated with, along with what the seed changed from it
+        # (or, in some version 2 files, a full copy of it), see ApManual.py
+        world = AutoWorldRegister.world_types.get(config_file.get("game"))
+        world_module = sys.modules.get(world.__module__) if world else None
+        get_installed_hash = getattr(world_module, "get_client_data_hash", None)
+        if world and config_file.get("data_hash"):
+            if get_installed_hash and get_installed_hash() == config_file["data_hash"]:
+                for key in client_data_tables:
+                    config_file.pop(key, None)
+                if config_file.get("data_changes"):
+                    config_file.update(merge_client_data(world_module.get_base_client_data(), config_file["data_changes"]))
+            elif "items" in config_file:
+                logger.info("The installed %s apworld isn't the one this seed was generated with, so the seed's own items and locations are used." % (config_file["game"]))
+            else:
+                logger.warning("The installed %s apworld isn't the one this seed was generated with, so its items and locations might not match." % (config_file["game"]))
     ctx = ManualContext(args.connect, args.password, config_file.get("game"), config_file.get("player_name"))
     ctx.server_task = asyncio.create_task(server_loop(ctx), name="server loop")
 
@@ -919,6 +1125,7 @@ async def main(args):
     await ctx.exit_event.wait()
     ctx.server_address = None
 
+    ctx.wake_watcher() # so it notices the exit
     await progression_watcher
 
     await ctx.shutdown()
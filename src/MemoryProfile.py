@@ -0,0 +1,147 @@
+import functools
+import json
+import logging
+import os
+import sys
+import tracemalloc
+from typing import Callable
+
+from .Meta import enable_memory_profiling
+
+# Snapshots the memory allocated during each generation stage of ManualWorld, when memory profiling is enabled in
+# meta.json (or with the MANUAL_PROFILE_MEMORY environment variable). Like stage timing, it leaves the stages
+# untouched when it isn't, but it's much slower when it is: it's meant for finding where the memory goes, not for every
+# generation.
+#
+# Each stage records, per player, the memory it retained (still allocated once it's done) and its peak, along with the
+# retained memory attributed to the Manual subsystem that allocated it: the innermost Manual module in the allocation's
+# traceback (Regions.py for the regions and locations it creates, Rules.py for the rule closures, ...), or the
+# Archipelago module if the Manual isn't in it at all.
+
+# how many frames of each allocation tracemalloc keeps, if it isn't tracing already; enough to get from Archipelago
+# back into the Manual
+traceback_frames = 25
+
+package_path = os.path.dirname(__file__)
+
+# leaves out what tracemalloc and this module allocate for themselves
+snapshot_filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+
+
+class MemoryProfile:
+    def __init__(self):
+        # player: stage: {"retained": bytes, "peak": bytes, "subsystems": {subsystem: bytes}, "caches": {name: bytes}}
+        self.players: dict[int, dict[str, dict]] = {}
+
+    def record(self, player: int, stage: str, retained: int, peak: int, subsystems: dict[str, int], caches: dict[str, int]):
+        self.players.setdefault(player, {})[stage] = {"retained": retained, "peak": peak, "subsystems": subsystems, "caches": caches}
+
+    def clear(self):
+        self.players.clear()
+
+    def to_dict(self) -> dict:
+        return {
+            player: {
+                "retained": sum(stage["retained"] for stage in stages.values()),
+                "peak": max(stage["peak"] for stage in stages.values()),
+                "stages": stages,
+            }
+            for player, stages in self.players.items()
+        }
+
+    def report(self, top: int = 5) -> list[str]:
+        """Per player, the retained and peak memory of each stage and the subsystems that retained the most."""
+        lines = []
+        for player, profile in self.to_dict().items():
+            lines.append(f"player {player}: {format_size(profile['retained'])} retained, {format_size(profile['peak'])} peak")
+            for stage, memory in profile["stages"].items():
+                subsystems = sorted(memory["subsystems"].items(), key=lambda entry: entry[1], reverse=True)[:top]
+                lines.append(f"    {stage}: {format_size(memory['retained'])} retained, {format_size(memory['peak'])} peak ("
+                             + ", ".join(f"{subsystem} {format_size(size)}" for subsystem, size in subsystems) + ")")
+            caches = profile["stages"][list(profile["stages"])[-1]]["caches"]
+            lines.append("    world data: " + ", ".join(f"{name} {format_size(size)}" for name, size in caches.items()))
+        return lines
+
+    def write_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+
+memory_profile = MemoryProfile()
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+def world_data(world) -> dict[str, object]:
+    """The per-player data and caches of the world, measured after every stage."""
+    return {
+        # shared by every player of the game, keyed by player
+        "item_counts": world.item_counts.get(world.player),
+        "item_value_index": world.item_value_index.get(world.player),
+        "item_value_totals": world.item_value_totals.get(world.player),
+        "start_inventory": vars(world).get("start_inventory"),
+        "yaml_compare_rule_cache": getattr(world, "yaml_compare_rule_cache", None),
+        "rule_profile": world.rule_profile.stats if world.rule_profile else None,
+    }
+
+
+def deep_size(value, seen: set[int]) -> int:
+    """The size of the value and every container it holds, counting each object once. Other objects aren't followed,
+    so an item doesn't bring its whole multiworld along."""
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+
+def subsystem_of(traceback: tracemalloc.Traceback) -> str:
+    # the frames go from the oldest to the most recent, and the most recent Manual frame is the one that asked for it
+    for frame in reversed(traceback):
+        if frame.filename.startswith(package_path) and not frame.filename.endswith(("MemoryProfile.py", "StageTiming.py")):
+            return os.path.relpath(frame.filename, package_path).replace(os.sep, "/")
+    return os.path.basename(traceback[-1].filename) if len(traceback) else "(unknown)"
+
+
+def compare_snapshots(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> dict[str, int]:
+    subsystems: dict[str, int] = {}
+    for difference in after.compare_to(before, "traceback"):
+        if difference.size_diff:
+            subsystem = subsystem_of(difference.traceback)
+            subsystems[subsystem] = subsystems.get(subsystem, 0) + difference.size_diff
+    return subsystems
+
+
+def profiled_stage(func: Callable) -> Callable:
+    """Decorates a stage method of ManualWorld, to snapshot the memory it allocates."""
+    if not enable_memory_profiling:
+        return func
+
+    @functools.wraps(func)
+    def profiled_func(self, *args, **kwargs):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(traceback_frames)
+        before = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(snapshot_filters)
+            seen = set()
+            caches = {name: deep_size(data, seen) for name, data in world_data(self).items() if data is not None}
+            memory_profile.record(self.player, func.__name__, current - start, peak - start, compare_snapshots(before, after), caches)
+
+    return profiled_func
+
+
+def log_memory_profile(game: str):
+    logging.info(f"{game} memory profile:\n" + "\n".join(f"    {line}" for line in memory_profile.report()))
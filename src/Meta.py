@@ -1,4 +1,6 @@
 
+import os
+
 from BaseClasses import Tutorial
 from worlds.AutoWorld import World, WebWorld
 from .Data import meta_table
@@ -69,3 +71,6 @@ world_description: str = set_world_description("""
 world_webworld: ManualWeb = set_world_webworld(ManualWeb())
 
 enable_region_diagram = bool(meta_table.get("enable_region_diagram", False))
+enable_rule_profiling = bool(meta_table.get("enable_rule_profiling", False)) or bool(os.environ.get("MANUAL_PROFILE_RULES"))
+enable_stage_timing = bool(meta_table.get("enable_stage_timing", False)) or bool(os.environ.get("MANUAL_STAGE_TIMING"))
+enable_memory_profiling = bool(meta_table.get("enable_memory_profiling", False)) or bool(os.environ.get("MANUAL_PROFILE_MEMORY"))
@@ -0,0 +1,34 @@
+from typing import Iterable
+
+from BaseClasses import MultiWorld
+
+from .Helpers import get_option_fingerprint, get_location_categories, resolve_category_enablement, get_shared_enabled_locations, \
+    shared_category_enablement
+
+# Works out the option-dependent tables of a Manual's players (which categories their options enable, and which
+# locations that leaves enabled) before create_regions, once per option fingerprint instead of once per player. The
+# results go into the same shared tables that Helpers would otherwise fill in as it needed them, so a player whose
+# options or hooks end up elsewhere just works it out as usual.
+#
+# Each fingerprint only takes some set arithmetic, so it's done in the generator process: sending it to other processes
+# cost more than it saved. Rules and data validation aren't part of it, they need the live worlds and multiworld.
+
+
+def pregenerate_option_tables(multiworld: MultiWorld, players: Iterable[int]) -> int:
+    """Works out the tables of every option fingerprint of the players that aren't already, from their world's location
+    table. Returns how many fingerprints it worked out."""
+    players = list(players)
+    if not players:
+        return 0
+
+    # every player of the Manual shares its world's location table, and that's the one create_regions filters
+    location_table = multiworld.worlds[players[0]].location_table
+    fingerprints = {get_option_fingerprint(multiworld, player) for player in players}
+    fingerprints = [fingerprint for fingerprint in fingerprints if fingerprint not in shared_category_enablement]
+
+    for fingerprint in fingerprints:
+        enablement = shared_category_enablement[fingerprint] = resolve_category_enablement(fingerprint)
+        disabled_categories = frozenset(category for category in get_location_categories(location_table) if not enablement.get(category, True))
+        get_shared_enabled_locations(location_table, disabled_categories)
+
+    return len(fingerprints)
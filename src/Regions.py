@@ -1,5 +1,5 @@
 from BaseClasses import Entrance, MultiWorld, Region
-from .Helpers import is_category_enabled, is_location_enabled
+from .Helpers import is_category_enabled, is_location_enabled, get_enabled_location_names
 from .Data import region_table
 from .Locations import ManualLocation, location_name_to_location
 from worlds.AutoWorld import World
@@ -21,6 +21,12 @@ regionMap["Manual"] = {
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    enabled_location_names = get_enabled_location_names(multiworld, player)
+    region_locations = {region: [] for region in regionMap}
+    for location in world.location_table:
+        if location.get("region") in region_locations and location["name"] in enabled_location_names:
+            region_locations[location["region"]].append(location["name"])
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -32,13 +38,7 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
-
-        new_region = create_region(world, multiworld, player, region, locations, exit_array)
+        new_region = create_region(world, multiworld, player, region, region_locations[region], exit_array)
         multiworld.regions += [new_region]
 
     menu = create_region(world, multiworld, player, "Menu", None, ["Manual"])
@@ -1,11 +1,11 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 from enum import IntEnum
 from operator import eq, ge, le
 
 from .Regions import regionMap
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+    format_to_valid_identifier, format_state_prog_items_key, get_requires_tree, ProgItemsCat
 
 from BaseClasses import MultiWorld, CollectionState
 from worlds.AutoWorld import World
@@ -16,6 +16,7 @@ import re
 import math
 import inspect
 import logging
+import time
 
 if TYPE_CHECKING:
     from . import ManualWorld
@@ -24,6 +25,7 @@ class LogicErrorSource(IntEnum):
     INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
     EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
     EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
+    REQUIRES_TREE = 4 # includes nodes that aren't an item, category, function, and/or
 
 def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
     object_type = "location/region"
@@ -40,6 +42,8 @@ def construct_logic_error(location_or_region: dict, source: LogicErrorSource) ->
         source_text = "There may be missing || around item names, or an AND/OR that is missing a value on one side, or other invalid syntax for the requires."
     elif source == LogicErrorSource.EVALUATE_STACK_SIZE:
         source_text = "There may be missing {} around requirement functions like YamlEnabled() / YamlDisabled(), or other invalid syntax for the requires."
+    elif source == LogicErrorSource.REQUIRES_TREE:
+        source_text = "The requires_tree includes a node that isn't an item, category, function, \"and\" or \"or\"."
     else:
         source_text = "This requires includes invalid syntax."
 
@@ -101,170 +105,237 @@ def evaluate_postfix(expr: str, location: str) -> bool:
 
     return stack.pop()
 
-def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
+class RuleProfile:
+    """Counts the calls and time of every location and entrance rule of a world, when rule profiling is on.
+    A rule's time includes any rules it checks in turn, like with canReachLocation."""
 
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player)
+    def __init__(self):
+        self.stats: dict[str, list] = {}  # rule name: [calls, seconds, times met]
+
+    def wrap(self, name: str, rule: Callable[[CollectionState], bool]) -> Callable[[CollectionState], bool]:
+        stats = self.stats.setdefault(name, [0, 0.0, 0])
+
+        def profiled_rule(state: CollectionState) -> bool:
+            start = time.perf_counter()
+            try:
+                result = rule(state)
+            finally:
+                stats[1] += time.perf_counter() - start
+
+            stats[0] += 1
+            if result:
+                stats[2] += 1
+            return result
+
+        return profiled_rule
+
+    def write_report(self, spoiler_handle, player_name: str):
+        total = sum(seconds for _, seconds, _ in self.stats.values())
+        spoiler_handle.write(f"\n\nRule profile for {player_name} ({total * 1000:.2f} ms in total, slowest first):\n\n")
+        for name, (calls, seconds, met) in sorted(self.stats.items(), key=lambda entry: entry[1][1], reverse=True):
+            if not calls:
+                continue
+            spoiler_handle.write(f"{name}: {calls} calls, {seconds * 1000:.2f} ms, {seconds / calls * 1000000:.1f} µs per call,"
+                                 f" met {met / calls:.0%} of the time\n")
+
+
+def profile_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    """Wraps every location and entrance rule of the player in world.rule_profile. Done once all of them are set, hooks included."""
+    for region in multiworld.get_regions(player):
+        for entrance in region.exits:
+            entrance.access_rule = world.rule_profile.wrap(f"Entrance {entrance.name}", entrance.access_rule)
+        for location in region.locations:
+            location.access_rule = world.rule_profile.wrap(f"Location {location.name}", location.access_rule)
+
+
+def resolve_require_count(item_count: str | int, pool_count: int, optional: bool = False) -> int:
+    """Convert a requires count (a number, 'all', 'half' or a percentage) to the amount needed,
+    based on how many of the item(s) are in the pool.\n
+    Optional counts are clamped to the pool, like OptOne does."""
+    item_count = str(item_count).strip()
+
+    if item_count.lower() == 'all':
+        return pool_count
+    elif item_count.lower() == 'half':
+        return int(pool_count / 2)
+    elif item_count.endswith('%') and len(item_count) > 1:
+        percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+        return math.ceil(pool_count * percent)
+
+    count = int(item_count)
+    if optional:
+        count = clamp(count, 0, pool_count)
+    return count
+
+def run_requires_functions(requires: str, area: dict, maximum_recursion: int, run_function: Callable[[str, str], bool | str]) -> str:
+    """Replaces every {function(args)} of a requires string with what run_function returns for it, 1 or 0 for a boolean,
+    and then the functions that returned in turn, up to maximum_recursion times."""
+    # Preparing some variables for exception messages
+    area_type = "region" if area.get("is_region",False) else "location"
+    area_name = area.get("name", f"unknown with these parameters: {area}")
+
+    def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
+        found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
+        if found_functions:
+            if recursionDepth > maximum_recursion:
+                raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {maximum_recursion}) \
+                                     \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
+                                     \n    And the currently processed requires look like this: "{requires_list}"')
+            else:
+                for item in found_functions:
+                    func_name = item[0]
+                    result = run_function(func_name, item[1])
+                    if isinstance(result, bool):
+                        requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
+                    else:
+                        requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
+
+            requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
+        return requires_list
+
+    return findAndRecursivelyExecuteFunctions(requires)
+
+def parse_requires_subject(subject: str) -> tuple[bool, str, str]:
+    """Whether an |item| or |@category| of a requires string is a category, with its name and count ("1" if it has none)."""
+    is_category = '|@' in subject
+
+    item = subject.lstrip('|@$').rstrip('|')
+
+    item_parts = item.split(":")  # type: list[str]
+    item_name = item
+    item_count = "1"
 
+    if len(item_parts) > 1:
+        item_name = item_parts[0].strip()
+        item_count = item_parts[1].strip()
+
+    return is_category, item_name, item_count
+
+def evaluate_requires_string(requires: str, area: dict, is_subject_met: Callable[[bool, str, str], bool]) -> bool:
+    """Evaluates a requires string whose functions were already run, using is_subject_met for each of its items and categories
+    (called with what parse_requires_subject returns). AND and OR have the same precedence and go left to right."""
+    requires_list = requires
+
+    # parse user written statement into list of each item
+    for item in dict.fromkeys(re.findall(r'\|[^|]+\|', requires_list)):
+        requires_list = requires_list.replace(item, "1" if is_subject_met(*parse_requires_subject(item)) else "0")
+
+    requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
+    requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
+
+    requires_string = infix_to_postfix("".join(requires_list), area)
+    return (evaluate_postfix(requires_string, area))
+
+def parse_legacy_require(item: str) -> tuple[str, int]:
+    """The name and count of an item of the legacy list form of requires, like "Item:2"."""
+    item_parts = item.split(":")
+    if len(item_parts) > 1:
+        return item_parts[0], int(item_parts[1])
+    return item, 1
+
+def check_legacy_requires(requires: list | dict, has: Callable[[str, int], bool]) -> bool:
+    """Checks the legacy list form of requires, given whether the player has at least a count of an item:
+    met as soon as every item of one of its "or" groups (a list, or a dict with an "or" list) is had, otherwise only if every other item is."""
+    canAccess = True
+
+    for item in requires:
+        # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+        if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+            canAccessOr = True
+            or_items = item
+
+            if isinstance(item, dict):
+                or_items = item["or"]
+
+            for or_item in or_items:
+                if not has(*parse_legacy_require(or_item)):
+                    canAccessOr = False
+
+            if canAccessOr:
+                canAccess = True
+                break
+        else:
+            if not has(*parse_legacy_require(item)):
+                canAccess = False
+
+    return canAccess
+
+def get_legacy_requires_item_names(requires: list | dict) -> set[str]:
+    """Every item the legacy list form of requires mentions."""
+    item_names = set()
+    for item in requires:
+        if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+            or_items = item["or"] if isinstance(item, dict) else item
+            item_names.update(parse_legacy_require(or_item)[0] for or_item in or_items)
+        else:
+            item_names.add(parse_legacy_require(item)[0])
+    return item_names
+
+def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    def runRequireFunction(state: CollectionState, area: dict, func_name: str, raw_args: str):
         # Preparing some variables for exception messages
         area_type = "region" if area.get("is_region",False) else "location"
         area_name = area.get("name", f"unknown with these parameters: {area}")
 
-        if requires_list == "":
-            return True
+        func_args = raw_args.split(",")
+        if func_args == ['']:
+            func_args.pop()
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
-
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
-
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
-            total = 0
-
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
-                else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
-                else:
-                    item_count = int(item_count)
+        func = globals().get(func_name)
 
-                total = state.count(item_name, player)
+        if func is None:
+            func = getattr(Rules, func_name, None)
 
-                if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
+        if not callable(func):
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
 
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
-
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
-
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+        convert_req_function_args(state, func, func_args, area_name)
+        try:
+            return func(*func_args)
+        except Exception as ex:
+            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                                \nUnless it was called by another function, it should look something like "{{{func_name}({raw_args})}}" in {area_type}s.json. \
+                                \nFull error message: \
+                                \n\n{type(ex).__name__}: {ex}')
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+    # this is only called when the area (think, location or region) has a "requires" field that is a string
+    def checkRequireStringForArea(state: CollectionState, area: dict):
+        requires_list = area["requires"]
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+        # Get the "real" item counts of item in the pool/placed/starting_items
+        items_counts = world.get_item_counts(player)
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+        if requires_list == "":
+            return True
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+        requires_list = run_requires_functions(requires_list, area, world.rules_functions_maximum_recursion,
+                                               lambda func_name, raw_args: runRequireFunction(state, area, func_name, raw_args))
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+        def isSubjectMet(is_category: bool, item_name: str, item_count: str) -> bool:
+            if is_category:
+                category_items = get_category_item_names(world.item_name_to_item, item_name)
+                category_items_counts = sum(items_counts.get(category_item, 0) for category_item in category_items)
+                try:
+                    item_count = resolve_require_count(item_count, category_items_counts)
+                except ValueError as e:
+                    raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
+                # a category without any items is never met
+                return bool(category_items) and sum(state.count(category_item, player) for category_item in category_items) >= item_count
 
-                if canAccessOr:
-                    canAccess = True
-                    break
-            else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+            item_count = resolve_require_count(item_count, items_counts.get(item_name, 0))
+            return state.count(item_name, player) >= item_count
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+        return evaluate_requires_string(requires_list, area, isSubjectMet)
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+    # this is only called when the area (think, location or region) has a "requires" field that is a dict
+    def checkRequireDictForArea(state: CollectionState, area: dict):
+        return check_legacy_requires(area["requires"], lambda item_name, item_count: state.has(item_name, player, item_count))
 
-        return canAccess
+    # this is only called when the area (think, location or region) has a "requires_tree" field that's still
+    # the already parsed form of its requires, which the world builder emits alongside the string
+    def checkRequireTreeForArea(state: CollectionState, area: dict, requires_tree: dict):
+        return get_compiled_require_tree(requires_tree, area)(state, world, area)
 
     # handle any type of checking needed, then ferry the check off to a dedicated method for that check
     def fullLocationOrRegionCheck(state: CollectionState, area: dict):
@@ -272,6 +343,11 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
         if not area:
             return True
 
+        # the tree is only used while it's still the parsed form of the requires, otherwise they're checked as usual
+        requires_tree = get_requires_tree(area)
+        if requires_tree is not None:
+            return checkRequireTreeForArea(state, area, requires_tree)
+
         # don't require the "requires" key for locations and regions if they don't need to use it
         if "requires" not in area.keys():
             return True
@@ -280,6 +356,11 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             return checkRequireStringForArea(state, area)
         else:  # item access is in dict form
             return checkRequireDictForArea(state, area)
+
+    # lets anything else (like the rule benchmark) check a requires exactly the way the rules below do
+    world.check_requires = fullLocationOrRegionCheck
+    world.run_require_function = runRequireFunction
+
     # calling get_item_counts here make sure the item_counts cache is created correctly for UT
     world.get_item_counts(player, True)
     used_location_names = []
@@ -317,6 +398,11 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             locationRegion['name'] = location['region']
             locationRegion['is_region'] = True
 
+            # AP only checks a location's rule once its parent region is reachable, and every entrance into that region
+            # already checks the region's requires, so they only need checking again if a hook moved the location elsewhere
+            if locFromWorld.parent_region and locFromWorld.parent_region.name == location['region']:
+                locationRegion = None
+
         if "requires" in location: # Location has requires, check them alongside the region requires
             def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
                 locationCheck = fullLocationOrRegionCheck(state, location)
@@ -328,12 +414,12 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
                 return locationCheck and regionCheck
 
             set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
+        elif locationRegion: # Only region access required, check the location's region's requires
             def fullRegionCheck(state, region=locationRegion):
                 return fullLocationOrRegionCheck(state, region)
 
             set_rule(locFromWorld, fullRegionCheck)
-        else: # No location region and no location requires? It's accessible.
+        else: # No location requires and its region is already checked by AP? It's accessible.
             def allRegionsAccessible(state):
                 return True
 
@@ -389,6 +475,108 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             args[index] = value
 
 
+# compiled once for every player of the game, by the id of the tree along with the tree itself, so a tree that reuses a freed
+# one's id never gets its check; the checks are given the world and the area they're checking when they run
+compiled_require_trees: dict[int, tuple[dict, Callable[[CollectionState, "ManualWorld", dict], bool]]] = {}
+
+def get_compiled_require_tree(tree: dict, area: dict) -> Callable[[CollectionState, "ManualWorld", dict], bool]:
+    compiled = compiled_require_trees.get(id(tree))
+    if compiled is None or compiled[0] is not tree:
+        compiled = compiled_require_trees[id(tree)] = (tree, compile_require_tree(tree, area))
+    return compiled[1]
+
+def compile_require_tree(node: dict, area: dict) -> Callable[[CollectionState, "ManualWorld", dict], bool]:
+    if "and" in node:
+        checks = [compile_require_tree(child, area) for child in node["and"]]
+        return lambda state, world, area: all(check(state, world, area) for check in checks)
+
+    if "or" in node:
+        checks = [compile_require_tree(child, area) for child in node["or"]]
+        return lambda state, world, area: any(check(state, world, area) for check in checks)
+
+    if "function" in node:
+        func_name = node["function"]
+        raw_args = node.get("args", "")
+
+        def checkFunction(state: CollectionState, world: "ManualWorld", area: dict) -> bool:
+            result = world.run_require_function(state, area, func_name, raw_args)
+            if isinstance(result, bool):
+                return result
+            # the world builder only emits trees whose functions return a boolean (it splices OptAll into the tree itself),
+            # so a requires string only comes from a tree written by hand, where the function stands on its own
+            string_area = {key: value for key, value in area.items() if key not in ("requires_tree", "requires_tree_source")}
+            return world.check_requires(state, {**string_area, "requires": str(result)})
+
+        return checkFunction
+
+    item_count = node.get("count", 1)
+    optional = node.get("optional", False)
+
+    if "item" in node:
+        item_name = node["item"]
+
+        def checkItem(state: CollectionState, world: "ManualWorld", area: dict) -> bool:
+            pool_count = world.get_item_counts(world.player).get(item_name, 0)
+            return state.count(item_name, world.player) >= resolve_require_count(item_count, pool_count, optional)
+
+        return checkItem
+
+    if "category" in node:
+        category_name = node["category"]
+
+        def checkCategory(state: CollectionState, world: "ManualWorld", area: dict) -> bool:
+            category_item_names = get_category_item_names(world.item_name_to_item, category_name)
+            # matches the string requires, where a category without any items is never met
+            if not category_item_names:
+                return False
+
+            items_counts = world.get_item_counts(world.player)
+            pool_count = sum(items_counts.get(name, 0) for name in category_item_names)
+            try:
+                required = resolve_require_count(item_count, pool_count, optional)
+            except ValueError as e:
+                raise ValueError(f"Invalid item count `{category_name}` in {area}.") from e
+
+            return sum(state.count(name, world.player) for name in category_item_names) >= required
+
+        return checkCategory
+
+    raise construct_logic_error(area, LogicErrorSource.REQUIRES_TREE)
+
+# the names of the items in each category, by the id of the item table they're from along with the table itself
+category_item_names_by_table: dict[int, tuple[dict, dict[str, list[str]]]] = {}
+
+def get_category_item_names(item_name_to_item: dict, category_name: str) -> list[str]:
+    cached = category_item_names_by_table.get(id(item_name_to_item))
+    if cached is None or cached[0] is not item_name_to_item:
+        by_category: dict[str, list[str]] = {}
+        for item in item_name_to_item.values():
+            for category in dict.fromkeys(item.get("category", [])):
+                by_category.setdefault(category, []).append(item["name"])
+        cached = category_item_names_by_table[id(item_name_to_item)] = (item_name_to_item, by_category)
+    return cached[1].get(category_name, [])
+
+# the ItemValue requirements of every requires string, shared by every player of the game: the values it asks for, and the most it asks of each
+required_item_values: dict[str, dict[str, int]] = {}
+
+def get_required_item_values(requires: str | list | dict) -> dict[str, int]:
+    """Returns the values that the requires (a string, or the legacy list/dict form) asks for with ItemValue, and the most it asks of each"""
+    if isinstance(requires, str):
+        values = required_item_values.get(requires)
+        if values is None:
+            values = required_item_values[requires] = {}
+            if "ItemValue" in requires:
+                for value, count in re.findall(r'\{ItemValue\(([^:]*)\:(.*?)\)\}', requires):
+                    value = value.lower().strip()
+                    values[value] = max(values.get(value, 0), int(count.split(",")[0]))
+        return values
+
+    values = {}
+    for child in (requires.values() if isinstance(requires, dict) else requires or []):
+        for value, count in get_required_item_values(child).items():
+            values[value] = max(values.get(value, 0), count)
+    return values
+
 def ItemValue(state: CollectionState, player: int, valueCount: str):
     """When passed a string with this format: 'valueName:int',
     this function will check if the player has collect at least 'int' valueName worth of items\n
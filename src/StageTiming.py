@@ -0,0 +1,112 @@
+import functools
+import json
+import logging
+import time
+from typing import Callable, Iterable, Optional
+
+from worlds.AutoWorld import World
+
+from .Meta import enable_stage_timing
+
+# Times every stage of ManualWorld, and every hook from hooks/World.py it calls, when stage timing is enabled in
+# meta.json (or with the MANUAL_STAGE_TIMING environment variable).
+# When it isn't, timed_stage and time_hooks leave everything exactly as it is, so there's nothing to pay for.
+# The timings add up for the whole process, across players and seeds, until stage_timings.clear() is called.
+
+# the stages that aren't over yet when stage_generate_output runs: every player's generate_output runs alongside it, and
+# extend_hint_information and write_spoiler come after it
+late_stages = ("stage generate_output", "stage extend_hint_information", "stage write_spoiler")
+
+
+class StageTimings:
+    def __init__(self):
+        # "stage create_items" or "hook after_create_items": [calls, seconds, slowest call, {player: seconds}]
+        self.timings: dict[str, list] = {}
+        self.seeds = 0
+
+    def record(self, name: str, player: Optional[int], elapsed: float):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [0, 0.0, 0.0, {}]
+        timing[0] += 1
+        timing[1] += elapsed
+        if elapsed > timing[2]:
+            timing[2] = elapsed
+        if player is not None:
+            timing[3][player] = timing[3].get(player, 0.0) + elapsed
+
+    def clear(self):
+        self.timings.clear()
+        self.seeds = 0
+
+    def to_dict(self, missing_stages: Iterable[str] = ()) -> dict:
+        return {
+            "seeds": self.seeds,
+            # the stages of the last seed that hadn't run yet, so the timings leave them out (or only have earlier seeds')
+            "missing_stages": list(missing_stages),
+            "timings": {
+                name: {
+                    "calls": calls,
+                    "total_ms": seconds * 1000,
+                    "mean_ms": seconds / calls * 1000,
+                    "max_ms": slowest * 1000,
+                    "per_player_ms": {player: player_seconds * 1000 for player, player_seconds in players.items()},
+                }
+                for name, (calls, seconds, slowest, players) in sorted(self.timings.items(), key=lambda entry: entry[1][1], reverse=True)
+            },
+        }
+
+    def report(self) -> list[str]:
+        """One line per stage and hook, slowest in total first."""
+        return [f"{name}: {timing['calls']} calls, {timing['total_ms']:.2f} ms in total, {timing['mean_ms']:.3f} ms mean, {timing['max_ms']:.2f} ms max"
+                for name, timing in self.to_dict()["timings"].items()]
+
+    def write_json(self, path: str, missing_stages: Iterable[str] = ()):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(missing_stages), f, indent=4)
+
+
+stage_timings = StageTimings()
+
+
+def player_of(args: tuple) -> Optional[int]:
+    """The player a stage or hook is running for: that of the first world among its arguments."""
+    for arg in args:
+        if isinstance(arg, World):
+            return arg.player
+    return None
+
+
+def timed(name: str, func: Callable) -> Callable:
+    if not enable_stage_timing:
+        return func
+
+    @functools.wraps(func)
+    def timed_func(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stage_timings.record(name, player_of(args), time.perf_counter() - start)
+
+    return timed_func
+
+
+def timed_stage(func: Callable) -> Callable:
+    """Decorates a stage method of ManualWorld."""
+    return timed(f"stage {func.__name__}", func)
+
+
+def time_hooks(namespace: dict, hooks_module: str):
+    """Replaces every function of the hooks module in the namespace (a module's globals) with a timed one."""
+    if not enable_stage_timing:
+        return
+
+    for name, value in list(namespace.items()):
+        if callable(value) and getattr(value, "__module__", None) == hooks_module:
+            namespace[name] = timed(f"hook {name}", value)
+
+
+def log_stage_timings(game: str, missing_stages: Iterable[str] = ()):
+    missing = f" (without {', '.join(missing_stages)} of the last seed, which hadn't run yet)" if missing_stages else ""
+    logging.info(f"{game} stage timings, over {stage_timings.seeds} seed(s){missing}:\n" + "\n".join(f"    {line}" for line in stage_timings.report()))
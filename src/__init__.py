@@ -1,7 +1,6 @@
-from base64 import b64encode
+import functools
 import logging
 import os
-import json
 from typing import Callable, Optional
 import webbrowser
 
@@ -10,17 +9,19 @@ from worlds.generic.Rules import forbid_items_for_player
 from worlds.LauncherComponents import Component, SuffixIdentifier, components, Type, launch_subprocess, icon_paths
 
 from .Data import item_table, location_table, region_table, category_table
+from .ApManual import write_apmanual_file, copy_client_data, diff_client_data, hash_client_data
 from .Game import game_name, filler_item_name, starting_items
-from .Meta import world_description, world_webworld, enable_region_diagram
+from .Meta import world_description, world_webworld, enable_region_diagram, enable_rule_profiling, enable_stage_timing, enable_memory_profiling
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, item_value_vectors
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
-from .Rules import set_rules
+from .Rules import set_rules, profile_rules, RuleProfile
+from .Pregeneration import pregenerate_option_tables
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import is_item_enabled, get_option_value, count_player_pool, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -36,6 +37,24 @@ from .hooks.World import \
     before_extend_hint_information, after_extend_hint_information, \
     after_collect_item, after_remove_item
 from .hooks.Data import hook_interpret_slot_data
+from .StageTiming import timed_stage, time_hooks, log_stage_timings, stage_timings, late_stages
+from .MemoryProfile import profiled_stage, log_memory_profile, memory_profile
+
+# with stage timing enabled, the hooks imported above are swapped for timed ones
+time_hooks(globals(), f"{__name__}.hooks.World")
+time_hooks(globals(), f"{__name__}.hooks.Data")
+
+# the client data as the apworld loads it, which .apmanual files only keep the changes from, see ApManual.py
+# only generation and the client need it, so it's copied the first time it's asked for instead of whenever the apworld is
+# imported; generation asks for it in stage_assert_generate, before anything it does can change the tables
+@functools.cache
+def get_base_client_data() -> dict:
+    return copy_client_data({"items": item_name_to_item, "locations": location_name_to_location, "regions": region_table, "categories": category_table})
+
+# lets .apmanual files say which data their changes are from
+@functools.cache
+def get_client_data_hash() -> str:
+    return hash_client_data(get_base_client_data())
 
 class ManualWorld(World):
     __doc__ = world_description
@@ -55,10 +74,17 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    item_value_vectors = item_value_vectors
 
     filler_item_name = filler_item_name
 
+    # the player's real pool, counted by get_item_counts: how many of each item, what each item with a value is worth
+    # per value, and what its progression items are worth together per value; counted again once the pool changes,
+    # which the signature of the pool they were counted from tells (see get_item_pool_signature)
     item_counts = {}
+    item_value_index = {}
+    item_value_totals = {}
+    item_pool_signatures = {}
     start_inventory = {}
 
     location_id_to_name = location_id_to_name
@@ -70,9 +96,17 @@ class ManualWorld(World):
     # UT (the universal-est of trackers) can now generate without a YAML
     ut_can_gen_without_yaml = True
 
+    # set when rule profiling is enabled in meta.json (or with the MANUAL_PROFILE_RULES environment variable)
+    rule_profile: Optional[RuleProfile] = None
+
+    # which categories the player's options enable, shared with the players with the same options (see Helpers.get_category_enablement)
+    category_enablement: Optional[dict[str, bool]] = None
+
+    @timed_stage
     def get_filler_item_name(self) -> str:
         return hook_get_filler_item_name(self, self.multiworld, self.player) or self.filler_item_name
 
+    @timed_stage
     def interpret_slot_data(self, slot_data: dict[str, any]):
         #this is called by tools like UT
         if not slot_data:
@@ -85,13 +119,32 @@ class ManualWorld(World):
                 regen = True
 
         regen = hook_interpret_slot_data(self, self.player, slot_data) or regen
+        if regen:
+            self.category_enablement = None
         return regen
 
     @classmethod
+    @timed_stage
     def stage_assert_generate(cls, multiworld) -> None:
         runGenerationDataValidation()
+        # hashed before generation can change the tables, so it matches the hash the client takes of them
+        get_client_data_hash()
+
+    @classmethod
+    @timed_stage
+    def stage_generate_early(cls, multiworld) -> None:
+        # every player's options are final by now, and nothing has been created from them yet
+        cls.pregenerate(multiworld)
 
+    @classmethod
+    def pregenerate(cls, multiworld) -> int:
+        """Works out which categories and locations the options of every player of this Manual enable, once per
+        distinct set of options (see Pregeneration.py). Returns how many distinct sets of options it worked out."""
+        return pregenerate_option_tables(multiworld, multiworld.get_game_players(cls.game))
 
+
+    @profiled_stage
+    @timed_stage
     def create_regions(self):
         before_create_regions(self, self.multiworld, self.player)
 
@@ -108,6 +161,8 @@ class ManualWorld(World):
 
         after_create_regions(self, self.multiworld, self.player)
 
+    @profiled_stage
+    @timed_stage
     def create_items(self):
         # Generate item pool
         pool = []
@@ -239,6 +294,7 @@ class ManualWorld(World):
         # then will remove specific item placements below from the overall pool
         self.multiworld.itempool += pool
 
+    @timed_stage
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
         name = before_create_item(name, self, self.multiworld, self.player)
 
@@ -267,31 +323,43 @@ class ManualWorld(World):
         return item_object
 
     # Item Value need a tweaked collect and remove:
+    @timed_stage
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
+        if change and item.name in self.item_value_vectors:
+            prog_items = state.prog_items[item.player]
+            for key, value in self.item_value_vectors[item.name]:
+                prog_items[key] += value
         after_collect_item(self, state, change, item)
         return change
 
+    @timed_stage
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
+        if change and item.name in self.item_value_vectors:
+            prog_items = state.prog_items[item.player]
+            for key, value in self.item_value_vectors[item.name]:
+                prog_items[key] -= value
         after_remove_item(self, state, change, item)
         return change
 
+    @profiled_stage
+    @timed_stage
     def set_rules(self):
         before_set_rules(self, self.multiworld, self.player)
 
+        if enable_rule_profiling:
+            self.rule_profile = RuleProfile()
+
         set_rules(self, self.multiworld, self.player)
 
         after_set_rules(self, self.multiworld, self.player)
 
+        if self.rule_profile:
+            profile_rules(self, self.multiworld, self.player)
+
+    @profiled_stage
+    @timed_stage
     def generate_basic(self):
         before_generate_basic(self, self.multiworld, self.player)
 
@@ -367,10 +435,14 @@ class ManualWorld(World):
             from Utils import visualize_regions
             visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
+    @profiled_stage
+    @timed_stage
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
 
+    @profiled_stage
+    @timed_stage
     def fill_slot_data(self):
         slot_data = before_fill_slot_data({}, self, self.multiworld, self.player)
 
@@ -385,15 +457,40 @@ class ManualWorld(World):
 
         return slot_data
 
+    @timed_stage
     def generate_output(self, output_directory: str):
         data = self.client_data()
         filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
-        with open(os.path.join(output_directory, filename), 'wb') as f:
-            f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
+        write_apmanual_file(os.path.join(output_directory, filename), data)
 
+    @classmethod
+    def stage_generate_output(cls, multiworld, output_directory: str):
+        # the players' generate_output run alongside this, and extend_hint_information and write_spoiler after it,
+        # so the stage timings written here say they're missing them; stage_write_spoiler writes them again in full
+        if enable_stage_timing:
+            stage_timings.seeds += 1
+            log_stage_timings(cls.game, late_stages)
+            stage_timings.write_json(os.path.join(output_directory, f"AP_{multiworld.seed_name}_{cls.game}_stage_timings.json"), late_stages)
+        if enable_memory_profiling:
+            log_memory_profile(cls.game)
+            memory_profile.write_json(os.path.join(output_directory, f"AP_{multiworld.seed_name}_{cls.game}_memory.json"))
+
+    @timed_stage
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
 
+        if self.rule_profile:
+            self.rule_profile.write_report(spoiler_handle, self.multiworld.get_player_name(self.player))
+
+    @classmethod
+    def stage_write_spoiler(cls, multiworld, spoiler_handle):
+        # the last stage there is, when there's a spoiler log: its file is next to the ones generate_output wrote
+        spoiler_path = getattr(spoiler_handle, "name", None)
+        if enable_stage_timing and isinstance(spoiler_path, str):
+            log_stage_timings(cls.game)
+            stage_timings.write_json(os.path.join(os.path.dirname(spoiler_path), f"AP_{multiworld.seed_name}_{cls.game}_stage_timings.json"))
+
+    @timed_stage
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -477,21 +574,33 @@ class ManualWorld(World):
         if player is None:
             player = self.player
 
-        if not self.item_counts.get(player, {}) or reset:
-            real_pool = get_items_for_player(self.multiworld, player, True)
-            self.item_counts[player] = {i.name: real_pool.count(i) for i in real_pool}
+        signature = self.get_item_pool_signature(player)
+        if not self.item_counts.get(player, {}) or reset or self.item_pool_signatures.get(player) != signature:
+            self.item_counts[player], self.item_value_index[player], self.item_value_totals[player] = count_player_pool(self, player)
+            self.item_pool_signatures[player] = signature
         return self.item_counts.get(player)
 
+    def get_item_pool_signature(self, player: int) -> tuple[int, int, int]:
+        """What get_item_counts checks to tell whether the player's pool changed since it was counted: the multiworld's item pool
+        and its length, and how many starting items the player has. Anything that adds items to the pool or removes items
+        from it (like the world, hooks and item placement) changes it; a hook that swaps items without changing how many
+        there are should call Helpers.reset_item_value_cache_for_player."""
+        return id(self.multiworld.itempool), len(self.multiworld.itempool), len(self.multiworld.precollected_items.get(player, []))
+
     def client_data(self):
+        # only what the seed changed from the data the hash identifies, which the client merges onto the installed apworld's
         return {
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
-            # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
-            'regions': region_table,
-            'categories': category_table
+            'data_hash': get_client_data_hash(),
+            'data_changes': diff_client_data(get_base_client_data(), {
+                'items': self.item_name_to_item,
+                'locations': self.location_name_to_location,
+                # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
+                'regions': region_table,
+                'categories': category_table
+            })
         }
 
 ###
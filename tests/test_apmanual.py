@@ -0,0 +1,52 @@
+import copy
+import importlib
+import os
+import tempfile
+import unittest
+
+from benchmarks.manuals import load_repo_manual
+
+ApManual = importlib.import_module(f"{load_repo_manual().__name__}.ApManual")
+
+
+class TestApManualFile(unittest.TestCase):
+    base_data = {
+        "items": {"Sword": {"name": "Sword", "count": 1, "category": ["Weapons"]}, "Shield": {"name": "Shield"}},
+        "locations": {"Chest": {"name": "Chest", "requires": "|Sword|"}},
+        "regions": {"Cave": {"connects_to": []}},
+        "categories": {"Weapons": {}},
+    }
+
+    def setUp(self):
+        self.base = ApManual.copy_client_data(self.base_data)
+        self.data = copy.deepcopy(self.base_data)
+
+    def test_unchanged_data_has_no_changes(self):
+        self.assertEqual(ApManual.diff_client_data(self.base, self.data), {})
+
+    def test_only_the_changes_are_kept_and_merge_back(self):
+        self.data["items"]["Sword"]["count"] = 2
+        self.data["locations"]["Boss"] = {"name": "Boss", "requires": ("|Sword|",)}
+        del self.data["regions"]["Cave"]
+
+        changes = ApManual.diff_client_data(self.base, self.data)
+        self.assertEqual(changes, {
+            "items": {"changed": {"Sword": {"name": "Sword", "count": 2, "category": ["Weapons"]}}, "removed": []},
+            "locations": {"changed": {"Boss": {"name": "Boss", "requires": ["|Sword|"]}}, "removed": []},
+            "regions": {"changed": {}, "removed": ["Cave"]},
+        })
+        self.assertEqual(ApManual.merge_client_data(self.base, changes), ApManual.copy_client_data(self.data))
+
+    def test_written_files_are_read_back(self):
+        data = {"game": "Manual_Test_Tests", "data_hash": ApManual.hash_client_data(self.base), "data_changes": {}}
+        handle, path = tempfile.mkstemp(suffix=".apmanual")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        ApManual.write_apmanual_file(path, data)
+        self.assertEqual(ApManual.read_apmanual_file(path), {**data, "apmanual_version": ApManual.apmanual_version})
+
+    def test_the_hash_follows_the_data(self):
+        self.assertEqual(ApManual.hash_client_data(self.base), ApManual.hash_client_data(ApManual.copy_client_data(self.data)))
+        self.data["categories"]["Weapons"]["hidden"] = True
+        self.assertNotEqual(ApManual.hash_client_data(self.base), ApManual.hash_client_data(ApManual.copy_client_data(self.data)))
@@ -0,0 +1,38 @@
+import importlib
+import unittest
+
+from benchmarks.manuals import load_repo_manual
+
+ClientLogic = importlib.import_module(f"{load_repo_manual().__name__}.ClientLogic").ClientLogic
+
+
+class TestClientLogic(unittest.TestCase):
+    def make_logic(self) -> ClientLogic:
+        items = {name: {"name": name, "category": ["Keys"]} for name in ("Key", "Pass", "Map")}
+        locations = {
+            "Chest": {"name": "Chest", "region": "Start"},
+            "Treasure": {"name": "Treasure", "region": "Castle", "requires": "|Map|"},
+        }
+        regions = {
+            "Start": {"starting": True, "connects_to": ["Castle"], "exit_requires": {"Castle": "|Key|"}},
+            "Castle": {"connects_to": [], "entrance_requires": {"Start": "|Pass|"}},
+        }
+        return ClientLogic(items, locations, regions, {"Keys": {}}, {})
+
+    def test_exit_and_entrance_requires_are_both_needed(self):
+        logic = self.make_logic()
+        self.assertEqual(logic.in_logic, {"Chest"})
+
+        logic.set_counts({"Key": 1, "Map": 1})
+        self.assertNotIn("Castle", logic.reachable_regions)
+        self.assertEqual(logic.in_logic, {"Chest"})
+
+        logic.set_counts({"Key": 0, "Pass": 1})
+        self.assertNotIn("Castle", logic.reachable_regions)
+
+        self.assertTrue(logic.set_counts({"Key": 1}))
+        self.assertIn("Castle", logic.reachable_regions)
+        self.assertEqual(logic.in_logic, {"Chest", "Treasure"})
+
+        self.assertTrue(logic.set_counts({"Pass": 0}))
+        self.assertEqual(logic.in_logic, {"Chest"})
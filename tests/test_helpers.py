@@ -0,0 +1,35 @@
+import importlib
+import unittest
+
+from benchmarks.manuals import load_repo_manual
+
+Helpers = importlib.import_module(f"{load_repo_manual().__name__}.Helpers")
+
+
+class TestSharedEnabledLocations(unittest.TestCase):
+    disabled = frozenset({"Hard"})
+
+    def test_tables_with_the_same_categories_disabled_get_their_own_locations(self):
+        table = [{"name": "Easy", "category": ["Easy"]}, {"name": "Hard", "category": ["Hard"]}]
+        other_table = [{"name": "Hard", "category": ["Hard"]}, {"name": "Easy", "category": ["Easy"]}]
+
+        self.assertEqual(Helpers.get_shared_enabled_locations(table, self.disabled), b"\x01\x00")
+        self.assertEqual(Helpers.get_shared_enabled_locations(other_table, self.disabled), b"\x00\x01")
+        self.assertEqual(Helpers.get_shared_enabled_locations(table, self.disabled), b"\x01\x00")
+
+    def test_locations_added_to_a_table_are_seen(self):
+        table = [{"name": "Easy", "category": ["Easy"]}]
+        self.assertEqual(Helpers.get_location_categories(table), {"Easy"})
+        self.assertEqual(Helpers.get_shared_enabled_locations(table, self.disabled), b"\x01")
+
+        table.append({"name": "Hard", "category": ["Hard"]})
+        self.assertEqual(Helpers.get_location_categories(table), {"Easy", "Hard"})
+        self.assertEqual(Helpers.get_shared_enabled_locations(table, self.disabled), b"\x01\x00")
+
+    def test_a_reused_id_is_worked_out_again(self):
+        table = [{"name": "Hard", "category": ["Hard"]}]
+        # what's left behind by a freed table that had the same id and length
+        Helpers.shared_enabled_locations[(id(table), self.disabled)] = ([{"name": "Easy"}], 1, b"\x01")
+        self.addCleanup(Helpers.shared_enabled_locations.pop, (id(table), self.disabled), None)
+
+        self.assertEqual(Helpers.get_shared_enabled_locations(table, self.disabled), b"\x00")
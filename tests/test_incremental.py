@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from scripts.builder import BuilderOutput, manifest_path
+from scripts.builder.incremental import (
+    BuildManifest,
+    SourceChanges,
+    hash_file,
+    sync_tree,
+    update_archive,
+    write_if_changed,
+)
+
+
+class TestSourceChanges(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.source = self.root / "src"
+        (self.source / "data").mkdir(parents=True)
+        (self.source / "__init__.py").write_text("# world")
+        (self.source / "data" / "items.json").write_text("[]")
+        self.manifest = BuildManifest(self.root / "manifest.json")
+
+    def test_everything_changed_without_a_manifest(self):
+        changes = SourceChanges(self.source, self.manifest)
+        self.assertEqual(changes.changed, ["__init__.py", "data/items.json"])
+        self.assertEqual(changes.removed, [])
+
+    def test_only_changed_and_removed_files(self):
+        self.manifest.files = SourceChanges(self.source, self.manifest).hashes
+        self.manifest.save()
+        manifest = BuildManifest(self.manifest.path)
+        self.assertFalse(SourceChanges(self.source, manifest))
+
+        (self.source / "data" / "items.json").write_text('[{"name": "Item"}]')
+        (self.source / "__init__.py").unlink()
+        (self.source / "data" / "regions.json").write_text("{}")
+
+        changes = SourceChanges(self.source, manifest)
+        self.assertEqual(changes.changed, ["data/items.json", "data/regions.json"])
+        self.assertEqual(changes.removed, ["__init__.py"])
+
+    def test_unreadable_manifest_is_empty(self):
+        self.manifest.path.write_text("{not json")
+        manifest = BuildManifest(self.manifest.path)
+        self.assertEqual(manifest.files, {})
+        self.assertIsNone(manifest.archive)
+
+    def test_sync_tree_and_update_archive(self):
+        staging = self.root / "staging"
+        sync_tree(self.source, staging, SourceChanges(self.source, self.manifest))
+        archive = self.root / "world.apworld"
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            for path in staging.rglob("*"):
+                if path.is_file():
+                    zip_file.write(path, f"world/{path.relative_to(staging).as_posix()}")
+        self.manifest.files = SourceChanges(self.source, self.manifest).hashes
+
+        (self.source / "data" / "items.json").write_text('[{"name": "Item"}]')
+        (self.source / "__init__.py").unlink()
+        changes = SourceChanges(self.source, self.manifest)
+        sync_tree(self.source, staging, changes)
+        update_archive(archive, staging, "world", changes)
+
+        self.assertFalse((staging / "__init__.py").exists())
+        with zipfile.ZipFile(archive) as zip_file:
+            self.assertEqual(zip_file.namelist(), ["world/data/items.json"])
+            self.assertEqual(zip_file.read("world/data/items.json"), b'[{"name": "Item"}]')
+
+    def test_write_if_changed(self):
+        path = self.root / "file.json"
+        self.assertTrue(write_if_changed(path, "[]"))
+        self.assertFalse(write_if_changed(path, "[]"))
+        self.assertTrue(write_if_changed(path, "{}"))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    """Builds a tiny world twice, checking when the manifest lets the second build update the first."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        (self.root / "src" / "data").mkdir(parents=True)
+        (self.root / "src" / "data" / "game.json").write_text(json.dumps({"game": "Test", "creator": "Tests"}))
+        (self.root / "src" / "data" / "items.json").write_text(json.dumps([{"name": "Item"}], indent=4))
+        (self.root / "output").mkdir()
+
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        environment = mock.patch.dict(os.environ, {"OUTPUT_FOLDER": str(self.root / "output")})
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        self.output = self.root / "output" / "manual_Test_Tests.apworld"
+        self.manifest_path = self.root / manifest_path("manual_Test_Tests")
+
+    def build(self, compact: bool = False):
+        with mock.patch("builtins.print") as printed:
+            BuilderOutput({}).build_world(incremental=True, compact=compact)
+        return " ".join(str(call.args[0]) for call in printed.call_args_list)
+
+    def read_items(self) -> str:
+        with zipfile.ZipFile(self.output) as zip_file:
+            return zip_file.read("manual_Test_Tests/data/items.json").decode("utf-8")
+
+    def test_first_build_is_full_and_saves_the_manifest(self):
+        self.assertNotIn("updated", self.build())
+        manifest = BuildManifest(self.manifest_path)
+        self.assertEqual(set(manifest.files), {"data/game.json", "data/items.json"})
+        self.assertFalse(manifest.compact)
+
+    def test_unchanged_source_is_up_to_date(self):
+        self.build()
+        self.assertIn("world is up to date", self.build())
+
+    def test_changed_source_updates_the_archive(self):
+        self.build()
+        (self.root / "src" / "data" / "items.json").write_text(json.dumps([{"name": "Other"}], indent=4))
+        self.assertIn("updated 1 changed and 0 removed", self.build())
+        self.assertIn("Other", self.read_items())
+        self.assertEqual(BuildManifest(self.manifest_path).archive, hash_file(self.output))
+
+    def test_modified_archive_needs_a_full_build(self):
+        self.build()
+        with zipfile.ZipFile(self.output, "a") as zip_file:
+            zip_file.writestr("manual_Test_Tests/extra.txt", "added by hand")
+        (self.root / "src" / "data" / "items.json").write_text(json.dumps([{"name": "Other"}], indent=4))
+
+        self.assertNotIn("updated", self.build())
+        with zipfile.ZipFile(self.output) as zip_file:
+            self.assertNotIn("manual_Test_Tests/extra.txt", zip_file.namelist())
+
+    def test_missing_archive_or_staging_needs_a_full_build(self):
+        self.build()
+        self.output.unlink()
+        self.assertNotIn("updated", self.build())
+        self.assertTrue(self.output.exists())
+
+        shutil.rmtree(self.root / "dist")
+        self.assertNotIn("world is up to date", self.build())
+
+    def test_compact_change_needs_a_full_build(self):
+        self.build()
+        self.assertNotIn("world is up to date", self.build(compact=True))
+        self.assertEqual(self.read_items(), '[{"name":"Item"}]')
+        self.assertTrue(BuildManifest(self.manifest_path).compact)
+        self.assertIn("world is up to date", self.build(compact=True))
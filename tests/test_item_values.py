@@ -0,0 +1,133 @@
+import dataclasses
+import importlib
+from collections import Counter
+from unittest import mock
+
+from BaseClasses import CollectionState, ItemClassification
+
+from benchmarks.manuals import load_synthetic_manual, presets
+
+manual = load_synthetic_manual("item_values_tests", dataclasses.replace(presets["small"], values=4))
+DataValidation = importlib.import_module(f"{manual.__name__}.DataValidation")
+Helpers = importlib.import_module(f"{manual.__name__}.Helpers")
+Rules = importlib.import_module(f"{manual.__name__}.Rules")
+
+
+class TestItemValues(importlib.import_module(f"{manual.__name__}.manual_test").ManualTest):
+    def value_key(self, value: str) -> str:
+        return Helpers.format_state_prog_items_key(Helpers.ProgItemsCat.VALUE, value)
+
+    def test_value_vectors_match_the_item_values(self):
+        for name, item in self.world.item_name_to_item.items():
+            expected = tuple((self.value_key(value), int(worth)) for value, worth in item.get("value", {}).items())
+            with self.subTest(item=name):
+                self.assertEqual(self.world.item_value_vectors.get(name, ()), expected)
+
+    def test_collect_and_remove_add_up_the_values(self):
+        items = [item for item in self.multiworld.itempool if item.player == self.player and item.advancement]
+        state = CollectionState(self.multiworld)
+        before = Counter(state.prog_items[self.player])
+
+        expected = Counter()
+        for item in items:
+            if self.world.collect(state, item):
+                for value, worth in self.world.item_name_to_item[item.name].get("value", {}).items():
+                    expected[self.value_key(value)] += int(worth)
+
+        self.assertTrue(expected)
+        for key, worth in expected.items():
+            self.assertEqual(state.prog_items[self.player][key] - before[key], worth, key)
+
+        for item in items:
+            self.world.remove(state, item)
+        for key in expected:
+            self.assertEqual(state.prog_items[self.player][key], before[key], key)
+
+    def pool_values(self) -> dict[str, dict[str, int]]:
+        """What each item of the player's pool is worth of each value, worked out from scratch."""
+        values: dict[str, dict[str, int]] = {}
+        for item in Helpers.get_items_for_player(self.multiworld, self.player, True):
+            if item.code is None:
+                continue
+            for value, worth in self.world.item_name_to_item.get(item.name, {}).get("value", {}).items():
+                values.setdefault(value, {})[item.name] = worth
+        return values
+
+    def test_value_index_matches_the_pool(self):
+        pool_values = self.pool_values()
+        self.assertTrue(pool_values)
+
+        for value, expected in pool_values.items():
+            with self.subTest(value=value):
+                self.assertEqual(Helpers.get_items_with_value(self.world, self.multiworld, value), expected)
+                self.assertEqual(Helpers.get_items_with_value(self.world, self.multiworld, f" {value.upper()} "), expected)
+                self.assertEqual(Helpers.get_items_with_value(self.world, self.multiworld, value, skipCache=True), expected)
+
+        self.assertEqual(Helpers.get_items_with_value(self.world, self.multiworld, "not a value"), {})
+
+    def test_value_index_follows_pool_changes(self):
+        value, worths = next(iter(self.pool_values().items()))
+        name = next(iter(worths))
+        self.assertIn(name, Helpers.get_items_with_value(self.world, self.multiworld, value))
+
+        removed = [item for item in self.multiworld.itempool if item.player == self.player and item.name == name]
+        for item in removed:
+            self.multiworld.itempool.remove(item)
+        self.addCleanup(self.multiworld.itempool.extend, removed)
+        # changed outside of the world, so it's told to count the pool again
+        previous = Helpers.reset_specific_item_value_cache_for_player(self.world, value)
+
+        self.assertIn(name, previous)
+        self.assertNotIn(name, Helpers.get_items_with_value(self.world, self.multiworld, value))
+        self.assertNotIn(name, self.world.get_item_counts())
+
+    def test_value_totals_match_the_progression_items(self):
+        expected = Counter()
+        for item in Helpers.get_items_for_player(self.multiworld, self.player, True):
+            if item.code is not None and ItemClassification.progression in item.classification:
+                for value, worth in self.world.item_name_to_item.get(item.name, {}).get("value", {}).items():
+                    expected[value] += int(worth)
+
+        self.assertTrue(expected)
+        self.assertEqual(Helpers.get_progression_value_totals(self.world), dict(expected))
+
+    def test_required_item_values(self):
+        self.assertEqual(Rules.get_required_item_values("{ItemValue(Coins:12)} and ({ItemValue( coins :20)} or |Item 0|)"), {"coins": 20})
+        self.assertEqual(Rules.get_required_item_values(["Item 0", {"or": ["{ItemValue(Gems:3)}"]}]), {"gems": 3})
+        self.assertEqual(Rules.get_required_item_values("|Item 0| and {YamlEnabled(Option)}"), {})
+
+    def test_pre_fill_check_compares_the_required_values_to_the_totals(self):
+        DataValidation.DataValidation.preFillCheckIfEnoughItemsForValue(self.world, self.multiworld)
+
+        value, total = next(iter(Helpers.get_progression_value_totals(self.world).items()))
+        location = next(location for location in self.multiworld.get_locations(self.player)
+                        if location.name in self.world.location_name_to_location)
+        manual_location = self.world.location_name_to_location[location.name]
+
+        with mock.patch.dict(manual_location, {"requires": f"{{ItemValue({value}:{total})}}"}):
+            DataValidation.DataValidation.preFillCheckIfEnoughItemsForValue(self.world, self.multiworld)
+
+        with mock.patch.dict(manual_location, {"requires": f"{{ItemValue({value}:{total + 1})}}"}):
+            with self.assertRaises(DataValidation.ValidationError):
+                DataValidation.DataValidation.preFillCheckIfEnoughItemsForValue(self.world, self.multiworld)
+
+
+class TestItemValuesAfterHooks(importlib.import_module(f"{manual.__name__}.manual_test").ManualTest):
+    """Hooks can add items to the pool after its values were counted, without being told to count them again."""
+
+    def setUp(self):
+        self.totals = []
+        with mock.patch.object(manual, "after_set_rules", self.add_valued_items):
+            super().setUp()
+
+    def add_valued_items(self, world, multiworld, player):
+        name, item = next((name, item) for name, item in world.item_name_to_item.items() if item.get("value") and item.get("progression"))
+        before = dict(Helpers.get_progression_value_totals(world))
+        multiworld.itempool += [world.create_item(name), world.create_item(name)]
+        self.totals.append((item["value"], before, dict(Helpers.get_progression_value_totals(world))))
+
+    def test_value_totals_follow_a_hook_adding_items(self):
+        self.assertTrue(self.totals)
+        values, before, after = self.totals[0]
+        for value, worth in values.items():
+            self.assertEqual(after[value], before.get(value, 0) + 2 * int(worth), value)
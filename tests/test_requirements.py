@@ -0,0 +1,274 @@
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from scripts.builder import WorldBuilder, regions_schema
+from scripts.builder.location import (
+    Location,
+    always_met,
+    parse_requirement,
+    serialize_requirement_tree,
+    simplify_requirement_tree,
+)
+from scripts.builder.optimize import hoist_shared_requirements
+from scripts.builder.region import Region
+
+items = ["A", "B", "C", "D"]
+categories = {"Odd": ["A", "C"], "Even": ["B", "D"]}
+options = {"OptionOn": True, "OptionOff": False}
+# how many of each item are in the pool, for optional counts
+pool = 2
+
+
+def evaluate_string(requires: str, counts: dict[str, int]) -> bool:
+    """Evaluates a requires string the way the world does: OptAll is replaced by its requires with every subject made an OptOne,
+    then every subject and function becomes 1 or 0, and "and" and "or" are applied left to right, with the same precedence."""
+    def opt_all(match: re.Match) -> str:
+        return re.sub(r"\|[^|]+\|", lambda subject: f"{{OptOne({subject.group()})}}", match.group(1)) if match.group(1) else "1"
+
+    def subject(match: re.Match) -> str:
+        text = match.group()
+        optional = text.startswith("{OptOne(")
+        text = text.removeprefix("{OptOne(").removesuffix(")}")
+        name, _, count = text.strip("|").partition(":")
+        names = categories[name[1:]] if name.startswith("@") else [name]
+        required = int(count or 1)
+        if optional:
+            required = min(required, pool * len(names))
+        return "1" if sum(counts[item] for item in names) >= required else "0"
+
+    requires = re.sub(r"\{OptAll\((.*?)\)\}", opt_all, requires)
+    requires = re.sub(r"\{OptOne\(\|[^|]+\|\)\}|\|[^|]+\|", subject, requires)
+    requires = re.sub(r"\{YamlEnabled\((\w+)\)\}", lambda match: "1" if options[match.group(1)] else "0", requires)
+    tokens = re.findall(r"[01()]|and|or", requires)
+
+    def expression(index: int) -> tuple[bool, int]:
+        result, index = operand(index)
+        while index < len(tokens) and tokens[index] in ("and", "or"):
+            operator = tokens[index]
+            right, index = operand(index + 1)
+            result = (result and right) if operator == "and" else (result or right)
+        return result, index
+
+    def operand(index: int) -> tuple[bool, int]:
+        if tokens[index] == "(":
+            result, index = expression(index + 1)
+            return result, index + 1
+        return tokens[index] == "1", index + 1
+
+    return expression(0)[0] if tokens else True
+
+
+def evaluate_tree(tree: dict, counts: dict[str, int]) -> bool:
+    if "and" in tree:
+        return all(evaluate_tree(child, counts) for child in tree["and"])
+    if "or" in tree:
+        return any(evaluate_tree(child, counts) for child in tree["or"])
+    if "function" in tree:
+        return options[tree["args"]]
+
+    names = categories[tree["category"]] if "category" in tree else [tree["item"]]
+    required = int(tree.get("count", 1))
+    if tree.get("optional"):
+        required = min(required, pool * len(names))
+    return sum(counts[item] for item in names) >= required
+
+
+def every_count():
+    for values in itertools.product(range(pool + 1), repeat=len(items)):
+        yield dict(zip(items, values))
+
+
+def random_requires(rng: random.Random, depth: int = 0) -> str:
+    kind = rng.random()
+    if depth < 3 and kind < 0.35:
+        terms = [random_requires(rng, depth + 1) for _ in range(rng.randint(2, 3))]
+        requires = f" {rng.choice(['and', 'or'])} ".join(terms)
+        return f"({requires})" if rng.random() < 0.7 else requires
+    if kind < 0.45:
+        return f"|@{rng.choice(list(categories))}:{rng.randint(1, 3)}|"
+    if kind < 0.55:
+        return f"{{OptOne(|{rng.choice(items)}:{rng.randint(1, 4)}|)}}"
+    if kind < 0.6:
+        return f"{{YamlEnabled({rng.choice(list(options))})}}"
+    if kind < 0.65:
+        return "{OptAll()}"
+    if kind < 0.7:
+        subjects = [random_subject(rng) for _ in range(rng.randint(1, 3))]
+        return f"{{OptAll({' '.join(f'{subject} {rng.choice(['and', 'or'])}' for subject in subjects[:-1])} {subjects[-1]})}}".replace("( ", "(")
+    return random_subject(rng)
+
+
+def random_subject(rng: random.Random) -> str:
+    if rng.random() < 0.3:
+        return f"|@{rng.choice(list(categories))}:{rng.randint(1, 5)}|"
+    return f"|{rng.choice(items)}:{rng.randint(1, 3)}|"
+
+
+class TestSimplifyRequirementTree(unittest.TestCase):
+    def test_simplified_trees_match_the_requires(self):
+        rng = random.Random(1)
+        for _ in range(300):
+            requires = random_requires(rng)
+            tree = parse_requirement(requires).to_tree()
+            simplified = simplify_requirement_tree(tree)
+            for counts in every_count():
+                expected = evaluate_string(requires, counts)
+                with self.subTest(requires=requires, counts=counts):
+                    self.assertEqual(evaluate_tree(tree, counts), expected)
+                    self.assertEqual(evaluate_tree(simplified, counts), expected)
+
+    def test_flattens_and_drops_duplicates(self):
+        tree = parse_requirement("(|A| and (|B| and |A|)) and {OptAll()}").to_tree()
+        self.assertEqual(simplify_requirement_tree(tree), {"and": [{"item": "A"}, {"item": "B"}]})
+
+    def test_always_met_or(self):
+        tree = parse_requirement("|A| or {OptAll()}").to_tree()
+        self.assertEqual(simplify_requirement_tree(tree), always_met)
+
+    def test_opt_all_mixes_with_the_operators_around_it(self):
+        # the world pastes OptAll's requires in without parentheses, so this is (|C| or |A|) and |B:3|
+        for requires in ["|C| or {OptAll(|A| and |B:3|)}", "{OptAll(|A:4| or |B|)} and |@Odd:2|", "|D| and {OptOne(|A:3|)} or |B|"]:
+            tree = serialize_requirement_tree(requires)
+            for counts in every_count():
+                with self.subTest(requires=requires, counts=counts):
+                    self.assertEqual(evaluate_tree(tree, counts), evaluate_string(requires, counts))
+
+        self.assertEqual(serialize_requirement_tree("|C| or {OptAll(|A| and |B:3|)}"), {"and": [
+            {"or": [{"item": "C"}, {"item": "A", "optional": True}]},
+            {"item": "B", "count": "3", "optional": True},
+        ]})
+
+    def test_functions_that_may_return_requires_get_no_tree(self):
+        self.assertIsNone(serialize_requirement_tree("|A| or {requiresMelee()}"))
+        self.assertIsNone(serialize_requirement_tree("{OptAll(|A| and {requiresMelee()})}"))
+        self.assertEqual(serialize_requirement_tree("{YamlEnabled(OptionOn)} and |A|"),
+                         {"and": [{"function": "YamlEnabled", "args": "OptionOn"}, {"item": "A"}]})
+
+        location = Location("Location", requires="|A| or {requiresMelee()}")
+        self.assertEqual(location.data, {"name": "Location", "requires": "|A| or {requiresMelee()}"})
+
+
+class TestHoistSharedRequirements(unittest.TestCase):
+    def make_locations(self, rng: random.Random) -> dict[str, Location]:
+        shared = [random_requires(rng) for _ in range(4)]
+        locations = {}
+        for index in range(30):
+            requires = rng.choice(shared) if index % 5 else random_requires(rng)
+            kwargs = {"region": "Somewhere"} if index % 7 == 0 else {}
+            locations[f"Location {index}"] = Location(f"Location {index}", category=["Shared"], requires=requires, **kwargs)
+        return locations
+
+    def test_hoisting_keeps_every_location_requirement(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            locations = self.make_locations(rng)
+            original = {name: dict(location.data) for name, location in locations.items()}
+            regions = {"Somewhere": Region("Somewhere")}
+
+            hoisted = hoist_shared_requirements(locations, regions, keep={"Location 1"})
+            self.assertTrue(hoisted)
+
+            for name, location in locations.items():
+                region = regions.get(location.data.get("region", ""))
+                for counts in every_count():
+                    met = evaluate_tree(location.data.get("requires_tree", always_met), counts)
+                    if region and region in hoisted:
+                        met = met and evaluate_tree(region.data["requires_tree"], counts)
+                    expected = evaluate_string(original[name]["requires"], counts)
+                    with self.subTest(seed=seed, location=name, counts=counts):
+                        self.assertEqual(met, expected)
+
+    def test_only_shared_region_less_locations_are_hoisted(self):
+        locations = {
+            name: Location(name, category=["Shared"], requires="|A| and |B|", **kwargs)
+            for name, kwargs in [("One", {}), ("Two", {}), ("Kept", {}), ("Placed", {"region": "Somewhere"})]
+        }
+        locations["Alone"] = Location("Alone", requires="|C|")
+        regions = {"Somewhere": Region("Somewhere")}
+
+        hoisted = hoist_shared_requirements(locations, regions, keep={"Kept"})
+
+        self.assertEqual([region.name for region in hoisted], ["Shared"])
+        self.assertEqual(regions["Shared"].data["requires"], "|A| and |B|")
+        self.assertEqual(locations["One"].data, {"name": "One", "category": ["Shared"], "region": "Shared"})
+        self.assertEqual(locations["Two"].data["region"], "Shared")
+        for name in ("Kept", "Placed", "Alone"):
+            self.assertIn("requires_tree", locations[name].data)
+        self.assertEqual(locations["Placed"].data["region"], "Somewhere")
+
+
+class TestGeneratedRegions(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        (self.root / "src" / "data").mkdir(parents=True)
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
+        printing = mock.patch("builtins.print")
+        self.printed = printing.start()
+        self.addCleanup(printing.stop)
+
+    def write_regions(self, regions: dict):
+        text = json.dumps({"$schema": regions_schema, **regions}, indent=4)
+        (self.root / "src" / "data" / "regions.json").write_text(text, encoding="utf-8")
+        return text
+
+    def read_regions(self) -> dict:
+        return json.loads((self.root / "src" / "data" / "regions.json").read_text("utf-8"))
+
+    def make_builder(self, requires: list[str]) -> WorldBuilder:
+        builder = WorldBuilder()
+        for index, location_requires in enumerate(requires):
+            builder.location(f"Location {index}", category=["Shared"], requires=location_requires)
+        return builder
+
+    def test_hand_written_regions_are_kept(self):
+        self.write_regions({"Cave": {"connects_to": []}, "Old": {"requires": "|A|", "generated": True}})
+        builder = self.make_builder(["|A| and |B|", "|A| and |B|"])
+        builder.optimize_requirements()
+        builder.generate_data()
+
+        self.assertEqual(self.read_regions(), {
+            "$schema": regions_schema,
+            "Cave": {"connects_to": []},
+            "Shared": {"requires": "|A| and |B|", "requires_tree": {"and": [{"item": "A"}, {"item": "B"}]}, "generated": True},
+        })
+
+    def test_nothing_is_written_or_said_without_regions(self):
+        text = self.write_regions({"Cave": {"connects_to": []}})
+        builder = self.make_builder(["|A|", "|B|"])
+        builder.optimize_requirements()
+        self.printed.assert_not_called()
+
+        output = builder.generate_data()
+        self.assertNotIn("regions.json", output.data_files)
+        self.assertEqual((self.root / "src" / "data" / "regions.json").read_text("utf-8"), text)
+
+    def test_regions_left_by_an_earlier_build_are_removed(self):
+        self.write_regions({"Cave": {"connects_to": []}, "Old": {"requires": "|A|", "generated": True}})
+        self.make_builder(["|A|"]).generate_data()
+        self.assertEqual(self.read_regions(), {"$schema": regions_schema, "Cave": {"connects_to": []}})
+
+    def test_hoisted_regions_fit_in_with_the_hand_written_ones(self):
+        self.write_regions({"Shared": {"starting": True, "connects_to": []}})
+        builder = self.make_builder(["|A|", "|A|"])
+        builder.optimize_requirements()
+
+        self.assertEqual(list(builder.regions), ["Location 0"])
+        self.assertTrue(builder.regions["Location 0"].data["starting"])
+
+    def test_builder_regions_cant_replace_hand_written_ones(self):
+        self.write_regions({"Cave": {"connects_to": []}})
+        builder = WorldBuilder()
+        builder.region("Cave")
+        with self.assertRaises(Exception):
+            builder.generate_data()
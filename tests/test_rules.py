@@ -0,0 +1,78 @@
+import importlib
+import random
+
+from BaseClasses import CollectionState
+
+from benchmarks.manuals import load_synthetic_manual, presets
+from scripts.builder.location import serialize_requirement_tree
+
+manual = load_synthetic_manual("rules_tests", presets["small"])
+Data = importlib.import_module(f"{manual.__name__}.Data")
+Rules = importlib.import_module(f"{manual.__name__}.Rules")
+
+
+class TestCompiledRequireTrees(importlib.import_module(f"{manual.__name__}.manual_test").ManualTest):
+    """The trees the world builder emits must be met exactly when the requires strings they're parsed from are."""
+
+    def make_areas(self) -> list[dict]:
+        areas = [dict(area) for area in self.world.location_table if area.get("requires") and isinstance(area["requires"], str)]
+        areas += [{"name": name, **region, "is_region": True} for name, region in Data.region_table.items()
+                  if region.get("requires") and isinstance(region["requires"], str)]
+
+        item_names = [name for name, count in self.world.get_item_counts().items() if count]
+        categories = sorted({category for item in self.world.item_name_to_item.values() for category in item.get("category", [])})
+        rng = random.Random(1)
+        for index in range(20):
+            item, other = rng.sample(item_names, 2)
+            category = rng.choice(categories)
+            areas += [
+                {"name": f"All {index}", "requires": f"|{item}:all|"},
+                {"name": f"Half {index}", "requires": f"|@{category}:half| and |{other}|"},
+                {"name": f"Percent {index}", "requires": f"|@{category}:30%| or (|{item}| and |{other}:2|)"},
+                {"name": f"OptOne {index}", "requires": f"{{OptOne(|{item}:9|)}} and ({{OptAll(|@{category}:99|)}} or |{other}|)"},
+                # OptAll's requires are pasted in without parentheses, so these mix with the "and" and "or" around them
+                {"name": f"OptAll or {index}", "requires": f"|{other}| or {{OptAll(|{item}:9| and |@{category}:3|)}}"},
+                {"name": f"OptAll and {index}", "requires": f"{{OptAll(|{item}| or |{other}:9|)}} and |@{category}|"},
+                {"name": f"OptOne or {index}", "requires": f"|@{category}:2| and {{OptOne(|{other}:9|)}} or |{item}|"},
+            ]
+        areas.append({"name": "Empty category", "requires": "|@Not A Category:0|"})
+
+        for area in areas:
+            area.pop("requires_tree_source", None)
+            area["requires_tree"] = serialize_requirement_tree(area["requires"])
+        return areas
+
+    def test_trees_match_the_requires_strings(self):
+        areas = self.make_areas()
+        items = [item for item in self.multiworld.itempool if item.player == self.player and item.advancement]
+        rng = random.Random(2)
+
+        for attempt in range(10):
+            state = CollectionState(self.multiworld)
+            for item in rng.sample(items, rng.randrange(len(items) + 1)):
+                self.world.collect(state, item)
+
+            for area in areas:
+                string_area = {key: value for key, value in area.items() if key != "requires_tree"}
+                expected = self.world.check_requires(state, string_area)
+                check = Rules.get_compiled_require_tree(area["requires_tree"], area)
+                with self.subTest(attempt=attempt, requires=area["requires"]):
+                    self.assertEqual(check(state, self.world, area), expected)
+
+    def test_checks_are_compiled_once_per_tree(self):
+        tree = serialize_requirement_tree("|Item 0| and |Item 1|")
+        area = {"name": "Area", "requires_tree": tree}
+        check = Rules.get_compiled_require_tree(tree, area)
+
+        self.assertIs(Rules.get_compiled_require_tree(tree, {"name": "Other area"}), check)
+        self.assertIsNot(Rules.get_compiled_require_tree(dict(tree), area), check)
+
+    def test_a_reused_id_gets_its_own_check(self):
+        tree = {"item": "Item 0"}
+        # what's left behind by a freed tree that had the same id
+        Rules.compiled_require_trees[id(tree)] = ({"item": "Item 0"}, lambda state, world, area: "stale")
+        self.addCleanup(Rules.compiled_require_trees.pop, id(tree), None)
+
+        check = Rules.get_compiled_require_tree(tree, {"name": "Area"})
+        self.assertFalse(check(CollectionState(self.multiworld), self.world, {"name": "Area"}))
+        self.assertIs(Rules.compiled_require_trees[id(tree)][0], tree)